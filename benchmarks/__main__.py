@@ -0,0 +1,97 @@
+import argparse
+import json
+import sys
+
+from benchmarks.dataset import DatasetGenerator
+from benchmarks.entities import compare_entity_layouts
+from benchmarks.runner import BenchmarkRunner, compare_runs, load_report
+
+
+def build_repository(args):
+    if args.backend == 'sqlite':
+        from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+        repository = OrderProcessorRepositorySqliteImpl(args.sqlite_path)
+        return repository, repository.database.get_connection
+
+    from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+    from util.db_conn_util import DBConnUtil
+    return OrderProcessorRepositoryImpl(), DBConnUtil.get_connection
+
+
+def run(args):
+    repository, get_connection = build_repository(args)
+    dataset = DatasetGenerator(
+        get_connection,
+        seed=args.seed,
+        customers=args.customers,
+        products=args.products,
+        orders=args.orders,
+        days=args.days,
+        skew=args.skew,
+        rebuild_summaries=repository.rebuild_sales_summaries
+    )
+    print(f"Seeding {args.orders} orders for {args.customers} customers and {args.products} products...",
+          file=sys.stderr)
+    dataset.seed_database()
+
+    runner = BenchmarkRunner(repository, dataset, iterations=args.iterations,
+                             warmup=args.warmup, backend=args.backend)
+    report = runner.run(args.scenarios)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+def compare(args):
+    comparison = compare_runs(load_report(args.baseline), load_report(args.candidate), args.threshold)
+    print(json.dumps(comparison, indent=2))
+    return 1 if comparison['regressions'] else 0
+
+
+def entities(args):
+    print(json.dumps(compare_entity_layouts(args.orders, args.items_per_order), indent=2))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Repository hot-path benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="seed a dataset and time the repository methods")
+    run_parser.add_argument('--backend', choices=('sqlite', 'mysql'), default='sqlite')
+    run_parser.add_argument('--sqlite-path', default=':memory:')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--customers', type=int, default=1000)
+    run_parser.add_argument('--products', type=int, default=500)
+    run_parser.add_argument('--orders', type=int, default=10000)
+    run_parser.add_argument('--days', type=int, default=30)
+    run_parser.add_argument('--skew', type=float, default=1.1)
+    run_parser.add_argument('--iterations', type=int, default=200)
+    run_parser.add_argument('--warmup', type=int, default=10)
+    run_parser.add_argument('--scenarios', nargs='+', choices=BenchmarkRunner.SCENARIOS)
+    run_parser.add_argument('--output', help="write the JSON report to this file")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help="compare two JSON reports")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="relative change treated as a regression (default 0.10)")
+    compare_parser.set_defaults(handler=compare)
+
+    entities_parser = commands.add_parser('entities', help="memory and build time of hydrated entities")
+    entities_parser.add_argument('--orders', type=int, default=20000)
+    entities_parser.add_argument('--items-per-order', type=int, default=3)
+    entities_parser.set_defaults(handler=entities)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
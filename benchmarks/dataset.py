@@ -0,0 +1,156 @@
+import bisect
+import itertools
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+
+class DatasetGenerator:
+    """
+    Seeds a reproducible synthetic dataset straight into the database.
+
+    Product popularity and customer activity both follow a Zipf-like
+    distribution (weight 1 / rank ** skew), so a handful of products appear
+    in most orders and a handful of customers own very long histories.
+    Rows are written in batches so memory stays flat up to millions of orders.
+
+    Order lines are written with their unit_price. Orders are inserted
+    directly, bypassing the sales summaries, so rebuild_summaries (e.g. the
+    repository's rebuild_sales_summaries) is called once they are seeded.
+    """
+
+    def __init__(self, get_connection, seed=42, customers=1000, products=500, orders=10000,
+                 max_lines_per_order=5, days=30, skew=1.1, batch_size=5000, rebuild_summaries=None):
+        self.get_connection = get_connection
+        self.rebuild_summaries = rebuild_summaries
+        self.seed = seed
+        self.customers = customers
+        self.products = products
+        self.orders = orders
+        self.max_lines_per_order = max_lines_per_order
+        self.days = days
+        self.skew = skew
+        self.batch_size = batch_size
+        self.end_date = datetime.now().replace(microsecond=0)
+
+        self.rng = random.Random(seed)
+        self.product_prices = {}
+        self.customer_ids = []
+        self.product_ids = []
+        self._customer_weights = None
+        self._product_weights = None
+
+    def metadata(self):
+        return {
+            'seed': self.seed,
+            'customers': self.customers,
+            'products': self.products,
+            'orders': self.orders,
+            'max_lines_per_order': self.max_lines_per_order,
+            'days': self.days,
+            'skew': self.skew,
+        }
+
+    def _cumulative_weights(self, count):
+        return list(itertools.accumulate(1.0 / (rank ** self.skew) for rank in range(1, count + 1)))
+
+    def _pick(self, ids, cumulative):
+        point = self.rng.random() * cumulative[-1]
+        return ids[bisect.bisect_left(cumulative, point)]
+
+    def pick_customer(self):
+        return self._pick(self.customer_ids, self._customer_weights)
+
+    def pick_product(self):
+        return self._pick(self.product_ids, self._product_weights)
+
+    def seed_database(self):
+        connection = self.get_connection()
+        try:
+            cursor = connection.cursor()
+            self._seed_customers(cursor)
+            self._seed_products(cursor)
+            connection.commit()
+            self._seed_orders(connection, cursor)
+            connection.commit()
+            cursor.close()
+        finally:
+            connection.close()
+        if self.rebuild_summaries is not None and not self.rebuild_summaries():
+            raise RuntimeError("Could not rebuild the sales summaries for the seeded orders")
+        return self
+
+    def _insert_batches(self, cursor, sql, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+    def _seed_customers(self, cursor):
+        self._insert_batches(
+            cursor,
+            "INSERT INTO customers (name, email, password) VALUES (%s, %s, %s)",
+            ((f"Bench Customer {i}", f"bench{self.seed}.{i}@example.com", "Bench#Pass1")
+             for i in range(self.customers))
+        )
+        cursor.execute("SELECT customer_id FROM customers WHERE email LIKE %s ORDER BY customer_id",
+                       (f"bench{self.seed}.%",))
+        self.customer_ids = [row[0] for row in cursor.fetchall()]
+        # Shuffle so the heavy customers are not simply the lowest ids
+        self.rng.shuffle(self.customer_ids)
+        self._customer_weights = self._cumulative_weights(len(self.customer_ids))
+
+    def _seed_products(self, cursor):
+        prices = [Decimal(self.rng.randint(99, 49999)) / 100 for _ in range(self.products)]
+        self._insert_batches(
+            cursor,
+            "INSERT INTO products (name, price, description, stock_quantity) VALUES (%s, %s, %s, %s)",
+            ((f"Bench Product {self.seed}.{i}", prices[i], f"Synthetic product {i}", 10 ** 9)
+             for i in range(self.products))
+        )
+        cursor.execute("SELECT product_id, price FROM products WHERE name LIKE %s ORDER BY product_id",
+                       (f"Bench Product {self.seed}.%",))
+        rows = cursor.fetchall()
+        self.product_ids = [row[0] for row in rows]
+        self.product_prices = {row[0]: Decimal(str(row[1])) for row in rows}
+        self.rng.shuffle(self.product_ids)
+        self._product_weights = self._cumulative_weights(len(self.product_ids))
+
+    def _seed_orders(self, connection, cursor):
+        span_seconds = self.days * 24 * 3600
+        start = self.end_date - timedelta(seconds=span_seconds)
+        remaining = self.orders
+        while remaining > 0:
+            count = min(self.batch_size, remaining)
+            remaining -= count
+
+            orders = []
+            lines = []
+            for _ in range(count):
+                order_lines = {}
+                for _ in range(self.rng.randint(1, self.max_lines_per_order)):
+                    product_id = self.pick_product()
+                    order_lines[product_id] = order_lines.get(product_id, 0) + self.rng.randint(1, 3)
+                total = sum(self.product_prices[p] * q for p, q in order_lines.items())
+                order_date = start + timedelta(seconds=self.rng.randrange(span_seconds))
+                orders.append((self.pick_customer(), order_date, total, "1 Benchmark Way"))
+                lines.append(order_lines)
+
+            cursor.execute("SELECT COALESCE(MAX(order_id), 0) FROM orders")
+            first_id = cursor.fetchone()[0] + 1
+            cursor.executemany(
+                "INSERT INTO orders (order_id, customer_id, order_date, total_price, shipping_address) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                [(first_id + i,) + order for i, order in enumerate(orders)]
+            )
+            cursor.executemany(
+                "INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (%s, %s, %s, %s)",
+                [(first_id + i, product_id, quantity, self.product_prices[product_id])
+                 for i, order_lines in enumerate(lines)
+                 for product_id, quantity in order_lines.items()]
+            )
+            connection.commit()
@@ -0,0 +1,106 @@
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+from entity.order import Order
+from entity.order_item import OrderItem
+from entity.product import Product
+
+
+class _DictOrder:
+    """The pre-__slots__ entity layout (name-mangled fields behind properties), kept for comparison."""
+
+    def __init__(self, order_id=None, customer_id=None, order_date=None, total_price=None, shipping_address=None):
+        self.__order_id = order_id
+        self.__customer_id = customer_id
+        self.__order_date = order_date if order_date else datetime.now()
+        self.__total_price = total_price
+        self.__shipping_address = shipping_address
+
+    @property
+    def order_id(self):
+        return self.__order_id
+
+
+class _DictOrderItem:
+    def __init__(self, order_item_id=None, order_id=None, product_id=None, quantity=None):
+        self.__order_item_id = order_item_id
+        self.__order_id = order_id
+        self.__product_id = product_id
+        self.__quantity = quantity
+
+    @property
+    def order_item_id(self):
+        return self.__order_item_id
+
+
+class _DictProduct:
+    def __init__(self, product_id=None, name=None, price=0.0, description=None, stock_quantity=0):
+        self.__product_id = product_id
+        self.__name = name
+        self.__price = float(price) if price is not None else 0.0
+        self.__description = description
+        self.__stock_quantity = stock_quantity
+
+    @property
+    def product_id(self):
+        return self.__product_id
+
+
+def _hydrate(order_class, item_class, product_class, orders, items_per_order):
+    # Same shape get_orders_by_customer builds: {order_id: (Order, [(OrderItem, Product)])}
+    order_date = datetime(2024, 1, 1)
+    price = Decimal('9.99')
+    result = {}
+    item_id = 0
+    for order_id in range(orders):
+        lines = []
+        for line in range(items_per_order):
+            item_id += 1
+            lines.append((item_class(item_id, order_id, line, 1),
+                          product_class(line, "Product", price, "Description", 10)))
+        result[order_id] = (order_class(order_id, 1, order_date, price, "Address"), lines)
+    return result
+
+
+def _measure(order_class, item_class, product_class, orders, items_per_order):
+    # Timed and traced in separate passes; tracemalloc distorts timings
+    gc.collect()
+    started = time.perf_counter()
+    result = _hydrate(order_class, item_class, product_class, orders, items_per_order)
+    elapsed = time.perf_counter() - started
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = _hydrate(order_class, item_class, product_class, orders, items_per_order)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    objects = len(result) * (1 + 2 * items_per_order)
+    del result
+    return {
+        'objects': objects,
+        'peak_bytes': peak,
+        'bytes_per_object': peak / objects if objects else 0.0,
+        'construct_s': elapsed,
+    }
+
+
+def compare_entity_layouts(orders=20000, items_per_order=3):
+    """
+    Hydrates the same order history with the slotted entities and with the
+    old __dict__-based layout, and reports peak traced memory and build time
+    for each. Peak memory includes the dict, tuples and lists around the
+    entities, as a real result set would.
+    """
+    legacy = _measure(_DictOrder, _DictOrderItem, _DictProduct, orders, items_per_order)
+    slotted = _measure(Order, OrderItem, Product, orders, items_per_order)
+    return {
+        'orders': orders,
+        'items_per_order': items_per_order,
+        'dict': legacy,
+        'slots': slotted,
+        'memory_ratio': legacy['peak_bytes'] / slotted['peak_bytes'] if slotted['peak_bytes'] else 0.0,
+        'time_ratio': legacy['construct_s'] / slotted['construct_s'] if slotted['construct_s'] else 0.0,
+    }
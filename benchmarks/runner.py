@@ -0,0 +1,132 @@
+import json
+import math
+import platform
+import time
+from datetime import datetime, timedelta
+from entity.customer import Customer
+from entity.product import Product
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values), math.ceil(fraction * len(sorted_values))) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        'calls': len(latencies),
+        'total_s': total,
+        'throughput_per_s': len(latencies) / total if total else 0.0,
+        'mean_ms': total / len(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+class BenchmarkRunner:
+    """
+    Times the repository hot paths against a seeded DatasetGenerator.
+
+    Each scenario prepares its inputs outside the timed region and times a
+    single repository call, so the numbers reflect the repository alone.
+    """
+
+    SCENARIOS = ('add_to_cart', 'get_all_from_cart', 'place_order',
+                 'get_orders_by_customer', 'get_orders_by_date')
+
+    def __init__(self, repository, dataset, iterations=200, warmup=10, backend=None):
+        self.repository = repository
+        self.dataset = dataset
+        self.iterations = iterations
+        self.warmup = warmup
+        self.backend = backend
+        self.rng = dataset.rng
+
+    def _timed(self, function, *args):
+        started = time.perf_counter()
+        function(*args)
+        return time.perf_counter() - started
+
+    def _random_date(self):
+        offset = self.rng.randrange(self.dataset.days + 1)
+        return (self.dataset.end_date - timedelta(days=offset)).date().isoformat()
+
+    def bench_add_to_cart(self):
+        customer = Customer(customer_id=self.dataset.pick_customer())
+        product = Product(product_id=self.dataset.pick_product())
+        return self._timed(self.repository.add_to_cart, customer, product, 1)
+
+    def bench_get_all_from_cart(self):
+        customer = Customer(customer_id=self.dataset.pick_customer())
+        return self._timed(self.repository.get_all_from_cart, customer)
+
+    def bench_place_order(self):
+        customer = Customer(customer_id=self.dataset.pick_customer())
+        for _ in range(self.rng.randint(1, self.dataset.max_lines_per_order)):
+            self.repository.add_to_cart(customer, Product(product_id=self.dataset.pick_product()), 1)
+        cart_items = self.repository.get_all_from_cart(customer)
+        return self._timed(self.repository.place_order, customer, cart_items, "1 Benchmark Way")
+
+    def bench_get_orders_by_customer(self):
+        return self._timed(self.repository.get_orders_by_customer, self.dataset.pick_customer())
+
+    def bench_get_orders_by_date(self):
+        return self._timed(self.repository.get_orders_by_date, self._random_date())
+
+    def run(self, scenarios=None):
+        results = {}
+        for name in scenarios or self.SCENARIOS:
+            bench = getattr(self, f"bench_{name}")
+            for _ in range(self.warmup):
+                bench()
+            results[name] = summarize([bench() for _ in range(self.iterations)])
+
+        return {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'backend': self.backend,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'iterations': self.iterations,
+                'warmup': self.warmup,
+                'dataset': self.dataset.metadata(),
+            },
+            'results': results,
+        }
+
+
+def compare_runs(baseline, candidate, threshold=0.10):
+    """
+    Compares two run reports. A method regresses when any latency
+    percentile grows, or throughput drops, by more than threshold.
+    """
+    comparison = {'threshold': threshold, 'methods': {}, 'regressions': []}
+    for name, base in baseline['results'].items():
+        current = candidate['results'].get(name)
+        if current is None:
+            continue
+        changes = {}
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            changes[key] = (current[key] - base[key]) / base[key] if base[key] else 0.0
+        base_throughput = base['throughput_per_s']
+        changes['throughput_per_s'] = ((current['throughput_per_s'] - base_throughput) / base_throughput
+                                       if base_throughput else 0.0)
+
+        regressed = (any(changes[key] > threshold for key in ('p50_ms', 'p95_ms', 'p99_ms'))
+                     or changes['throughput_per_s'] < -threshold)
+        comparison['methods'][name] = {'change': changes, 'regressed': regressed}
+        if regressed:
+            comparison['regressions'].append(name)
+    return comparison
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+
+
+class AsyncOrderProcessorRepository(ABC):
+    """
+    asyncio counterpart of OrderProcessorRepository: the same methods with
+    the same arguments, results and exceptions, as coroutines. The iter_*
+    methods return async iterators. Each call is still one transaction,
+    exactly as in the synchronous repository; run_in_unit_of_work groups
+    several calls into one.
+    """
+
+    @abstractmethod
+    async def create_product(self, product):
+        pass
+
+    @abstractmethod
+    async def bulk_create_products(self, products):
+        pass
+
+    @abstractmethod
+    async def create_customer(self, customer):
+        pass
+
+    @abstractmethod
+    async def get_existing_emails(self, emails):
+        pass
+
+    @abstractmethod
+    async def bulk_create_customers(self, customers, prepare=None):
+        pass
+
+    @abstractmethod
+    async def delete_product(self, product_id):
+        pass
+
+    @abstractmethod
+    async def delete_customer(self, customer_id):
+        pass
+
+    @abstractmethod
+    async def add_to_cart(self, customer, product, quantity):
+        pass
+
+    @abstractmethod
+    async def remove_from_cart(self, customer, product):
+        pass
+
+    @abstractmethod
+    async def get_all_from_cart(self, customer):
+        pass
+
+    @abstractmethod
+    async def get_cart_summary(self, customer):
+        pass
+
+    @abstractmethod
+    async def place_order(self, customer, cart_items, shipping_address, total_price=None):
+        pass
+
+    @abstractmethod
+    async def cancel_order(self, order_id, restocked=None):
+        pass
+
+    @abstractmethod
+    async def get_orders_by_customer(self, customer_id):
+        pass
+
+    @abstractmethod
+    async def get_orders_by_date(self, order_date):
+        pass
+
+    @abstractmethod
+    async def get_orders_between(self, start, end, group_by=None):
+        pass
+
+    @abstractmethod
+    async def get_products_page(self, page_size=50, continuation_token=None):
+        pass
+
+    @abstractmethod
+    async def get_customers_page(self, page_size=50, continuation_token=None):
+        pass
+
+    @abstractmethod
+    async def get_orders_by_customer_page(self, customer_id, page_size=20, continuation_token=None):
+        pass
+
+    @abstractmethod
+    def iter_orders_by_customer(self, customer_id):
+        pass
+
+    @abstractmethod
+    def iter_orders_by_date(self, order_date):
+        pass
+
+    @abstractmethod
+    def iter_orders_between(self, start, end):
+        pass
+
+    @abstractmethod
+    async def get_product_by_id(self, product_id):
+        pass
+
+    @abstractmethod
+    async def get_products_frame(self):
+        pass
+
+    @abstractmethod
+    async def get_order_lines_frame_by_date(self, order_date):
+        pass
+
+    @abstractmethod
+    async def get_order_lines_frame_between(self, start, end):
+        pass
+
+    @abstractmethod
+    async def get_daily_product_sales(self, start, end, product_id=None):
+        pass
+
+    @abstractmethod
+    async def get_best_sellers(self, start, end, limit=10):
+        pass
+
+    @abstractmethod
+    async def get_customer_sales(self, customer_id):
+        pass
+
+    @abstractmethod
+    async def rebuild_sales_summaries(self):
+        pass
+
+    @abstractmethod
+    async def archive_orders(self, retention_days, batch_size=None):
+        pass
+
+    @abstractmethod
+    async def run_in_unit_of_work(self, work, **scope):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
@@ -0,0 +1,225 @@
+import threading
+from contextlib import contextmanager
+from dao.order_processor_repository import OrderProcessorRepository
+from entity.product import Product
+from util.ttl_cache import TTLCache
+
+
+class CachedOrderProcessorRepository(OrderProcessorRepository):
+    """
+    Read-through product cache in front of another OrderProcessorRepository.
+
+    Products are cached by id with LRU and TTL eviction; product listings
+    (get_all_products, get_products_page) are cached as lists of ids that
+    resolve through the same entries. Every mutating method invalidates
+    what it touches, and stock changes from place_order/cancel_order
+    replace the cached products with adjusted copies. Cached Product
+    objects are shared between callers and must be treated as read-only.
+
+    Methods that do not read or write products pass straight through.
+    """
+
+    def __init__(self, repository, max_size=10000, ttl=60.0):
+        self.repository = repository
+        self._products = TTLCache(max_size=max_size, ttl=ttl)
+        self._listings = TTLCache(max_size=256, ttl=ttl)
+        self._stock_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    def cache_stats(self):
+        return {
+            'products': self._products.stats(),
+            'listings': self._listings.stats(),
+        }
+
+    def clear_cache(self):
+        self._products.clear()
+        self._listings.clear()
+
+    @contextmanager
+    def unit_of_work(self, **scope):
+        # Invalidations and stock adjustments made inside a unit that rolls
+        # back no longer match the database; scope is passed on, e.g. the
+        # customer_id a ShardedOrderProcessorRepository unit is scoped to
+        try:
+            with self.repository.unit_of_work(**scope) as unit:
+                yield unit
+        except BaseException:
+            self.clear_cache()
+            raise
+
+    # Product reads
+
+    def get_product_by_id(self, product_id):
+        product = self._products.get(product_id)
+        if product is None:
+            product = self.repository.get_product_by_id(product_id)
+            self._products.put(product_id, product)
+        return product
+
+    def _cached_listing(self, key):
+        listing = self._listings.get(key)
+        if listing is None:
+            return None
+        product_ids, extra = listing
+        products = []
+        for product_id in product_ids:
+            product = self._products.peek(product_id)
+            if product is None:
+                # An entry was evicted or invalidated; reload the whole listing
+                self._listings.pop(key)
+                return None
+            products.append(product)
+        return products, extra
+
+    def _store_listing(self, key, products, extra=None):
+        # Listings larger than the product cache could never resolve fully
+        if len(products) > self._products.max_size:
+            return
+        for product in products:
+            self._products.put(product.product_id, product)
+        self._listings.put(key, ([product.product_id for product in products], extra))
+
+    def get_all_products(self):
+        cached = self._cached_listing(('all',))
+        if cached is not None:
+            return cached[0]
+        products = self.repository.get_all_products()
+        self._store_listing(('all',), products)
+        return products
+
+    def get_products_page(self, page_size=50, continuation_token=None):
+        key = ('page', page_size, continuation_token)
+        cached = self._cached_listing(key)
+        if cached is not None:
+            return cached
+        products, next_token = self.repository.get_products_page(page_size, continuation_token)
+        self._store_listing(key, products, next_token)
+        return products, next_token
+
+    # Writes that touch products
+
+    def _adjust_stock(self, quantities_by_product):
+        # Callers may still hold the cached object, so it is never changed
+        with self._stock_lock:
+            for product_id, delta in quantities_by_product.items():
+                product = self._products.peek(product_id)
+                if product is not None:
+                    self._products.replace(product_id, Product(
+                        product_id=product.product_id,
+                        name=product.name,
+                        price=product.price,
+                        description=product.description,
+                        stock_quantity=product.stock_quantity + delta
+                    ))
+
+    def create_product(self, product):
+        created = self.repository.create_product(product)
+        if created:
+            self._listings.clear()
+        return created
+
+    def bulk_create_products(self, products):
+        skipped = self.repository.bulk_create_products(products)
+        self._listings.clear()
+        return skipped
+
+    def delete_product(self, product_id):
+        try:
+            return self.repository.delete_product(product_id)
+        finally:
+            self._products.pop(product_id)
+            self._listings.clear()
+
+    def place_order(self, customer, cart_items, shipping_address, total_price=None):
+        order, order_items = self.repository.place_order(customer, cart_items, shipping_address, total_price)
+        if order:
+            deltas = {}
+            for item in order_items:
+                deltas[item.product_id] = deltas.get(item.product_id, 0) - item.quantity
+            self._adjust_stock(deltas)
+        return order, order_items
+
+    def cancel_order(self, order_id, restocked=None):
+        def adjust(quantities_by_product):
+            self._adjust_stock(quantities_by_product)
+            if restocked is not None:
+                restocked(quantities_by_product)
+
+        return self.repository.cancel_order(order_id, adjust)
+
+    # Pass-through
+
+    def create_customer(self, customer):
+        return self.repository.create_customer(customer)
+
+    def delete_customer(self, customer_id):
+        return self.repository.delete_customer(customer_id)
+
+    def get_existing_emails(self, emails):
+        return self.repository.get_existing_emails(emails)
+
+    def bulk_create_customers(self, customers, prepare=None):
+        return self.repository.bulk_create_customers(customers, prepare)
+
+    def add_to_cart(self, customer, product, quantity):
+        return self.repository.add_to_cart(customer, product, quantity)
+
+    def remove_from_cart(self, customer, product):
+        return self.repository.remove_from_cart(customer, product)
+
+    def get_all_from_cart(self, customer):
+        return self.repository.get_all_from_cart(customer)
+
+    def get_cart_summary(self, customer):
+        return self.repository.get_cart_summary(customer)
+
+    def get_orders_by_customer(self, customer_id):
+        return self.repository.get_orders_by_customer(customer_id)
+
+    def get_orders_by_date(self, order_date):
+        return self.repository.get_orders_by_date(order_date)
+
+    def get_orders_between(self, start, end, group_by=None):
+        return self.repository.get_orders_between(start, end, group_by)
+
+    def get_customers_page(self, page_size=50, continuation_token=None):
+        return self.repository.get_customers_page(page_size, continuation_token)
+
+    def get_orders_by_customer_page(self, customer_id, page_size=20, continuation_token=None):
+        return self.repository.get_orders_by_customer_page(customer_id, page_size, continuation_token)
+
+    def iter_orders_by_customer(self, customer_id):
+        return self.repository.iter_orders_by_customer(customer_id)
+
+    def iter_orders_by_date(self, order_date):
+        return self.repository.iter_orders_by_date(order_date)
+
+    def iter_orders_between(self, start, end):
+        return self.repository.iter_orders_between(start, end)
+
+    def get_products_frame(self):
+        return self.repository.get_products_frame()
+
+    def get_order_lines_frame_by_date(self, order_date):
+        return self.repository.get_order_lines_frame_by_date(order_date)
+
+    def get_order_lines_frame_between(self, start, end):
+        return self.repository.get_order_lines_frame_between(start, end)
+
+    def rebuild_sales_summaries(self):
+        return self.repository.rebuild_sales_summaries()
+
+    def archive_orders(self, retention_days, batch_size=None):
+        return self.repository.archive_orders(retention_days, batch_size)
+
+    def get_daily_product_sales(self, start, end, product_id=None):
+        return self.repository.get_daily_product_sales(start, end, product_id)
+
+    def get_best_sellers(self, start, end, limit=10):
+        return self.repository.get_best_sellers(start, end, limit)
+
+    def get_customer_sales(self, customer_id):
+        return self.repository.get_customer_sales(customer_id)
@@ -33,11 +33,11 @@ class OrderProcessorRepository(ABC):
         pass
 
     @abstractmethod
-    def place_order(self, customer, products_quantities, shipping_address):
+    def place_order(self, customer, cart_items, shipping_address, total_price=None):
         pass
 
     @abstractmethod
-    def cancel_order(self, order_id):
+    def cancel_order(self, order_id, restocked=None):
         pass
 
     @abstractmethod
@@ -46,4 +46,88 @@ class OrderProcessorRepository(ABC):
 
     @abstractmethod
     def get_orders_by_date(self, order_date):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_orders_between(self, start, end, group_by=None):
+        pass
+
+    @abstractmethod
+    def get_products_page(self, page_size=50, continuation_token=None):
+        pass
+
+    @abstractmethod
+    def get_customers_page(self, page_size=50, continuation_token=None):
+        pass
+
+    @abstractmethod
+    def get_orders_by_customer_page(self, customer_id, page_size=20, continuation_token=None):
+        pass
+
+    @abstractmethod
+    def iter_orders_by_customer(self, customer_id):
+        pass
+
+    @abstractmethod
+    def iter_orders_by_date(self, order_date):
+        pass
+
+    @abstractmethod
+    def iter_orders_between(self, start, end):
+        pass
+
+    @abstractmethod
+    def get_product_by_id(self, product_id):
+        pass
+
+    @abstractmethod
+    def get_products_frame(self):
+        pass
+
+    @abstractmethod
+    def get_order_lines_frame_by_date(self, order_date):
+        pass
+
+    @abstractmethod
+    def get_order_lines_frame_between(self, start, end):
+        pass
+
+    @abstractmethod
+    def bulk_create_products(self, products):
+        pass
+
+    @abstractmethod
+    def get_existing_emails(self, emails):
+        pass
+
+    @abstractmethod
+    def bulk_create_customers(self, customers, prepare=None):
+        pass
+
+    @abstractmethod
+    def get_cart_summary(self, customer):
+        pass
+
+    @abstractmethod
+    def rebuild_sales_summaries(self):
+        pass
+
+    @abstractmethod
+    def get_daily_product_sales(self, start, end, product_id=None):
+        pass
+
+    @abstractmethod
+    def get_best_sellers(self, start, end, limit=10):
+        pass
+
+    @abstractmethod
+    def get_customer_sales(self, customer_id):
+        pass
+
+    @abstractmethod
+    def unit_of_work(self):
+        pass
+
+    @abstractmethod
+    def archive_orders(self, retention_days, batch_size=None):
+        pass
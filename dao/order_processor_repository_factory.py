@@ -0,0 +1,100 @@
+from util.db_property_util import DBPropertyUtil
+
+
+class OrderProcessorRepositoryFactory:
+    @staticmethod
+    def get_repository():
+        """
+        Builds the repository selected by the 'backend' key of the
+        [database] section (mysql by default, or sqlite), sharded when
+        [shards] (or [sqlite] shard_paths) lists shard databases, and
+        wrapped in the product cache when [cache] enabled=true
+        """
+        repository = OrderProcessorRepositoryFactory._create_backend()
+        repository = OrderProcessorRepositoryFactory._shard(repository)
+
+        cache_config = DBPropertyUtil.get_cache_properties()
+        if cache_config['enabled']:
+            from dao.cached_order_processor_repository import CachedOrderProcessorRepository
+            return CachedOrderProcessorRepository(repository,
+                                                  max_size=cache_config['max_size'],
+                                                  ttl=cache_config['ttl'])
+        return repository
+
+    @staticmethod
+    def get_async_repository():
+        """
+        The configured repository behind the asyncio interface. Calls run on
+        a worker pool sized like the [pool] (or [sqlite]) connection pool.
+        """
+        from dao.thread_offload_order_processor_repository import ThreadOffloadOrderProcessorRepository
+        pool_config = DBPropertyUtil.get_pool_properties()
+        pool_size = pool_config['pool_size']
+        if DBPropertyUtil.get_backend() == 'sqlite':
+            pool_size = DBPropertyUtil.get_sqlite_properties()['pool_size']
+        return ThreadOffloadOrderProcessorRepository(OrderProcessorRepositoryFactory.get_repository(),
+                                                     pool_size=pool_size,
+                                                     pool_timeout=pool_config['pool_timeout'])
+
+    @staticmethod
+    def _create_backend():
+        backend = DBPropertyUtil.get_backend()
+        metrics = OrderProcessorRepositoryFactory._create_metrics()
+
+        replica_config = DBPropertyUtil.get_replica_properties()
+
+        if backend == 'mysql':
+            from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+            router = None
+            if replica_config['hosts']:
+                from util.db_conn_util import DBConnUtil
+                from util.replica_router import ReplicaRouter
+                router = ReplicaRouter([pool.get_connection for pool in DBConnUtil.get_replica_pools()],
+                                       read_your_writes_window=replica_config['read_your_writes_window'])
+            return OrderProcessorRepositoryImpl(metrics=metrics, router=router)
+
+        if backend == 'sqlite':
+            from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+            sqlite_config = DBPropertyUtil.get_sqlite_properties()
+            return OrderProcessorRepositorySqliteImpl(
+                sqlite_config['path'],
+                pool_size=sqlite_config['pool_size'],
+                metrics=metrics,
+                replica_paths=sqlite_config['replica_paths'],
+                read_your_writes_window=replica_config['read_your_writes_window'])
+
+        raise ValueError(f"Unsupported database backend: {backend}")
+
+    @staticmethod
+    def _shard(catalog):
+        """
+        Wraps the backend in ShardedOrderProcessorRepository when shard
+        databases are configured; the backend becomes the catalog.
+        """
+        metrics = getattr(catalog, 'metrics', None)
+        if DBPropertyUtil.get_backend() == 'sqlite':
+            sqlite_config = DBPropertyUtil.get_sqlite_properties()
+            if not sqlite_config['shard_paths']:
+                return catalog
+            from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+            shards = [OrderProcessorRepositorySqliteImpl(path, pool_size=sqlite_config['pool_size'],
+                                                         metrics=metrics, foreign_keys=False)
+                      for path in sqlite_config['shard_paths']]
+        else:
+            from util.db_conn_util import DBConnUtil
+            pools = DBConnUtil.get_shard_pools()
+            if not pools:
+                return catalog
+            from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+            shards = [OrderProcessorRepositoryImpl(metrics=metrics, pool=pool) for pool in pools]
+
+        from dao.sharded_order_processor_repository import ShardedOrderProcessorRepository
+        return ShardedOrderProcessorRepository(catalog, shards)
+
+    @staticmethod
+    def _create_metrics():
+        metrics_config = DBPropertyUtil.get_metrics_properties()
+        if not metrics_config['enabled']:
+            return None
+        from util.query_metrics import QueryMetrics
+        return QueryMetrics(slow_query_ms=metrics_config['slow_query_ms'])
@@ -1,5 +1,11 @@
-from datetime import datetime
+import logging
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 import mysql.connector
+from mysql.connector import errorcode
 from dao.order_processor_repository import OrderProcessorRepository
 from entity.cart import Cart
 from entity.customer import Customer
@@ -9,19 +15,178 @@ from entity.product import Product
 from exception.CustomerNotFoundException import CustomerNotFoundException
 from exception.OrderNotFoundException import OrderNotFoundException
 from exception.ProductNotFoundException import ProductNotFoundException
+from util.continuation_token import ContinuationToken
 from util.db_conn_util import DBConnUtil
+from util.existence_cache import ExistenceCache
+from util.query_metrics import InstrumentedConnection
+from util.result_frame import ResultFrame
+from util.unit_of_work import UnitOfWork
+
+logger = logging.getLogger(__name__)
 
 
 class OrderProcessorRepositoryImpl(OrderProcessorRepository):
+    # Besides the OrderProcessorRepository methods, the public names here
+    # that take a cursor or connection (connection_for, lock_products,
+    # record_order, union_orders, order_sources, ...) and the SQL fragments
+    # below are the building blocks ShardedOrderProcessorRepository composes
+    # its catalog and shard repositories from.
+
+    # Rows fetched per round trip by the streaming iter_* methods
+    STREAM_BATCH_SIZE = 500
+
+    # Rows per multi-row INSERT in the bulk loaders
+    BULK_INSERT_ROWS = 1000
+
+    # Orders moved per archive_orders transaction
+    ARCHIVE_BATCH_SIZE = 500
+
+    # (orders, order_items) table pairs holding live and archived orders
+    LIVE_ORDER_TABLES = ('orders', 'order_items')
+    ARCHIVE_ORDER_TABLES = ('orders_archive', 'order_items_archive')
+
+    # Appended to SELECTs that must hold row locks until commit
+    LOCK_ROWS_CLAUSE = " FOR UPDATE"
+
+    # Bucket expressions for get_orders_between(group_by=...)
+    _PERIOD_EXPRESSIONS = {
+        'day': "DATE(o.order_date)",
+        'hour': "DATE_FORMAT(o.order_date, '%%Y-%%m-%%d %%H:00:00')"
+    }
+
+    # Converts a DECIMAL(10,2) money column to integer cents in SQL
+    CENTS_EXPRESSION = "CAST(ROUND({} * 100) AS SIGNED)"
+
+    # Seconds a customer/product id stays known-live after a successful
+    # lookup; 0 checks the database every time
+    EXISTENCE_CACHE_TTL = 5.0
+
+    # Tables with an existence check: table -> (key column, not-found exception)
+    _EXISTENCE_CHECKS = {
+        'customers': ('customer_id', CustomerNotFoundException),
+        'products': ('product_id', ProductNotFoundException)
+    }
+
+    # Methods that only read and may be served by a read replica. Checkout
+    # reads (get_existing_emails ahead of an insert) stay on the primary.
+    _READ_ONLY_METHODS = frozenset({
+        'get_all_from_cart', 'get_cart_summary',
+        'get_orders_by_customer', 'get_orders_by_customer_page', 'iter_orders_by_customer',
+        'get_order_by_id', 'get_orders_by_date', 'get_orders_between',
+        'iter_orders_by_date', 'iter_orders_between',
+        'get_all_products', 'get_product_by_id', 'get_products_page',
+        'get_all_customers', 'get_customers_page',
+        'get_products_frame', 'get_order_lines_frame_by_date', 'get_order_lines_frame_between',
+        'get_daily_product_sales', 'get_best_sellers', 'get_customer_sales'
+    })
+
+    def __init__(self, metrics=None, router=None, pool=None):
+        self._live_ids = ExistenceCache(ttl=self.EXISTENCE_CACHE_TTL)
+        # An archive boundary seen earlier. It only ever rises, so this is
+        # a lower bound that proves the archive is needed without a read
+        self._known_archived_before = None
+        # util.query_metrics.QueryMetrics collecting per-method and
+        # per-statement timings; None leaves connections uninstrumented
+        self.metrics = metrics
+        # util.replica_router.ReplicaRouter sending reads to replicas;
+        # None sends everything to the primary
+        self.router = router
+        # ConnectionPool to borrow from instead of the shared DBConnUtil
+        # pool, e.g. for one shard of a ShardedOrderProcessorRepository
+        self.pool = pool
+        # The unit of work active on each thread, if any
+        self._local = threading.local()
+
+    def connection_for(self, method):
+        # method is the public repository method borrowing the connection:
+        # metrics are charged to it and the router sends it to a replica if
+        # it is in _READ_ONLY_METHODS
+        unit = getattr(self._local, 'unit', None)
+        if self.metrics is None and (unit is not None or self.router is None):
+            return unit.join() if unit is not None else self._borrow_connection()
+
+        started = perf_counter()
+        if unit is not None:
+            connection = unit.join()
+        elif self.router is not None:
+            connection = self.router.connect(method in self._READ_ONLY_METHODS, self._borrow_connection)
+        else:
+            connection = self._borrow_connection()
+        if self.metrics is None:
+            return connection
+        self.metrics.observe_acquire(perf_counter() - started)
+        return InstrumentedConnection(connection, self.metrics, method, started)
+
+    def _borrow_connection(self):
+        # Backends override this to serve connections from their own pool
+        if self.pool is not None:
+            return self.pool.get_connection()
+        return DBConnUtil.get_connection()
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Runs every repository call made on this thread inside the block on
+        one connection and one transaction, committed when the block exits:
+
+            with repository.unit_of_work():
+                for product, quantity in picks:
+                    repository.add_to_cart(customer, product, quantity)
+                repository.place_order(customer, repository.get_all_from_cart(customer), address)
+
+        An exception in the block, or a call inside it that fails and rolls
+        back, undoes the whole unit; the latter raises
+        UnitOfWorkRolledBackException. Nested blocks join the outer unit.
+        Outside a block each call still uses its own connection and commit.
+        """
+        unit = getattr(self._local, 'unit', None)
+        if unit is not None:
+            yield unit
+            return
+
+        if self.router is not None:
+            # The unit writes, so it takes the router's write path and its
+            # reads stay on the primary for the read-your-writes window
+            unit = UnitOfWork(self.router.connect(False, self._borrow_connection))
+        else:
+            unit = UnitOfWork(self._borrow_connection())
+        self._local.unit = unit
+        try:
+            yield unit
+            unit.commit()
+        except BaseException:
+            unit.rollback()
+            # Ids marked live inside the unit may have been rolled back
+            self._live_ids.clear()
+            raise
+        finally:
+            self._local.unit = None
+            unit.close()
+
+    def ensure_exists(self, cursor, table, key):
+        """
+        Raises the table's not-found exception unless the row exists. Ids
+        seen recently are answered from the existence cache; otherwise this
+        is a primary-key probe that reads no columns.
+        """
+        if self._live_ids.is_live(table, key):
+            return
+        key_column, not_found = self._EXISTENCE_CHECKS[table]
+        cursor.execute(f"SELECT 1 FROM {table} WHERE {key_column} = %s", (key,))
+        # fetchall also drains unbuffered cursors
+        if not cursor.fetchall():
+            raise not_found(key)
+        self._live_ids.mark_live(table, key)
+
     def create_product(self, product):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('create_product')
             cursor = connection.cursor()
 
             cursor.execute("SELECT * FROM products WHERE name = %s", (product.name,))
             if cursor.fetchone():
-                print("Product already exists!")
+                logger.warning("Product already exists!")
                 return False
 
             cursor.execute(
@@ -32,7 +197,7 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
             return True
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
             return False
@@ -41,15 +206,64 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                 cursor.close()
                 connection.close()
 
+    def bulk_create_products(self, products):
+        """
+        Inserts products in multi-row INSERTs of BULK_INSERT_ROWS rows and a
+        single commit. As in create_product, a product whose name already
+        exists is not inserted. Returns the list of products skipped for
+        that reason, or None if the chunk failed and was rolled back.
+        """
+        connection = None
+        try:
+            connection = self.connection_for('bulk_create_products')
+            cursor = connection.cursor()
+
+            existing = set()
+            for start in range(0, len(products), self.BULK_INSERT_ROWS):
+                names = [product.name for product in products[start:start + self.BULK_INSERT_ROWS]]
+                cursor.execute(
+                    "SELECT name FROM products WHERE name IN (" + ", ".join(["%s"] * len(names)) + ")",
+                    names
+                )
+                # casefold: MySQL's default collation compares names case-insensitively
+                existing.update(name.casefold() for (name,) in cursor.fetchall())
+
+            skipped = [product for product in products if product.name.casefold() in existing]
+            new_products = [product for product in products if product.name.casefold() not in existing]
+
+            for start in range(0, len(new_products), self.BULK_INSERT_ROWS):
+                batch = new_products[start:start + self.BULK_INSERT_ROWS]
+                params = []
+                for product in batch:
+                    params += [product.name, product.price, product.description, product.stock_quantity]
+                cursor.execute(
+                    "INSERT INTO products (name, price, description, stock_quantity) VALUES "
+                    + ", ".join(["(%s, %s, %s, %s)"] * len(batch)),
+                    params
+                )
+
+            connection.commit()
+            return skipped
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
     def create_customer(self, customer):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('create_customer')
             cursor = connection.cursor()
 
             cursor.execute("SELECT * FROM customers WHERE email = %s", (customer.email,))
             if cursor.fetchone():
-                print("Customer already exists!")
+                logger.warning("Customer already exists!")
                 return False
 
             cursor.execute(
@@ -60,13 +274,13 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
             return True
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
             return False
 
         except Exception as e:
-            print(f"Unexpected error: {e}")
+            logger.error("Unexpected error: %s", e)
             return False
 
         finally:
@@ -74,22 +288,99 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                 cursor.close()
                 connection.close()
 
-    def delete_product(self, product_id):
+    def get_existing_emails(self, emails):
+        """
+        The subset of emails (compared lower-cased) that already belong to a
+        customer, or None on a database error
+        """
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('get_existing_emails')
             cursor = connection.cursor()
 
-            cursor.execute("SELECT * FROM products WHERE product_id = %s", (product_id,))
-            if not cursor.fetchone():
-                raise ProductNotFoundException(product_id)
+            existing = set()
+            for start in range(0, len(emails), self.BULK_INSERT_ROWS):
+                batch = emails[start:start + self.BULK_INSERT_ROWS]
+                cursor.execute(
+                    "SELECT email FROM customers WHERE email IN (" + ", ".join(["%s"] * len(batch)) + ")",
+                    batch
+                )
+                existing.update(email.lower() for (email,) in cursor.fetchall())
+            return {email for email in emails if email.lower() in existing}
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
 
+    def bulk_create_customers(self, customers, prepare=None):
+        """
+        Inserts customers in multi-row INSERTs of BULK_INSERT_ROWS rows and a
+        single commit; passwords are stored as given, so hash them first.
+        Customers whose email is already registered are not inserted.
+        Returns the list of customers skipped for that reason, or None if
+        the chunk failed and was rolled back.
+
+        prepare, if given, is called with the customers about to be
+        inserted once the registered ones are dropped, so expensive work
+        such as password hashing is only done for new accounts.
+        """
+        existing = self.get_existing_emails([customer.email for customer in customers])
+        if existing is None:
+            return None
+        skipped = [customer for customer in customers if customer.email in existing]
+        new_customers = [customer for customer in customers if customer.email not in existing]
+        if prepare is not None:
+            prepare(new_customers)
+
+        connection = None
+        try:
+            connection = self.connection_for('bulk_create_customers')
+            cursor = connection.cursor()
+
+            for start in range(0, len(new_customers), self.BULK_INSERT_ROWS):
+                batch = new_customers[start:start + self.BULK_INSERT_ROWS]
+                params = []
+                for customer in batch:
+                    params += [customer.name, customer.email, customer.password]
+                cursor.execute(
+                    "INSERT INTO customers (name, email, password) VALUES "
+                    + ", ".join(["(%s, %s, %s)"] * len(batch)),
+                    params
+                )
+
+            connection.commit()
+            return skipped
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def delete_product(self, product_id):
+        connection = None
+        try:
+            connection = self.connection_for('delete_product')
+            cursor = connection.cursor()
+
+            # The row count of the DELETE doubles as the existence check
             cursor.execute("DELETE FROM products WHERE product_id = %s", (product_id,))
+            self._live_ids.forget('products', product_id)
+            if cursor.rowcount == 0:
+                raise ProductNotFoundException(product_id)
             connection.commit()
             return True
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
             return False
@@ -101,19 +392,19 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
     def delete_customer(self, customer_id):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('delete_customer')
             cursor = connection.cursor()
 
-            cursor.execute("SELECT * FROM customers WHERE customer_id = %s", (customer_id,))
-            if not cursor.fetchone():
-                raise CustomerNotFoundException(customer_id)
-
+            # The row count of the DELETE doubles as the existence check
             cursor.execute("DELETE FROM customers WHERE customer_id = %s", (customer_id,))
+            self._live_ids.forget('customers', customer_id)
+            if cursor.rowcount == 0:
+                raise CustomerNotFoundException(customer_id)
             connection.commit()
             return True
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
             return False
@@ -125,43 +416,24 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
     def add_to_cart(self, customer, product, quantity):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('add_to_cart')
             cursor = connection.cursor()
 
-            cursor.execute("SELECT * FROM customers WHERE customer_id = %s", (customer.customer_id,))
-            if not cursor.fetchone():
-                raise CustomerNotFoundException(customer.customer_id)
-
-            cursor.execute("SELECT * FROM products WHERE product_id = %s", (product.product_id,))
-            if not cursor.fetchone():
-                raise ProductNotFoundException(product.product_id)
-
-            cursor.execute(
-                "SELECT * FROM cart WHERE customer_id = %s AND product_id = %s",
-                (customer.customer_id, product.product_id)
-            )
-            existing_item = cursor.fetchone()
-
-            if existing_item:
-                new_quantity = existing_item[3] + quantity
-                cursor.execute(
-                    "UPDATE cart SET quantity = %s WHERE cart_id = %s",
-                    (new_quantity, existing_item[0])
-                )
-                cart_id = existing_item[0]
-            else:
-                cursor.execute(
-                    "INSERT INTO cart (customer_id, product_id, quantity) VALUES (%s, %s, %s)",
-                    (customer.customer_id, product.product_id, quantity)
-                )
-                cart_id = cursor.lastrowid
+            # One atomic upsert; the cart foreign keys report a missing
+            # customer or product instead of two existence pre-checks
+            try:
+                cart_id = self.upsert_cart_item(cursor, customer.customer_id, product.product_id, quantity)
+            except mysql.connector.IntegrityError as e:
+                if e.errno != errorcode.ER_NO_REFERENCED_ROW_2:
+                    raise
+                self._raise_missing_reference(cursor, customer.customer_id, product.product_id)
 
             connection.commit()
             return Cart(cart_id=cart_id, customer_id=customer.customer_id,
                         product_id=product.product_id, quantity=quantity)
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
             return None
@@ -170,20 +442,36 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                 cursor.close()
                 connection.close()
 
+    def upsert_cart_item(self, cursor, customer_id, product_id, quantity):
+        # LAST_INSERT_ID(cart_id) makes lastrowid report the existing row on update
+        cursor.execute(
+            """INSERT INTO cart (customer_id, product_id, quantity)
+               VALUES (%s, %s, %s)
+               ON DUPLICATE KEY UPDATE cart_id  = LAST_INSERT_ID(cart_id),
+                                       quantity = quantity + VALUES(quantity)""",
+            (customer_id, product_id, quantity)
+        )
+        return cursor.lastrowid
+
+    def _accumulate_clause(self, key_columns, value_columns):
+        # Upsert tail that adds the new values onto an existing row
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(
+            f"{column} = {column} + VALUES({column})" for column in value_columns)
+
+    def _raise_missing_reference(self, cursor, customer_id, product_id):
+        # Only runs after a foreign key violation, to tell which parent is
+        # missing; either cached id may be stale, so drop both first
+        self._live_ids.forget('customers', customer_id)
+        self._live_ids.forget('products', product_id)
+        self.ensure_exists(cursor, 'customers', customer_id)
+        raise ProductNotFoundException(product_id)
+
     def remove_from_cart(self, customer, product):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('remove_from_cart')
             cursor = connection.cursor()
 
-            cursor.execute("SELECT * FROM customers WHERE customer_id = %s", (customer.customer_id,))
-            if not cursor.fetchone():
-                raise CustomerNotFoundException(customer.customer_id)
-
-            cursor.execute("SELECT * FROM products WHERE product_id = %s", (product.product_id,))
-            if not cursor.fetchone():
-                raise ProductNotFoundException(product.product_id)
-
             cursor.execute(
                 "SELECT * FROM cart WHERE customer_id = %s AND product_id = %s",
                 (customer.customer_id, product.product_id)
@@ -191,7 +479,11 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
             cart_item = cursor.fetchone()
 
             if not cart_item:
-                print("Product not found in cart!")
+                # A cart row implies both parents exist (foreign keys), so
+                # only a miss needs to tell which one, if any, is missing
+                self.ensure_exists(cursor, 'customers', customer.customer_id)
+                self.ensure_exists(cursor, 'products', product.product_id)
+                logger.warning("Product not found in cart!")
                 return False
 
             cursor.execute(
@@ -204,7 +496,7 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                         product_id=cart_item[2], quantity=cart_item[3])
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
             return None
@@ -216,13 +508,9 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
     def get_all_from_cart(self, customer):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('get_all_from_cart')
             cursor = connection.cursor(dictionary=True)
 
-            cursor.execute("SELECT * FROM customers WHERE customer_id = %s", (customer.customer_id,))
-            if not cursor.fetchone():
-                raise CustomerNotFoundException(customer.customer_id)
-
             cursor.execute("""
                            SELECT c.cart_id,
                                   c.customer_id,
@@ -236,9 +524,14 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                                     JOIN products p ON c.product_id = p.product_id
                            WHERE c.customer_id = %s
                            """, (customer.customer_id,))
+            rows = cursor.fetchall()
+
+            # Only an empty cart needs to know whether the customer exists
+            if not rows:
+                self.ensure_exists(cursor, 'customers', customer.customer_id)
 
             cart_items = []
-            for item in cursor.fetchall():
+            for item in rows:
                 product = Product(
                     product_id=item['product_id'],
                     name=item['name'],
@@ -257,98 +550,144 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
             return cart_items
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             return []
         finally:
             if connection and connection.is_connected():
                 cursor.close()
                 connection.close()
 
-    def place_order(self, customer, cart_items, shipping_address, total_price=None):
+    @staticmethod
+    def from_cents(cents):
+        return (Decimal(int(cents or 0)) / 100).quantize(Decimal('0.01'))
+
+    def get_cart_summary(self, customer):
+        """
+        The customer's cart priced in one query: {'items': [(Cart, Product,
+        line_total)], 'item_count': units in the cart, 'total': grand total}.
+        Money is summed as integer cents in SQL and returned as Decimal.
+        """
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
-            cursor = connection.cursor()
+            connection = self.connection_for('get_cart_summary')
+            cursor = connection.cursor(dictionary=True)
 
-            # Validate customer exists
-            cursor.execute("SELECT * FROM customers WHERE customer_id = %s", (customer.customer_id,))
-            if not cursor.fetchone():
-                raise CustomerNotFoundException(customer.customer_id)
+            line_cents = f"{self.CENTS_EXPRESSION.format('p.price')} * c.quantity"
+            cursor.execute(f"""
+                           SELECT c.cart_id,
+                                  c.customer_id,
+                                  c.product_id,
+                                  c.quantity,
+                                  p.name,
+                                  p.price,
+                                  p.description,
+                                  p.stock_quantity,
+                                  {line_cents}                AS line_cents,
+                                  SUM(c.quantity) OVER ()     AS item_count,
+                                  SUM({line_cents}) OVER ()   AS total_cents
+                           FROM cart c
+                                    JOIN products p ON c.product_id = p.product_id
+                           WHERE c.customer_id = %s
+                           ORDER BY c.cart_id
+                           """, (customer.customer_id,))
+            rows = cursor.fetchall()
 
-            # Calculate total price if not provided
-            if total_price is None:
-                total_price = 0.0
-                for cart_item in cart_items:
-                    cart, product = cart_item
-                    quantity = cart.quantity
-                    stock = product.stock_quantity
+            if not rows:
+                self.ensure_exists(cursor, 'customers', customer.customer_id)
+                return {'items': [], 'item_count': 0, 'total': self.from_cents(0)}
 
-                    if stock < quantity:
-                        print(f"Not enough stock for {product.name}. Available: {stock}, Requested: {quantity}")
-                        return None, []
+            items = []
+            for row in rows:
+                cart = Cart(
+                    cart_id=row['cart_id'],
+                    customer_id=row['customer_id'],
+                    product_id=row['product_id'],
+                    quantity=row['quantity']
+                )
+                product = Product(
+                    product_id=row['product_id'],
+                    name=row['name'],
+                    price=row['price'],
+                    description=row['description'],
+                    stock_quantity=row['stock_quantity']
+                )
+                items.append((cart, product, self.from_cents(row['line_cents'])))
 
-                    # Convert Decimal to float for consistent calculations
-                    total_price += float(product.price) * quantity
+            return {
+                'items': items,
+                'item_count': int(rows[0]['item_count']),
+                'total': self.from_cents(rows[0]['total_cents'])
+            }
 
-            # Convert total_price to string to avoid DECIMAL type issues
-            total_price_str = "{:.2f}".format(float(total_price))
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return {'items': [], 'item_count': 0, 'total': self.from_cents(0)}
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
 
-            # Create order
-            cursor.execute(
-                """INSERT INTO orders
-                       (customer_id, order_date, total_price, shipping_address)
-                   VALUES (%s, %s, %s, %s)""",
-                (customer.customer_id, datetime.now(), total_price_str, shipping_address)
-            )
-            order_id = cursor.lastrowid
+    def place_order(self, customer, cart_items, shipping_address, total_price=None):
+        """
+        Checks out cart_items ([(Cart, Product)]) in one transaction. The
+        total is always computed from the product rows locked by this
+        transaction. total_price, if given, is the total the customer
+        confirmed: when the locked prices no longer add up to it the order
+        is refused rather than charged at a different amount.
+        """
+        connection = None
+        try:
+            connection = self.connection_for('place_order')
+            cursor = connection.cursor()
 
-            # Process order items
-            order_items = []
-            for cart_item in cart_items:
-                cart, product = cart_item
-                # Create order item
-                cursor.execute(
-                    """INSERT INTO order_items
-                           (order_id, product_id, quantity)
-                       VALUES (%s, %s, %s)""",
-                    (order_id, product.product_id, cart.quantity)
-                )
+            # Validate customer exists (orders has no foreign key to lean on)
+            self.ensure_exists(cursor, 'customers', customer.customer_id)
 
-                # Update product stock
-                cursor.execute(
-                    """UPDATE products
-                       SET stock_quantity = stock_quantity - %s
-                       WHERE product_id = %s""",
-                    (cart.quantity, product.product_id)
-                )
+            quantities_by_product = {}
+            for cart, product in cart_items:
+                quantities_by_product[product.product_id] = (
+                    quantities_by_product.get(product.product_id, 0) + cart.quantity)
 
-                order_items.append(OrderItem(
-                    order_item_id=cursor.lastrowid,
-                    order_id=order_id,
-                    product_id=product.product_id,
-                    quantity=cart.quantity
-                ))
+            connection.start_transaction()
+            locked_products = self.lock_products(cursor, quantities_by_product)
+            if locked_products is None:
+                connection.rollback()
+                return None, []
+
+            # Price the order from the locked rows, in exact integer cents
+            order_total = self.from_cents(sum(locked_products[product_id][1] * quantity
+                                               for product_id, quantity in quantities_by_product.items()))
+            if total_price is not None and Decimal(str(total_price)).quantize(Decimal('0.01')) != order_total:
+                logger.warning("Prices changed since the order summary (now $%s). Order was not placed.", order_total)
+                connection.rollback()
+                return None, []
 
-            # Clear cart
-            cursor.execute("DELETE FROM cart WHERE customer_id = %s", (customer.customer_id,))
+            if not self.decrement_stock(cursor, quantities_by_product):
+                logger.warning("Stock changed during checkout. Order was not placed.")
+                connection.rollback()
+                return None, []
+
+            order_date = datetime.now()
+            order_id, order_items = self.record_order(cursor, customer.customer_id, order_date, order_total,
+                                                       shipping_address, cart_items, locked_products)
 
             connection.commit()
 
             return Order(
                 order_id=order_id,
                 customer_id=customer.customer_id,
-                order_date=datetime.now(),
-                total_price=float(total_price_str),  # Return as float
+                order_date=order_date,
+                total_price=order_total,
                 shipping_address=shipping_address
             ), order_items
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
             return None, []
         except Exception as e:
-            print(f"Error placing order: {e}")
+            logger.error("Error placing order: %s", e)
             if connection:
                 connection.rollback()
             return None, []
@@ -357,45 +696,33 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                 cursor.close()
                 connection.close()
 
-    def cancel_order(self, order_id):
+    def cancel_order(self, order_id, restocked=None):
+        """
+        Deletes the order and returns its quantities to stock. restocked, if
+        given, is called with {product_id: quantity} once that is committed,
+        e.g. to update a cache of products. Returns True on success.
+        """
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('cancel_order')
             cursor = connection.cursor(dictionary=True)
 
-            # 1. Verify order exists and get details
-            cursor.execute("SELECT * FROM orders WHERE order_id = %s", (order_id,))
-            order = cursor.fetchone()
-            if not order:
-                raise OrderNotFoundException(order_id)
-
-            # 2. Get all order items to restore stock
-            cursor.execute("SELECT * FROM order_items WHERE order_id = %s", (order_id,))
-            order_items = cursor.fetchall()
-
-            # 3. Restore product quantities
-            for item in order_items:
-                cursor.execute(
-                    "UPDATE products SET stock_quantity = stock_quantity + %s WHERE product_id = %s",
-                    (item['quantity'], item['product_id'])
-                )
-
-            # 4. Delete order items
-            cursor.execute("DELETE FROM order_items WHERE order_id = %s", (order_id,))
-
-            # 5. Delete the order
-            cursor.execute("DELETE FROM orders WHERE order_id = %s", (order_id,))
+            connection.start_transaction()
+            quantities_by_product = self.remove_order(cursor, order_id)
+            self.restore_stock(cursor, quantities_by_product)
 
             connection.commit()
+            if restocked is not None:
+                restocked(quantities_by_product)
             return True
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
             return False
         except Exception as e:
-            print(f"Error canceling order: {e}")
+            logger.error("Error canceling order: %s", e)
             if connection:
                 connection.rollback()
             return False
@@ -404,18 +731,333 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                 cursor.close()
                 connection.close()
 
+    def lock_products(self, cursor, quantities_by_product):
+        """
+        Locks the product rows of a checkout and checks their stock, on the
+        caller's transaction. Returns {product_id: (name, price_cents,
+        stock)}, or None (logged) when a product is short of stock.
+        """
+        # Lock every product row of the cart in one statement, always in
+        # product_id order, so concurrent checkouts queue up instead of
+        # deadlocking, then validate stock against the locked rows rather
+        # than the snapshot the caller read earlier
+        product_ids = sorted(quantities_by_product)
+        locked_products = {}
+        if product_ids:
+            cursor.execute(
+                "SELECT product_id, name, " + self.CENTS_EXPRESSION.format('price')
+                + ", stock_quantity FROM products WHERE product_id IN ("
+                + ", ".join(["%s"] * len(product_ids)) + ") ORDER BY product_id"
+                + self.LOCK_ROWS_CLAUSE,
+                product_ids
+            )
+            for product_id, name, price_cents, stock in cursor.fetchall():
+                locked_products[product_id] = (name, price_cents, stock)
+
+        for product_id in product_ids:
+            if product_id not in locked_products:
+                raise ProductNotFoundException(product_id)
+            name, price_cents, stock = locked_products[product_id]
+            if stock < quantities_by_product[product_id]:
+                logger.warning("Not enough stock for %s. Available: %s, Requested: %s",
+                               name, stock, quantities_by_product[product_id])
+                return None
+        return locked_products
+
+    def decrement_stock(self, cursor, quantities_by_product):
+        """
+        Takes a checkout's quantities off stock in one UPDATE. Returns False
+        if any row no longer had enough stock.
+        """
+        product_ids = sorted(quantities_by_product)
+        if not product_ids:
+            return True
+        # The stock guard makes the decrement fail rather than oversell,
+        # even if a row was changed outside this locking protocol
+        case_params = []
+        for product_id in product_ids:
+            case_params.extend((product_id, quantities_by_product[product_id]))
+        case_sql = "CASE product_id " + " ".join(["WHEN %s THEN %s"] * len(product_ids)) + " END"
+        cursor.execute(
+            "UPDATE products SET stock_quantity = stock_quantity - " + case_sql
+            + " WHERE product_id IN (" + ", ".join(["%s"] * len(product_ids)) + ")"
+            + " AND stock_quantity >= " + case_sql,
+            case_params + product_ids + case_params
+        )
+        return cursor.rowcount == len(product_ids)
+
+    def restore_stock(self, cursor, quantities_by_product):
+        for product_id, quantity in quantities_by_product.items():
+            cursor.execute(
+                "UPDATE products SET stock_quantity = stock_quantity + %s WHERE product_id = %s",
+                (quantity, product_id)
+            )
+
+    def record_order(self, cursor, customer_id, order_date, order_total, shipping_address,
+                      cart_items, locked_products, order_id=None):
+        """
+        Writes the order, its lines and its sales, and empties the cart, on
+        the caller's transaction. order_id is generated unless given.
+        Returns (order_id, [OrderItem]).
+        """
+        if order_id is None:
+            cursor.execute(
+                """INSERT INTO orders
+                       (customer_id, order_date, total_price, shipping_address)
+                   VALUES (%s, %s, %s, %s)""",
+                (customer_id, order_date, order_total, shipping_address)
+            )
+            order_id = cursor.lastrowid
+        else:
+            cursor.execute(
+                """INSERT INTO orders
+                       (order_id, customer_id, order_date, total_price, shipping_address)
+                   VALUES (%s, %s, %s, %s, %s)""",
+                (order_id, customer_id, order_date, order_total, shipping_address)
+            )
+
+        # Write every order line in one INSERT, so the number of statements
+        # does not grow with the size of the cart
+        order_items = []
+        quantities_by_product = {}
+        if cart_items:
+            # Each line records the price it was sold at
+            line_rows = []
+            for cart, product in cart_items:
+                line_rows.extend((order_id, product.product_id, cart.quantity,
+                                  self.from_cents(locked_products[product.product_id][1])))
+                quantities_by_product[product.product_id] = (
+                    quantities_by_product.get(product.product_id, 0) + cart.quantity)
+
+            cursor.execute(
+                "INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES "
+                + ", ".join(["(%s, %s, %s, %s)"] * len(cart_items)),
+                line_rows
+            )
+
+            # Read back the generated ids instead of trusting lastrowid
+            cursor.execute(
+                """SELECT order_item_id, product_id, quantity
+                   FROM order_items
+                   WHERE order_id = %s
+                   ORDER BY order_item_id""",
+                (order_id,)
+            )
+            for order_item_id, product_id, quantity in cursor.fetchall():
+                order_items.append(OrderItem(
+                    order_item_id=order_item_id,
+                    order_id=order_id,
+                    product_id=product_id,
+                    quantity=quantity
+                ))
+
+        self.apply_sales(cursor, customer_id, order_date.date(), {
+            product_id: (quantity, locked_products[product_id][1] * quantity)
+            for product_id, quantity in quantities_by_product.items()
+        }, sign=1)
+
+        # Clear cart
+        cursor.execute("DELETE FROM cart WHERE customer_id = %s", (customer_id,))
+        return order_id, order_items
+
+    def remove_order(self, cursor, order_id, tables=None):
+        """
+        Deletes an order, its lines and its sales, on the caller's
+        transaction; cursor must be a dictionary cursor. tables is the
+        (orders, order_items) pair holding it, the live tables by default.
+        Returns the quantities to put back on stock as {product_id: quantity}.
+        """
+        orders, order_items = tables or self.LIVE_ORDER_TABLES
+        # Verify the order exists and lock it, so a concurrent cancel of
+        # the same order cannot restore stock or sales twice
+        cursor.execute(f"""
+                       SELECT order_id, customer_id, order_date,
+                              {self.CENTS_EXPRESSION.format('total_price')} AS total_cents
+                       FROM {orders}
+                       WHERE order_id = %s{self.LOCK_ROWS_CLAUSE}
+                       """, (order_id,))
+        order = cursor.fetchone()
+        if not order:
+            raise OrderNotFoundException(order_id)
+
+        # The order's lines priced as they were sold (lines written before
+        # unit_price existed fall back to the current price, as the summary
+        # rebuild does)
+        cursor.execute(f"""
+                       SELECT oi.product_id,
+                              oi.quantity,
+                              {self.CENTS_EXPRESSION.format('COALESCE(oi.unit_price, p.price)')} AS price_cents
+                       FROM {order_items} oi
+                                LEFT JOIN products p ON oi.product_id = p.product_id
+                       WHERE oi.order_id = %s
+                       """, (order_id,))
+        lines = {}
+        for item in cursor.fetchall():
+            units, revenue_cents = lines.get(item['product_id'], (0, 0))
+            lines[item['product_id']] = (units + item['quantity'],
+                                         revenue_cents + (item['price_cents'] or 0) * item['quantity'])
+
+        # Take the order back out of the sales summaries, then delete it
+        self.apply_sales(cursor, order['customer_id'], self.to_datetime(order['order_date']).date(),
+                          lines, sign=-1, order_total_cents=order['total_cents'])
+        cursor.execute(f"DELETE FROM {order_items} WHERE order_id = %s", (order_id,))
+        cursor.execute(f"DELETE FROM {orders} WHERE order_id = %s", (order_id,))
+        return {product_id: units for product_id, (units, _) in lines.items()}
+
+    def archive_orders(self, retention_days, batch_size=None):
+        """
+        Moves orders placed more than retention_days ago, with their lines,
+        to orders_archive and order_items_archive. Each batch of batch_size
+        orders (oldest first) is copied and deleted in its own short
+        transaction, so row locks are held for one batch at a time.
+        Returns the number of orders moved, or None (logged) on a database
+        error; batches committed before the error stay archived.
+
+        Archived orders still count in the sales summaries and are read
+        back by the order history methods, but can no longer be cancelled.
+        """
+        batch_size = batch_size or self.ARCHIVE_BATCH_SIZE
+        cutoff = datetime.now().replace(microsecond=0) - timedelta(days=retention_days)
+        connection = None
+        try:
+            connection = self.connection_for('archive_orders')
+            cursor = connection.cursor()
+
+            # Readers start consulting the archive before the first order
+            # lands there
+            connection.start_transaction()
+            self._raise_archive_boundary(cursor, cutoff)
+            connection.commit()
+            self._note_archive_boundary(cutoff)
+
+            archived = 0
+            while True:
+                connection.start_transaction()
+                cursor.execute(
+                    "SELECT order_id FROM orders WHERE order_date < %s ORDER BY order_date, order_id LIMIT %s"
+                    + self.LOCK_ROWS_CLAUSE,
+                    (cutoff, batch_size)
+                )
+                order_ids = [row[0] for row in cursor.fetchall()]
+                if not order_ids:
+                    connection.commit()
+                    break
+
+                in_list = "(" + ", ".join(["%s"] * len(order_ids)) + ")"
+                cursor.execute(
+                    "INSERT INTO order_items_archive (order_item_id, order_id, product_id, quantity, unit_price) "
+                    "SELECT order_item_id, order_id, product_id, quantity, unit_price FROM order_items "
+                    "WHERE order_id IN " + in_list,
+                    order_ids
+                )
+                cursor.execute(
+                    "INSERT INTO orders_archive (order_id, customer_id, order_date, total_price, shipping_address) "
+                    "SELECT order_id, customer_id, order_date, total_price, shipping_address FROM orders "
+                    "WHERE order_id IN " + in_list,
+                    order_ids
+                )
+                cursor.execute("DELETE FROM order_items WHERE order_id IN " + in_list, order_ids)
+                cursor.execute("DELETE FROM orders WHERE order_id IN " + in_list, order_ids)
+                connection.commit()
+
+                archived += len(order_ids)
+                if len(order_ids) < batch_size:
+                    break
+            return archived
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            if connection:
+                connection.rollback()
+            return None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    @staticmethod
+    def _raise_archive_boundary(cursor, archived_before):
+        cursor.execute(
+            "UPDATE order_archive_state SET archived_before = %s "
+            "WHERE state_id = 1 AND (archived_before IS NULL OR archived_before < %s)",
+            (archived_before, archived_before)
+        )
+
+    def _note_archive_boundary(self, archived_before):
+        known = self._known_archived_before
+        if archived_before is not None and (known is None or archived_before > known):
+            self._known_archived_before = archived_before
+
+    def read_archive_boundary(self, connection, cursor):
+        """
+        Every archived order was placed before this; None if none ever was.
+
+        Unless connection is already in a transaction, a read-only snapshot
+        transaction is started first, so the order reads that follow on it
+        see every order where it was when the boundary was read (archive
+        runs raise the boundary before they move any order). The pool rolls
+        the snapshot back when the connection is released.
+        """
+        if not connection.in_transaction:
+            connection.start_transaction(consistent_snapshot=True, readonly=True)
+        cursor.execute("SELECT archived_before FROM order_archive_state WHERE state_id = 1")
+        # fetchall also drains unbuffered cursors
+        rows = cursor.fetchall()
+        archived_before = None
+        if rows:
+            row = rows[0]
+            archived_before = row['archived_before'] if isinstance(row, dict) else row[0]
+        self._note_archive_boundary(archived_before)
+        return archived_before
+
+    def order_sources(self, connection, cursor, start=None):
+        """
+        The (orders, order_items) table pairs a read of orders placed from
+        start on (None: the whole history) must cover: the live tables, plus
+        the archive only if it can hold orders that old. A boundary seen
+        earlier already proves the archive is needed; otherwise it is read
+        with read_archive_boundary, in the snapshot the orders are then read in.
+        """
+        known = self._known_archived_before
+        if known is None or (start is not None and start >= known):
+            known = self.read_archive_boundary(connection, cursor)
+        if known is not None and (start is None or start < known):
+            return [self.LIVE_ORDER_TABLES, self.ARCHIVE_ORDER_TABLES]
+        return [self.LIVE_ORDER_TABLES]
+
+    @staticmethod
+    def union_orders(branch_sql, params, sources, order_by=""):
+        """
+        (sql, params) running branch_sql, which names its tables {orders}
+        and {order_items} and its orders table o, over each table pair in
+        sources. Several pairs are combined with UNION ALL into a derived
+        table that is also named o, so order_by reads the same either way.
+        """
+        sql = "\nUNION ALL\n".join(branch_sql.format(orders=orders, order_items=order_items)
+                                    for orders, order_items in sources)
+        if len(sources) > 1:
+            sql = f"SELECT * FROM ({sql}) o"
+        return sql + "\n" + order_by, tuple(params) * len(sources)
+
+    @staticmethod
+    def page_needs_archive(rows, page_size, archived_before):
+        """
+        Whether a page of order rows read from the live tables alone, newest
+        first, could be missing archived orders: it is short, or reaches
+        back past the archive boundary.
+        """
+        if archived_before is None:
+            return False
+        order_ids = {row['order_id'] for row in rows}
+        return len(order_ids) <= page_size or rows[-1]['order_date'] < archived_before
 
     def get_orders_by_customer(self, customer_id):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('get_orders_by_customer')
             cursor = connection.cursor(dictionary=True)
 
-            cursor.execute("SELECT * FROM customers WHERE customer_id = %s", (customer_id,))
-            if not cursor.fetchone():
-                raise CustomerNotFoundException(customer_id)
-
-            cursor.execute("""
+            cursor.execute(*self.union_orders("""
                            SELECT o.order_id,
                                   o.customer_id,
                                   o.order_date,
@@ -428,15 +1070,20 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                                   p.price,
                                   p.description,
                                   p.stock_quantity
-                           FROM orders o
-                                    JOIN order_items oi ON o.order_id = oi.order_id
+                           FROM {orders} o
+                                    JOIN {order_items} oi ON o.order_id = oi.order_id
                                     JOIN products p ON oi.product_id = p.product_id
                            WHERE o.customer_id = %s
-                           ORDER BY o.order_date DESC
-                           """, (customer_id,))
+                           """, (customer_id,), self.order_sources(connection, cursor),
+                           "ORDER BY o.order_date DESC, o.order_id DESC"))
+            rows = cursor.fetchall()
+
+            # An empty history is either a customer with no orders or no customer
+            if not rows:
+                self.ensure_exists(cursor, 'customers', customer_id)
 
             orders = {}
-            for row in cursor.fetchall():
+            for row in rows:
                 order_id = row['order_id']
                 if order_id not in orders:
                     orders[order_id] = (
@@ -468,21 +1115,146 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
             return orders
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             return {}
         finally:
             if connection and connection.is_connected():
                 cursor.close()
                 connection.close()
 
-    def get_order_by_id(self, order_id):
+    def get_orders_by_customer_page(self, customer_id, page_size=20, continuation_token=None):
+        """
+        One page of a customer's order history, newest first, in the same
+        {order_id: (Order, [(OrderItem, Product)])} shape as
+        get_orders_by_customer, plus the token for the next page. Seeks on
+        (order_date, order_id) via idx_orders_customer_date.
+        """
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('get_orders_by_customer_page')
             cursor = connection.cursor(dictionary=True)
 
-            cursor.execute("""
-                           SELECT o.*,
+            seek_sql = ""
+            params = [customer_id]
+            if continuation_token:
+                last_date, last_order_id = ContinuationToken.decode(continuation_token, 2)
+                seek_sql = "AND (order_date < %s OR (order_date = %s AND order_id < %s))"
+                params += [last_date, last_date, last_order_id]
+            # One extra order tells whether another page exists
+            params.append(page_size + 1)
+
+            branch_sql = f"""
+                           SELECT o.order_id,
+                                  o.customer_id,
+                                  o.order_date,
+                                  o.total_price,
+                                  o.shipping_address,
+                                  oi.order_item_id,
+                                  oi.product_id,
+                                  oi.quantity,
+                                  p.name,
+                                  p.price,
+                                  p.description,
+                                  p.stock_quantity
+                           FROM (SELECT order_id, customer_id, order_date, total_price, shipping_address
+                                 FROM {{orders}}
+                                 WHERE customer_id = %s {seek_sql}
+                                 ORDER BY order_date DESC, order_id DESC
+                                 LIMIT %s) o
+                                    JOIN {{order_items}} oi ON o.order_id = oi.order_id
+                                    JOIN products p ON oi.product_id = p.product_id
+                           """
+            order_by = "ORDER BY o.order_date DESC, o.order_id DESC"
+            archived_before = self.read_archive_boundary(connection, cursor)
+            cursor.execute(*self.union_orders(branch_sql, params, [self.LIVE_ORDER_TABLES], order_by))
+            rows = cursor.fetchall()
+            if self.page_needs_archive(rows, page_size, archived_before):
+                cursor.execute(*self.union_orders(
+                    branch_sql, params, [self.LIVE_ORDER_TABLES, self.ARCHIVE_ORDER_TABLES], order_by))
+                rows = cursor.fetchall()
+
+            if not rows:
+                self.ensure_exists(cursor, 'customers', customer_id)
+
+            orders = {}
+            has_more = False
+            for row in rows:
+                order_id = row['order_id']
+                if order_id not in orders:
+                    if len(orders) == page_size:
+                        has_more = True
+                        break
+                    orders[order_id] = (
+                        Order(
+                            order_id=order_id,
+                            customer_id=row['customer_id'],
+                            order_date=row['order_date'],
+                            total_price=row['total_price'],
+                            shipping_address=row['shipping_address']
+                        ),
+                        []
+                    )
+
+                order_item = OrderItem(
+                    order_item_id=row['order_item_id'],
+                    order_id=order_id,
+                    product_id=row['product_id'],
+                    quantity=row['quantity']
+                )
+                product = Product(
+                    product_id=row['product_id'],
+                    name=row['name'],
+                    price=row['price'],
+                    description=row['description'],
+                    stock_quantity=row['stock_quantity']
+                )
+                orders[order_id][1].append((order_item, product))
+
+            next_token = None
+            if has_more:
+                last_order = orders[next(reversed(orders))][0]
+                next_token = ContinuationToken.encode(last_order.order_date, last_order.order_id)
+            return orders, next_token
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return {}, None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def _iter_batches(self, cursor):
+        # fetchmany keeps at most one batch of rows in memory at a time
+        while True:
+            rows = cursor.fetchmany(self.STREAM_BATCH_SIZE)
+            if not rows:
+                return
+            yield rows
+
+    def iter_rows(self, cursor):
+        for rows in self._iter_batches(cursor):
+            yield from rows
+
+    def iter_orders_by_customer(self, customer_id):
+        """
+        Streaming variant of get_orders_by_customer: yields one
+        (Order, [(OrderItem, Product)]) at a time from an unbuffered cursor,
+        so memory stays flat however long the history is. The connection is
+        held until the generator is exhausted or closed.
+        """
+        connection = None
+        try:
+            connection = self.connection_for('iter_orders_by_customer')
+            cursor = connection.cursor(dictionary=True, buffered=False)
+
+            # order_id breaks ties so every order's rows arrive together
+            cursor.execute(*self.union_orders("""
+                           SELECT o.order_id,
+                                  o.customer_id,
+                                  o.order_date,
+                                  o.total_price,
+                                  o.shipping_address,
                                   oi.order_item_id,
                                   oi.product_id,
                                   oi.quantity,
@@ -490,13 +1262,83 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                                   p.price,
                                   p.description,
                                   p.stock_quantity
-                           FROM orders o
-                                    LEFT JOIN order_items oi ON o.order_id = oi.order_id
-                                    LEFT JOIN products p ON oi.product_id = p.product_id
-                           WHERE o.order_id = %s
-                           """, (order_id,))
+                           FROM {orders} o
+                                    JOIN {order_items} oi ON o.order_id = oi.order_id
+                                    JOIN products p ON oi.product_id = p.product_id
+                           WHERE o.customer_id = %s
+                           """, (customer_id,), self.order_sources(connection, cursor),
+                           "ORDER BY o.order_date DESC, o.order_id DESC"))
+
+            current = None
+            for row in self.iter_rows(cursor):
+                if current is None or current[0].order_id != row['order_id']:
+                    if current is not None:
+                        yield current
+                    current = (
+                        Order(
+                            order_id=row['order_id'],
+                            customer_id=row['customer_id'],
+                            order_date=row['order_date'],
+                            total_price=row['total_price'],
+                            shipping_address=row['shipping_address']
+                        ),
+                        []
+                    )
 
+                order_item = OrderItem(
+                    order_item_id=row['order_item_id'],
+                    order_id=row['order_id'],
+                    product_id=row['product_id'],
+                    quantity=row['quantity']
+                )
+                product = Product(
+                    product_id=row['product_id'],
+                    name=row['name'],
+                    price=row['price'],
+                    description=row['description'],
+                    stock_quantity=row['stock_quantity']
+                )
+                current[1].append((order_item, product))
+
+            if current is not None:
+                yield current
+            else:
+                # Nothing streamed: no orders, or no such customer
+                self.ensure_exists(cursor, 'customers', customer_id)
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def get_order_by_id(self, order_id):
+        connection = None
+        try:
+            connection = self.connection_for('get_order_by_id')
+            cursor = connection.cursor(dictionary=True)
+
+            order_sql = """
+                        SELECT o.*,
+                               oi.order_item_id,
+                               oi.product_id,
+                               oi.quantity,
+                               p.name,
+                               p.price,
+                               p.description,
+                               p.stock_quantity
+                        FROM {orders} o
+                                 LEFT JOIN {order_items} oi ON o.order_id = oi.order_id
+                                 LEFT JOIN products p ON oi.product_id = p.product_id
+                        WHERE o.order_id = %s
+                        """
+            cursor.execute(*self.union_orders(order_sql, (order_id,), [self.LIVE_ORDER_TABLES]))
             rows = cursor.fetchall()
+            # Only an id missing from the live tables is looked up in the archive
+            if not rows and self.read_archive_boundary(connection, cursor) is not None:
+                cursor.execute(*self.union_orders(order_sql, (order_id,), [self.ARCHIVE_ORDER_TABLES]))
+                rows = cursor.fetchall()
             if not rows:
                 raise OrderNotFoundException(order_id)
 
@@ -522,7 +1364,7 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
             return order, order_items
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             raise
         finally:
             if connection and connection.is_connected():
@@ -532,7 +1374,7 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
     def get_all_products(self):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('get_all_products')
             cursor = connection.cursor(dictionary=True)
 
             cursor.execute("SELECT * FROM products")
@@ -551,10 +1393,33 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                 cursor.close()
                 connection.close()
 
+    def get_product_by_id(self, product_id):
+        connection = None
+        try:
+            connection = self.connection_for('get_product_by_id')
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute("SELECT * FROM products WHERE product_id = %s", (product_id,))
+            row = cursor.fetchone()
+            if not row:
+                raise ProductNotFoundException(product_id)
+
+            return Product(
+                product_id=row['product_id'],
+                name=row['name'],
+                price=row['price'],
+                description=row['description'],
+                stock_quantity=row['stock_quantity']
+            )
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
     def get_all_customers(self):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('get_all_customers')
             cursor = connection.cursor(dictionary=True)
 
             cursor.execute("SELECT customer_id, name, email FROM customers")  # Don't select password
@@ -572,10 +1437,77 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                 cursor.close()
                 connection.close()
 
+    def get_products_page(self, page_size=50, continuation_token=None):
+        """
+        One page of products in product_id order, plus the token for the
+        next page (None on the last page). Seeks on the primary key, so
+        every page costs the same however deep it is.
+        """
+        after_id = ContinuationToken.decode(continuation_token, 1)[0] if continuation_token else 0
+        connection = None
+        try:
+            connection = self.connection_for('get_products_page')
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute(
+                "SELECT * FROM products WHERE product_id > %s ORDER BY product_id LIMIT %s",
+                (after_id, page_size + 1)
+            )
+            rows = cursor.fetchall()
+            products = []
+            for row in rows[:page_size]:
+                products.append(Product(
+                    product_id=row['product_id'],
+                    name=row['name'],
+                    price=row['price'],
+                    description=row['description'],
+                    stock_quantity=row['stock_quantity']
+                ))
+
+            next_token = None
+            if len(rows) > page_size:
+                next_token = ContinuationToken.encode(products[-1].product_id)
+            return products, next_token
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def get_customers_page(self, page_size=50, continuation_token=None):
+        after_id = ContinuationToken.decode(continuation_token, 1)[0] if continuation_token else 0
+        connection = None
+        try:
+            connection = self.connection_for('get_customers_page')
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute(
+                "SELECT customer_id, name, email FROM customers WHERE customer_id > %s "
+                "ORDER BY customer_id LIMIT %s",  # Don't select password
+                (after_id, page_size + 1)
+            )
+            rows = cursor.fetchall()
+            customers = []
+            for row in rows[:page_size]:
+                customers.append(Customer(
+                    customer_id=row['customer_id'],
+                    name=row['name'],
+                    email=row['email'],
+                    password="********"  # Mask password
+                ))
+
+            next_token = None
+            if len(rows) > page_size:
+                next_token = ContinuationToken.encode(customers[-1].customer_id)
+            return customers, next_token
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
     def update_customer(self, customer):
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for('update_customer')
             cursor = connection.cursor()
 
             cursor.execute(
@@ -589,25 +1521,68 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
                 cursor.close()
                 connection.close()
 
+    @staticmethod
+    def day_range(order_date):
+        # Accepts 'YYYY-MM-DD', a date or a datetime
+        if isinstance(order_date, str):
+            order_date = date.fromisoformat(order_date.strip())
+        elif isinstance(order_date, datetime):
+            order_date = order_date.date()
+        day_start = datetime.combine(order_date, time.min)
+        return day_start, day_start + timedelta(days=1)
+
+    @staticmethod
+    def to_datetime(value):
+        # Accepts an ISO string ('YYYY-MM-DD' or with a time), a date or a datetime
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.strip())
+        if isinstance(value, datetime):
+            return value
+        return datetime.combine(value, time.min)
+
     def get_orders_by_date(self, order_date):
+        # Half-open timestamp range instead of DATE(order_date) = %s, so the
+        # filter is an index range scan on orders.order_date
+        day_start, day_end = self.day_range(order_date)
+        return self._orders_between(day_start, day_end, None, 'get_orders_by_date')
+
+    _ORDERS_BETWEEN_SQL = """
+                          SELECT o.order_id, o.customer_id, o.order_date, o.total_price, o.shipping_address,
+                                 oi.order_item_id, oi.product_id, oi.quantity,
+                                 p.name, p.price, p.description, p.stock_quantity,
+                                 c.name  as customer_name, c.email as customer_email
+                          FROM {orders} o
+                                   JOIN {order_items} oi ON o.order_id = oi.order_id
+                                   JOIN products p ON oi.product_id = p.product_id
+                                   JOIN customers c ON o.customer_id = c.customer_id
+                          WHERE o.order_date >= %s
+                            AND o.order_date < %s
+                          """
+
+    def get_orders_between(self, start, end, group_by=None):
+        """
+        Orders placed in [start, end). Without group_by, returns the same
+        {order_id: {'order', 'customer', 'items'}} mapping as
+        get_orders_by_date. With group_by='day' or 'hour', returns one row
+        per period with order_count, revenue and units aggregated in SQL.
+        """
+        return self._orders_between(start, end, group_by, 'get_orders_between')
+
+    def _orders_between(self, start, end, group_by, method):
+        # get_orders_between on behalf of repository method method
+        start = self.to_datetime(start)
+        end = self.to_datetime(end)
+        if group_by is not None:
+            return self.get_order_totals(start, end, group_by, method)
+
         connection = None
         try:
-            connection = DBConnUtil.get_connection()
+            connection = self.connection_for(method)
             cursor = connection.cursor(dictionary=True)
 
-            # Query to get orders for a specific date
-            cursor.execute("""
-                           SELECT o.order_id, o.customer_id, o.order_date, o.total_price, o.shipping_address,
-                                  oi.order_item_id, oi.product_id, oi.quantity,
-                                  p.name, p.price, p.description, p.stock_quantity,
-                                  c.name  as customer_name, c.email as customer_email
-                           FROM orders o
-                                    JOIN order_items oi ON o.order_id = oi.order_id
-                                    JOIN products p ON oi.product_id = p.product_id
-                                    JOIN customers c ON o.customer_id = c.customer_id
-                           WHERE DATE (o.order_date) = %s
-                           ORDER BY o.order_date DESC
-                           """, (order_date,))
+            cursor.execute(*self.union_orders(self._ORDERS_BETWEEN_SQL, (start, end),
+                                               self.order_sources(connection, cursor, start),
+                                               "ORDER BY o.order_date DESC, o.order_id DESC"))
 
             orders = {}
             for row in cursor.fetchall():
@@ -648,9 +1623,423 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
             return orders
 
         except mysql.connector.Error as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             return {}
         finally:
             if connection and connection.is_connected():
                 cursor.close()
-                connection.close()
\ No newline at end of file
+                connection.close()
+
+    def iter_orders_by_date(self, order_date):
+        day_start, day_end = self.day_range(order_date)
+        return self._iter_orders_between(day_start, day_end, 'iter_orders_by_date')
+
+    def iter_orders_between(self, start, end):
+        """
+        Streaming variant of get_orders_between: yields one
+        {'order', 'customer', 'items'} dict at a time, newest first.
+        """
+        return self._iter_orders_between(start, end, 'iter_orders_between')
+
+    def _iter_orders_between(self, start, end, method):
+        start = self.to_datetime(start)
+        end = self.to_datetime(end)
+        connection = None
+        try:
+            connection = self.connection_for(method)
+            cursor = connection.cursor(dictionary=True, buffered=False)
+
+            cursor.execute(*self.union_orders(self._ORDERS_BETWEEN_SQL, (start, end),
+                                               self.order_sources(connection, cursor, start),
+                                               "ORDER BY o.order_date DESC, o.order_id DESC"))
+
+            current = None
+            for row in self.iter_rows(cursor):
+                if current is None or current['order'].order_id != row['order_id']:
+                    if current is not None:
+                        yield current
+                    current = {
+                        'order': Order(
+                            order_id=row['order_id'],
+                            customer_id=row['customer_id'],
+                            order_date=row['order_date'],
+                            total_price=row['total_price'],
+                            shipping_address=row['shipping_address']
+                        ),
+                        'customer': Customer(
+                            customer_id=row['customer_id'],
+                            name=row['customer_name'],
+                            email=row['customer_email'],
+                            password="********"  # Masked for security
+                        ),
+                        'items': []
+                    }
+
+                order_item = OrderItem(
+                    order_item_id=row['order_item_id'],
+                    order_id=row['order_id'],
+                    product_id=row['product_id'],
+                    quantity=row['quantity']
+                )
+                product = Product(
+                    product_id=row['product_id'],
+                    name=row['name'],
+                    price=row['price'],
+                    description=row['description'],
+                    stock_quantity=row['stock_quantity']
+                )
+                current['items'].append((order_item, product))
+
+            if current is not None:
+                yield current
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def get_order_totals(self, start, end, group_by, method='get_orders_between'):
+        if group_by not in self._PERIOD_EXPRESSIONS:
+            raise ValueError(f"group_by must be one of {sorted(self._PERIOD_EXPRESSIONS)}")
+
+        connection = None
+        try:
+            connection = self.connection_for(method)
+            cursor = connection.cursor(dictionary=True)
+
+            # Units are summed per order first so that total_price is not
+            # counted once per order line
+            per_order_sql, params = self.union_orders(f"""
+                                 SELECT o.order_id,
+                                        {self._PERIOD_EXPRESSIONS[group_by]} AS period,
+                                        o.total_price,
+                                        COALESCE(SUM(oi.quantity), 0) AS units
+                                 FROM {{orders}} o
+                                          LEFT JOIN {{order_items}} oi ON o.order_id = oi.order_id
+                                 WHERE o.order_date >= %s
+                                   AND o.order_date < %s
+                                 GROUP BY o.order_id, o.order_date, o.total_price
+                                 """, (start, end), self.order_sources(connection, cursor, start))
+            cursor.execute(f"""
+                           SELECT period,
+                                  COUNT(*)         AS order_count,
+                                  SUM(total_price) AS revenue,
+                                  SUM(units)       AS units
+                           FROM ({per_order_sql}) per_order
+                           GROUP BY period
+                           ORDER BY period
+                           """, params)
+
+            totals = []
+            for row in cursor.fetchall():
+                period = row['period']
+                if isinstance(period, str):
+                    period = datetime.fromisoformat(period)
+                if group_by == 'day' and isinstance(period, datetime):
+                    period = period.date()
+                totals.append({
+                    'period': period,
+                    'order_count': int(row['order_count']),
+                    'revenue': Decimal(str(row['revenue'] or 0)).quantize(Decimal('0.01')),
+                    'units': int(row['units'] or 0)
+                })
+            return totals
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return []
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    PRODUCT_FRAME_SCHEMA = [
+        ('product_id', 'int64'),
+        ('price_cents', 'int64'),
+        ('stock_quantity', 'int64')
+    ]
+
+    ORDER_LINES_FRAME_SCHEMA = [
+        ('order_id', 'int64'),
+        ('customer_id', 'int64'),
+        ('order_date', 'datetime64[us]'),
+        ('order_total_cents', 'int64'),
+        ('product_id', 'int64'),
+        ('quantity', 'int64'),
+        ('unit_price_cents', 'int64')
+    ]
+
+    def read_frame(self, method, sql, params, schema, orders_from=None, order_by=""):
+        """
+        Reads sql into a ResultFrame for repository method method. With orders_from, sql is an order
+        branch (see union_orders) run over every table pair that can hold
+        orders placed from orders_from on, sorted by order_by.
+        """
+        connection = None
+        try:
+            connection = self.connection_for(method)
+            cursor = connection.cursor(buffered=False)
+            if orders_from is not None:
+                sql, params = self.union_orders(sql, params, self.order_sources(connection, cursor, orders_from),
+                                                 order_by)
+            cursor.execute(sql, params)
+            return ResultFrame.from_batches(self._iter_batches(cursor), schema)
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return ResultFrame.empty(schema)
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def get_products_frame(self):
+        """
+        Columnar get_all_products for analytics: product_id, price_cents and
+        stock_quantity as NumPy arrays, ordered by product_id. Requires NumPy.
+        """
+        return self.read_frame(
+            'get_products_frame',
+            f"""SELECT product_id, {self.CENTS_EXPRESSION.format('price')}, stock_quantity
+                FROM products
+                ORDER BY product_id""",
+            (), self.PRODUCT_FRAME_SCHEMA)
+
+    def get_order_lines_frame_by_date(self, order_date):
+        """Columnar get_orders_by_date; see get_order_lines_frame_between."""
+        return self._order_lines_frame_between(*self.day_range(order_date), 'get_order_lines_frame_by_date')
+
+    def get_order_lines_frame_between(self, start, end):
+        """
+        Order lines placed in [start, end) as a ResultFrame with one row per
+        line: order_id, customer_id, order_date, order_total_cents (repeated
+        on each line of an order; use first_per('order_id') before summing),
+        product_id, quantity and the unit_price_cents the line was sold at
+        (the product's current price for lines written before unit_price
+        existed). Ordered by order_date, order_id. Requires NumPy.
+        """
+        return self._order_lines_frame_between(start, end, 'get_order_lines_frame_between')
+
+    def _order_lines_frame_between(self, start, end, method):
+        start = self.to_datetime(start)
+        return self.read_frame(
+            method,
+            f"""SELECT o.order_id,
+                       o.customer_id,
+                       o.order_date,
+                       {self.CENTS_EXPRESSION.format('o.total_price')},
+                       oi.product_id,
+                       oi.quantity,
+                       {self.CENTS_EXPRESSION.format('COALESCE(oi.unit_price, p.price)')}
+                FROM {{orders}} o
+                         JOIN {{order_items}} oi ON o.order_id = oi.order_id
+                         JOIN products p ON oi.product_id = p.product_id
+                WHERE o.order_date >= %s
+                  AND o.order_date < %s""",
+            (start, self.to_datetime(end)), self.ORDER_LINES_FRAME_SCHEMA,
+            orders_from=start, order_by="ORDER BY o.order_date, o.order_id")
+
+    def apply_sales(self, cursor, customer_id, sales_date, lines, sign, order_total_cents=None):
+        """
+        Adds (sign=1) or removes (sign=-1) one order in the sales summary
+        tables, on the caller's transaction. lines maps product_id to
+        (units, revenue_cents); the customer's revenue is the order total,
+        which defaults to the sum of the lines.
+        """
+        if order_total_cents is None:
+            order_total_cents = sum(revenue_cents for _, revenue_cents in lines.values())
+        cursor.execute(
+            "INSERT INTO customer_sales (customer_id, order_count, units, revenue_cents) VALUES (%s, %s, %s, %s) "
+            + self._accumulate_clause(('customer_id',), ('order_count', 'units', 'revenue_cents')),
+            (customer_id, sign, sign * sum(units for units, _ in lines.values()), sign * (order_total_cents or 0))
+        )
+        if not lines:
+            return
+        rows = []
+        for product_id, (units, revenue_cents) in sorted(lines.items()):
+            rows.extend((sales_date, product_id, sign * units, sign * revenue_cents))
+        cursor.execute(
+            "INSERT INTO daily_product_sales (sales_date, product_id, units, revenue_cents) VALUES "
+            + ", ".join(["(%s, %s, %s, %s)"] * len(lines)) + " "
+            + self._accumulate_clause(('sales_date', 'product_id'), ('units', 'revenue_cents')),
+            rows
+        )
+
+    def rebuild_sales_summaries(self):
+        """
+        Recomputes daily_product_sales and customer_sales from the live and
+        archived orders in one transaction. Returns True on success.
+        """
+        connection = None
+        try:
+            connection = self.connection_for('rebuild_sales_summaries')
+            cursor = connection.cursor()
+
+            connection.start_transaction()
+            cursor.execute("DELETE FROM daily_product_sales")
+            cursor.execute("DELETE FROM customer_sales")
+            line_cents = self.CENTS_EXPRESSION.format('COALESCE(oi.unit_price, p.price)')
+            sources = [self.LIVE_ORDER_TABLES, self.ARCHIVE_ORDER_TABLES]
+            per_source_sql, _ = self.union_orders(f"""
+                                  SELECT DATE(o.order_date) AS sales_date, oi.product_id,
+                                         SUM(oi.quantity) AS units,
+                                         COALESCE(SUM({line_cents} * oi.quantity), 0) AS revenue_cents
+                                  FROM {{orders}} o
+                                           JOIN {{order_items}} oi ON o.order_id = oi.order_id
+                                           LEFT JOIN products p ON oi.product_id = p.product_id
+                                  GROUP BY DATE(o.order_date), oi.product_id
+                                  """, (), sources)
+            cursor.execute(f"""
+                           INSERT INTO daily_product_sales (sales_date, product_id, units, revenue_cents)
+                           SELECT sales_date, product_id, SUM(units), SUM(revenue_cents)
+                           FROM ({per_source_sql}) per_source
+                           GROUP BY sales_date, product_id
+                           """)
+            per_source_sql, _ = self.union_orders(f"""
+                                  SELECT o.customer_id, COUNT(*) AS order_count,
+                                         COALESCE(SUM(per_order.units), 0) AS units,
+                                         SUM({self.CENTS_EXPRESSION.format('o.total_price')}) AS revenue_cents
+                                  FROM {{orders}} o
+                                           LEFT JOIN (SELECT order_id, SUM(quantity) AS units
+                                                      FROM {{order_items}}
+                                                      GROUP BY order_id) per_order ON o.order_id = per_order.order_id
+                                  GROUP BY o.customer_id
+                                  """, (), sources)
+            cursor.execute(f"""
+                           INSERT INTO customer_sales (customer_id, order_count, units, revenue_cents)
+                           SELECT customer_id, SUM(order_count), SUM(units), SUM(revenue_cents)
+                           FROM ({per_source_sql}) per_source
+                           GROUP BY customer_id
+                           """)
+            connection.commit()
+            return True
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            if connection:
+                connection.rollback()
+            return False
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    @staticmethod
+    def _to_date(value):
+        if isinstance(value, str):
+            return date.fromisoformat(value.strip()[:10])
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+
+    def get_daily_product_sales(self, start, end, product_id=None):
+        """
+        Precomputed sales per day and product for days in [start, end):
+        [{'sales_date', 'product_id', 'units', 'revenue'}] ordered by day
+        then product. Reads the summary table only.
+        """
+        connection = None
+        try:
+            connection = self.connection_for('get_daily_product_sales')
+            cursor = connection.cursor(dictionary=True)
+
+            product_sql = ""
+            params = [self._to_date(start).isoformat(), self._to_date(end).isoformat()]
+            if product_id is not None:
+                product_sql = "AND product_id = %s"
+                params.append(product_id)
+            cursor.execute(f"""
+                           SELECT sales_date, product_id, units, revenue_cents
+                           FROM daily_product_sales
+                           WHERE sales_date >= %s
+                             AND sales_date < %s {product_sql}
+                             AND units <> 0
+                           ORDER BY sales_date, product_id
+                           """, params)
+
+            return [{
+                'sales_date': self._to_date(row['sales_date']),
+                'product_id': row['product_id'],
+                'units': int(row['units']),
+                'revenue': self.from_cents(row['revenue_cents'])
+            } for row in cursor.fetchall()]
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return []
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def get_best_sellers(self, start, end, limit=10):
+        """
+        Products ranked by units sold on days in [start, end), from the
+        summary table: [{'product_id', 'name', 'units', 'revenue'}].
+        """
+        connection = None
+        try:
+            connection = self.connection_for('get_best_sellers')
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute("""
+                           SELECT s.product_id,
+                                  p.name,
+                                  SUM(s.units)         AS units,
+                                  SUM(s.revenue_cents) AS revenue_cents
+                           FROM daily_product_sales s
+                                    LEFT JOIN products p ON s.product_id = p.product_id
+                           WHERE s.sales_date >= %s
+                             AND s.sales_date < %s
+                           GROUP BY s.product_id, p.name
+                           HAVING SUM(s.units) > 0
+                           ORDER BY units DESC, s.product_id
+                           LIMIT %s
+                           """, (self._to_date(start).isoformat(), self._to_date(end).isoformat(), limit))
+
+            return [{
+                'product_id': row['product_id'],
+                'name': row['name'],
+                'units': int(row['units']),
+                'revenue': self.from_cents(row['revenue_cents'])
+            } for row in cursor.fetchall()]
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return []
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
+
+    def get_customer_sales(self, customer_id):
+        """
+        Lifetime totals for one customer from the summary table:
+        {'order_count', 'units', 'revenue'}; zeros if they never ordered.
+        """
+        connection = None
+        try:
+            connection = self.connection_for('get_customer_sales')
+            cursor = connection.cursor(dictionary=True)
+
+            cursor.execute("SELECT order_count, units, revenue_cents FROM customer_sales WHERE customer_id = %s",
+                           (customer_id,))
+            row = cursor.fetchone()
+            if not row:
+                self.ensure_exists(cursor, 'customers', customer_id)
+                row = {'order_count': 0, 'units': 0, 'revenue_cents': 0}
+            return {
+                'order_count': int(row['order_count']),
+                'units': int(row['units']),
+                'revenue': self.from_cents(row['revenue_cents'])
+            }
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return None
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
@@ -0,0 +1,65 @@
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from util.replica_router import ReplicaRouter
+from util.sqlite_conn_util import SQLiteDatabase
+
+
+class OrderProcessorRepositorySqliteImpl(OrderProcessorRepositoryImpl):
+    """
+    OrderProcessorRepository backed by the stdlib sqlite3 module.
+
+    Uses the same SQL and raises the same exceptions as the MySQL
+    implementation; only the connection source differs. Pass a file path
+    for a persistent database or ':memory:' for a throwaway one.
+
+    replica_paths are opened as read replicas (see ReplicaRouter). SQLite
+    does not replicate, so they only stand in for replicas kept in sync
+    by other means, e.g. when testing the routing.
+    """
+
+    # SQLite has no row locks; start_transaction() takes the database write
+    # lock up front (BEGIN IMMEDIATE), which serializes checkouts instead
+    LOCK_ROWS_CLAUSE = ""
+
+    CENTS_EXPRESSION = "CAST(ROUND({} * 100) AS INTEGER)"
+
+    # Keeps a four-column INSERT under the 999 bound-parameter limit of
+    # SQLite builds older than 3.32
+    BULK_INSERT_ROWS = 200
+
+    _PERIOD_EXPRESSIONS = {
+        'day': "DATE(o.order_date)",
+        'hour': "STRFTIME('%%Y-%%m-%%d %%H:00:00', o.order_date)"
+    }
+
+    def __init__(self, path=':memory:', pool_size=5, metrics=None, replica_paths=(),
+                 read_your_writes_window=5.0, foreign_keys=True):
+        self.database = SQLiteDatabase(path, pool_size=pool_size, foreign_keys=foreign_keys)
+        self.replicas = [SQLiteDatabase(replica_path, pool_size=pool_size) for replica_path in replica_paths]
+        router = None
+        if self.replicas:
+            router = ReplicaRouter([replica.get_connection for replica in self.replicas],
+                                   read_your_writes_window=read_your_writes_window)
+        super().__init__(metrics, router)
+
+    def _borrow_connection(self):
+        return self.database.get_connection()
+
+    def close(self):
+        self.database.close()
+        for replica in self.replicas:
+            replica.close()
+
+    def _accumulate_clause(self, key_columns, value_columns):
+        return ("ON CONFLICT (" + ", ".join(key_columns) + ") DO UPDATE SET "
+                + ", ".join(f"{column} = {column} + excluded.{column}" for column in value_columns))
+
+    def upsert_cart_item(self, cursor, customer_id, product_id, quantity):
+        cursor.execute(
+            """INSERT INTO cart (customer_id, product_id, quantity)
+               VALUES (%s, %s, %s)
+               ON CONFLICT (customer_id, product_id)
+                   DO UPDATE SET quantity = quantity + excluded.quantity
+               RETURNING cart_id""",
+            (customer_id, product_id, quantity)
+        )
+        return cursor.fetchone()[0]
@@ -0,0 +1,1028 @@
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+import mysql.connector
+from dao.order_processor_repository import OrderProcessorRepository
+from entity.cart import Cart
+from entity.customer import Customer
+from entity.order import Order
+from entity.order_item import OrderItem
+from entity.product import Product
+from exception.CustomerNotFoundException import CustomerNotFoundException
+from exception.OrderNotFoundException import OrderNotFoundException
+from util.continuation_token import ContinuationToken
+from util.result_frame import ResultFrame, np
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedOrderProcessorRepository(OrderProcessorRepository):
+    """
+    Customer-keyed sharding over several databases.
+
+    customers and products live in one catalog database. Each customer's
+    cart, orders, order_items and sales summary rows live on one shard:
+    customer_id % len(shards), unless move_customer() placed the customer
+    elsewhere (catalog table customer_shards). Order ids are allocated in
+    the catalog (order_shards), so they are unique across shards and map
+    every order to its shard.
+
+    catalog -- OrderProcessorRepositoryImpl for the catalog database
+    shards  -- one OrderProcessorRepositoryImpl per shard database, opened
+               with foreign keys unenforced (their parents are in the catalog)
+
+    Reads by date are scattered to every shard in parallel and merged.
+    Checkout and cancel write to a shard and the catalog without a
+    distributed transaction: the shard commits first, then the catalog,
+    and a checkout whose catalog commit fails is deleted from the shard
+    again. Writes for a customer lock the customer's catalog row while they
+    pick the shard and write to it, so they never race move_customer().
+    Units of work are scoped to one customer; see unit_of_work().
+    """
+
+    # Orders fetched per shard round trip by iter_orders_by_customer, and
+    # completed from the catalog at a time by iter_orders_between
+    STREAM_PAGE_SIZE = 100
+
+    # Ids per IN (...) list when customers and products are looked up in
+    # the catalog; kept below SQLite's default limit of 999 parameters
+    LOOKUP_BATCH_SIZE = 500
+
+    def __init__(self, catalog, shards):
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.catalog = catalog
+        self.shards = list(shards)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix="shard")
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for repository in [self.catalog] + self.shards:
+            if hasattr(repository, 'close'):
+                repository.close()
+
+    @staticmethod
+    @contextmanager
+    def _cursor(repository, method, **cursor_args):
+        connection = repository.connection_for(method)
+        cursor = None
+        try:
+            cursor = connection.cursor(**cursor_args)
+            yield connection, cursor
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+            connection.close()
+
+    def _scatter(self, call, shards=None):
+        """Runs call(shard) on every shard in parallel; results in shard order."""
+        return list(self._executor.map(call, self.shards if shards is None else shards))
+
+    # Placement
+
+    def _shard_index(self, cursor, customer_id):
+        cursor.execute("SELECT shard FROM customer_shards WHERE customer_id = %s", (customer_id,))
+        row = cursor.fetchone()
+        if row:
+            return row['shard'] if isinstance(row, dict) else row[0]
+        return customer_id % len(self.shards)
+
+    def _lock_customer(self, cursor, customer_id):
+        """
+        Locks the customer's catalog row until the catalog transaction ends
+        and returns their shard index. move_customer() holds the same lock
+        for the whole copy, so a write made under it lands on the shard the
+        customer is on when it commits.
+        """
+        cursor.execute("SELECT 1 FROM customers WHERE customer_id = %s" + self.catalog.LOCK_ROWS_CLAUSE,
+                       (customer_id,))
+        if not cursor.fetchall():
+            raise CustomerNotFoundException(customer_id)
+        return self._shard_index(cursor, customer_id)
+
+    def _shard_of(self, customer_id, method):
+        with self._cursor(self.catalog, method) as (_, cursor):
+            return self._shard_index(cursor, customer_id)
+
+    def shard_for(self, customer_id):
+        """Index of the shard holding the customer's cart and orders."""
+        return self._shard_of(customer_id, 'shard_for')
+
+    def _locate_order(self, cursor, order_id):
+        cursor.execute("SELECT customer_id, shard FROM order_shards WHERE order_id = %s", (order_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise OrderNotFoundException(order_id)
+        return row
+
+    def _ensure_customer(self, customer_id, method):
+        with self._cursor(self.catalog, method) as (_, cursor):
+            self.catalog.ensure_exists(cursor, 'customers', customer_id)
+
+    # Catalog lookups used to complete shard rows
+
+    def _products_by_id(self, product_ids, method):
+        product_ids = sorted(set(product_ids))
+        products = {}
+        with self._cursor(self.catalog, method, dictionary=True) as (_, cursor):
+            for start in range(0, len(product_ids), self.LOOKUP_BATCH_SIZE):
+                chunk = product_ids[start:start + self.LOOKUP_BATCH_SIZE]
+                cursor.execute(
+                    "SELECT product_id, name, price, description, stock_quantity FROM products "
+                    "WHERE product_id IN (" + ", ".join(["%s"] * len(chunk)) + ")",
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    products[row['product_id']] = Product(
+                        product_id=row['product_id'],
+                        name=row['name'],
+                        price=row['price'],
+                        description=row['description'],
+                        stock_quantity=row['stock_quantity']
+                    )
+        return products
+
+    def _customers_by_id(self, customer_ids, method):
+        customer_ids = sorted(set(customer_ids))
+        customers = {}
+        with self._cursor(self.catalog, method, dictionary=True) as (_, cursor):
+            for start in range(0, len(customer_ids), self.LOOKUP_BATCH_SIZE):
+                chunk = customer_ids[start:start + self.LOOKUP_BATCH_SIZE]
+                cursor.execute(
+                    "SELECT customer_id, name, email FROM customers "
+                    "WHERE customer_id IN (" + ", ".join(["%s"] * len(chunk)) + ")",
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    customers[row['customer_id']] = Customer(
+                        customer_id=row['customer_id'],
+                        name=row['name'],
+                        email=row['email'],
+                        password="********"  # Masked for security
+                    )
+        return customers
+
+    @staticmethod
+    def _price_cents(product):
+        return int(round(product.price * 100))
+
+    # Customers and products: the catalog
+
+    def create_product(self, product):
+        return self.catalog.create_product(product)
+
+    def bulk_create_products(self, products):
+        return self.catalog.bulk_create_products(products)
+
+    def get_product_by_id(self, product_id):
+        return self.catalog.get_product_by_id(product_id)
+
+    def get_all_products(self):
+        return self.catalog.get_all_products()
+
+    def get_products_page(self, page_size=50, continuation_token=None):
+        return self.catalog.get_products_page(page_size, continuation_token)
+
+    def get_products_frame(self):
+        return self.catalog.get_products_frame()
+
+    def create_customer(self, customer):
+        return self.catalog.create_customer(customer)
+
+    def bulk_create_customers(self, customers, prepare=None):
+        return self.catalog.bulk_create_customers(customers, prepare)
+
+    def get_existing_emails(self, emails):
+        return self.catalog.get_existing_emails(emails)
+
+    def get_all_customers(self):
+        return self.catalog.get_all_customers()
+
+    def get_customers_page(self, page_size=50, continuation_token=None):
+        return self.catalog.get_customers_page(page_size, continuation_token)
+
+    def update_customer(self, customer):
+        return self.catalog.update_customer(customer)
+
+    def _delete_from_cart(self, shard, column, key, method):
+        try:
+            with self._cursor(shard, method) as (connection, cursor):
+                cursor.execute(f"DELETE FROM cart WHERE {column} = %s", (key,))
+                connection.commit()
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+
+    def delete_product(self, product_id):
+        deleted = self.catalog.delete_product(product_id)
+        if deleted:
+            # Shard carts have no foreign key to cascade the delete
+            self._scatter(lambda shard: self._delete_from_cart(shard, 'product_id', product_id, 'delete_product'))
+        return deleted
+
+    def delete_customer(self, customer_id):
+        shard = self.shards[self._shard_of(customer_id, 'delete_customer')]
+        deleted = self.catalog.delete_customer(customer_id)
+        if deleted:
+            self._delete_from_cart(shard, 'customer_id', customer_id, 'delete_customer')
+        return deleted
+
+    # Carts: the customer's shard
+
+    def add_to_cart(self, customer, product, quantity):
+        try:
+            with self._cursor(self.catalog, 'add_to_cart') as (catalog_connection, catalog_cursor):
+                catalog_connection.start_transaction()
+                shard = self.shards[self._lock_customer(catalog_cursor, customer.customer_id)]
+                self.catalog.ensure_exists(catalog_cursor, 'products', product.product_id)
+
+                with self._cursor(shard, 'add_to_cart') as (connection, cursor):
+                    cart_id = shard.upsert_cart_item(cursor, customer.customer_id, product.product_id, quantity)
+                    connection.commit()
+                catalog_connection.commit()
+            return Cart(cart_id=cart_id, customer_id=customer.customer_id,
+                        product_id=product.product_id, quantity=quantity)
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return None
+
+    def remove_from_cart(self, customer, product):
+        try:
+            with self._cursor(self.catalog, 'remove_from_cart') as (catalog_connection, catalog_cursor):
+                catalog_connection.start_transaction()
+                shard = self.shards[self._lock_customer(catalog_cursor, customer.customer_id)]
+                with self._cursor(shard, 'remove_from_cart') as (connection, cursor):
+                    cursor.execute(
+                        "SELECT cart_id, customer_id, product_id, quantity FROM cart "
+                        "WHERE customer_id = %s AND product_id = %s",
+                        (customer.customer_id, product.product_id)
+                    )
+                    cart_item = cursor.fetchone()
+                    if cart_item:
+                        cursor.execute(
+                            "DELETE FROM cart WHERE customer_id = %s AND product_id = %s",
+                            (customer.customer_id, product.product_id)
+                        )
+                        connection.commit()
+
+                if not cart_item:
+                    self.catalog.ensure_exists(catalog_cursor, 'products', product.product_id)
+                catalog_connection.commit()
+
+            if not cart_item:
+                logger.warning("Product not found in cart!")
+                return False
+            return Cart(cart_id=cart_item[0], customer_id=cart_item[1],
+                        product_id=cart_item[2], quantity=cart_item[3])
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return None
+
+    def _cart_lines(self, customer, method):
+        shard = self.shards[self._shard_of(customer.customer_id, method)]
+        with self._cursor(shard, method, dictionary=True) as (_, cursor):
+            cursor.execute(
+                "SELECT cart_id, customer_id, product_id, quantity FROM cart WHERE customer_id = %s ORDER BY cart_id",
+                (customer.customer_id,)
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            self._ensure_customer(customer.customer_id, method)
+            return []
+
+        # Lines whose product is gone are dropped, as the single-database join does
+        products = self._products_by_id((row['product_id'] for row in rows), method)
+        return [(Cart(cart_id=row['cart_id'], customer_id=row['customer_id'],
+                      product_id=row['product_id'], quantity=row['quantity']),
+                 products[row['product_id']])
+                for row in rows if row['product_id'] in products]
+
+    def get_all_from_cart(self, customer):
+        try:
+            return self._cart_lines(customer, 'get_all_from_cart')
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return []
+
+    def get_cart_summary(self, customer):
+        from_cents = self.catalog.from_cents
+        try:
+            lines = self._cart_lines(customer, 'get_cart_summary')
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            lines = []
+
+        items = []
+        total_cents = 0
+        for cart, product in lines:
+            line_cents = self._price_cents(product) * cart.quantity
+            total_cents += line_cents
+            items.append((cart, product, from_cents(line_cents)))
+        return {
+            'items': items,
+            'item_count': sum(cart.quantity for cart, _ in lines),
+            'total': from_cents(total_cents)
+        }
+
+    # Orders: stock in the catalog, rows on the customer's shard
+
+    def place_order(self, customer, cart_items, shipping_address, total_price=None):
+        """
+        Same contract as OrderProcessorRepositoryImpl.place_order. Stock is
+        locked and decremented in the catalog; the order is written to the
+        customer's shard under an id allocated in the catalog.
+        """
+        catalog_connection = shard_connection = None
+        catalog_cursor = shard_cursor = None
+        try:
+            catalog_connection = self.catalog.connection_for('place_order')
+            catalog_cursor = catalog_connection.cursor()
+
+            catalog_connection.start_transaction()
+            shard_index = self._lock_customer(catalog_cursor, customer.customer_id)
+            shard = self.shards[shard_index]
+
+            quantities_by_product = {}
+            for cart, product in cart_items:
+                quantities_by_product[product.product_id] = (
+                    quantities_by_product.get(product.product_id, 0) + cart.quantity)
+
+            locked_products = self.catalog.lock_products(catalog_cursor, quantities_by_product)
+            if locked_products is None:
+                catalog_connection.rollback()
+                return None, []
+
+            order_total = self.catalog.from_cents(sum(locked_products[product_id][1] * quantity
+                                                       for product_id, quantity in quantities_by_product.items()))
+            if total_price is not None and Decimal(str(total_price)).quantize(Decimal('0.01')) != order_total:
+                logger.warning("Prices changed since the order summary (now $%s). Order was not placed.", order_total)
+                catalog_connection.rollback()
+                return None, []
+
+            if not self.catalog.decrement_stock(catalog_cursor, quantities_by_product):
+                logger.warning("Stock changed during checkout. Order was not placed.")
+                catalog_connection.rollback()
+                return None, []
+
+            # Allocate the order id and record which shard holds the order
+            catalog_cursor.execute("INSERT INTO order_shards (customer_id, shard) VALUES (%s, %s)",
+                                   (customer.customer_id, shard_index))
+            order_id = catalog_cursor.lastrowid
+
+            order_date = datetime.now()
+            shard_connection = shard.connection_for('place_order')
+            shard_cursor = shard_connection.cursor()
+            shard_connection.start_transaction()
+            _, order_items = shard.record_order(shard_cursor, customer.customer_id, order_date, order_total,
+                                                 shipping_address, cart_items, locked_products, order_id=order_id)
+            shard_connection.commit()
+
+            try:
+                catalog_connection.commit()
+            except mysql.connector.Error:
+                # The stock was never taken, so the order must not stand
+                self._discard_order(shard, order_id)
+                raise
+
+            return Order(
+                order_id=order_id,
+                customer_id=customer.customer_id,
+                order_date=order_date,
+                total_price=order_total,
+                shipping_address=shipping_address
+            ), order_items
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            self._rollback(shard_connection, catalog_connection)
+            return None, []
+        except Exception as e:
+            logger.error("Error placing order: %s", e)
+            self._rollback(shard_connection, catalog_connection)
+            return None, []
+        finally:
+            self._release((shard_connection, shard_cursor), (catalog_connection, catalog_cursor))
+
+    @staticmethod
+    def _rollback(*connections):
+        for connection in connections:
+            if connection:
+                try:
+                    connection.rollback()
+                except mysql.connector.Error as e:
+                    logger.error("Database error: %s", e)
+
+    @staticmethod
+    def _release(*pairs):
+        for connection, cursor in pairs:
+            if connection and connection.is_connected():
+                if cursor is not None:
+                    cursor.close()
+                connection.close()
+
+    def _discard_order(self, shard, order_id):
+        try:
+            with self._cursor(shard, 'place_order', dictionary=True) as (connection, cursor):
+                connection.start_transaction()
+                shard.remove_order(cursor, order_id)
+                connection.commit()
+        except (mysql.connector.Error, OrderNotFoundException) as e:
+            logger.error("Could not discard order %s from its shard: %s", order_id, e)
+
+    def cancel_order(self, order_id, restocked=None):
+        # Like place_order, the catalog transaction is opened before the
+        # shard's so the two never wait on each other in opposite order
+        catalog_connection = shard_connection = None
+        catalog_cursor = shard_cursor = None
+        try:
+            catalog_connection = self.catalog.connection_for('cancel_order')
+            catalog_cursor = catalog_connection.cursor()
+            customer_id, _ = self._locate_order(catalog_cursor, order_id)
+            catalog_connection.start_transaction()
+            # Looked up again under the customer's lock, in case a move
+            # committed in between
+            self._lock_customer(catalog_cursor, customer_id)
+            _, shard_index = self._locate_order(catalog_cursor, order_id)
+            shard = self.shards[shard_index]
+
+            shard_connection = shard.connection_for('cancel_order')
+            shard_cursor = shard_connection.cursor(dictionary=True)
+            # Order lines never change, so they can be read before locking
+            shard_cursor.execute("SELECT product_id, SUM(quantity) AS quantity FROM order_items "
+                                 "WHERE order_id = %s GROUP BY product_id", (order_id,))
+            quantities_by_product = {row['product_id']: int(row['quantity']) for row in shard_cursor.fetchall()}
+
+            self.catalog.restore_stock(catalog_cursor, quantities_by_product)
+            catalog_cursor.execute("DELETE FROM order_shards WHERE order_id = %s", (order_id,))
+
+            shard_connection.start_transaction()
+            shard.remove_order(shard_cursor, order_id)
+
+            shard_connection.commit()
+            try:
+                catalog_connection.commit()
+            except mysql.connector.Error:
+                logger.error("Order %s was cancelled but its stock was not restored", order_id)
+                raise
+            if restocked is not None:
+                restocked(quantities_by_product)
+            return True
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            self._rollback(shard_connection, catalog_connection)
+            return False
+        except Exception as e:
+            logger.error("Error canceling order: %s", e)
+            self._rollback(shard_connection, catalog_connection)
+            return False
+        finally:
+            self._release((shard_connection, shard_cursor), (catalog_connection, catalog_cursor))
+
+    def get_order_by_id(self, order_id):
+        with self._cursor(self.catalog, 'get_order_by_id') as (_, cursor):
+            _, shard_index = self._locate_order(cursor, order_id)
+        return self.shards[shard_index].get_order_by_id(order_id)
+
+    _ORDER_LINE_COLUMNS = """o.order_id, o.customer_id, o.order_date, o.total_price, o.shipping_address,
+                             oi.order_item_id, oi.product_id, oi.quantity"""
+
+    _NEWEST_FIRST = "ORDER BY o.order_date DESC, o.order_id DESC"
+
+    @staticmethod
+    def _newest_first_key(row):
+        return row['order_date'], row['order_id']
+
+    @staticmethod
+    def _read_rows(shard, method, sql, params):
+        with ShardedOrderProcessorRepository._cursor(shard, method, dictionary=True) as (_, cursor):
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    @staticmethod
+    def _read_order_rows(shard, method, branch_sql, params, order_by, start=None):
+        """
+        Rows of an order branch (see OrderProcessorRepositoryImpl.union_orders)
+        from the shard's live tables, and from its archive when it can hold
+        orders placed from start on.
+        """
+        with ShardedOrderProcessorRepository._cursor(shard, method, dictionary=True) as (connection, cursor):
+            sources = shard.order_sources(connection, cursor, start)
+            cursor.execute(*shard.union_orders(branch_sql, params, sources, order_by))
+            return cursor.fetchall()
+
+    @staticmethod
+    def _iter_order_rows(shard, method, branch_sql, params, order_by, start=None):
+        """Streaming variant of _read_order_rows, from an unbuffered cursor."""
+        with ShardedOrderProcessorRepository._cursor(shard, method, dictionary=True,
+                                                     buffered=False) as (connection, cursor):
+            sources = shard.order_sources(connection, cursor, start)
+            cursor.execute(*shard.union_orders(branch_sql, params, sources, order_by))
+            yield from shard.iter_rows(cursor)
+
+    def _build_orders(self, rows, method):
+        """
+        {order_id: (Order, [(OrderItem, Product)])} from order-line rows,
+        in row order, with products from the catalog. Lines whose product
+        is gone are dropped, as the single-database join does.
+        """
+        products = self._products_by_id((row['product_id'] for row in rows), method)
+        orders = {}
+        for row in rows:
+            product = products.get(row['product_id'])
+            if product is None:
+                continue
+            order_id = row['order_id']
+            if order_id not in orders:
+                orders[order_id] = (
+                    Order(
+                        order_id=order_id,
+                        customer_id=row['customer_id'],
+                        order_date=row['order_date'],
+                        total_price=row['total_price'],
+                        shipping_address=row['shipping_address']
+                    ),
+                    []
+                )
+            order_item = OrderItem(
+                order_item_id=row['order_item_id'],
+                order_id=order_id,
+                product_id=row['product_id'],
+                quantity=row['quantity']
+            )
+            orders[order_id][1].append((order_item, product))
+        return orders
+
+    def _complete_orders(self, rows, method):
+        """
+        {order_id: {'order', 'customer', 'items'}} from order-line rows, as
+        get_orders_between returns them; orders of deleted customers are
+        dropped, as the single-database join does.
+        """
+        customers = self._customers_by_id((row['customer_id'] for row in rows), method)
+        orders = {}
+        for order_id, (order, items) in self._build_orders(rows, method).items():
+            customer = customers.get(order.customer_id)
+            if customer is not None:
+                orders[order_id] = {'order': order, 'customer': customer, 'items': items}
+        return orders
+
+    def get_orders_by_customer(self, customer_id):
+        try:
+            shard = self.shards[self._shard_of(customer_id, 'get_orders_by_customer')]
+            rows = self._read_order_rows(shard, 'get_orders_by_customer', f"""
+                                         SELECT {self._ORDER_LINE_COLUMNS}
+                                         FROM {{orders}} o
+                                                  JOIN {{order_items}} oi ON o.order_id = oi.order_id
+                                         WHERE o.customer_id = %s
+                                         """, (customer_id,), "ORDER BY o.order_date DESC, o.order_id DESC")
+            if not rows:
+                self._ensure_customer(customer_id, 'get_orders_by_customer')
+            return self._build_orders(rows, 'get_orders_by_customer')
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return {}
+
+    def get_orders_by_customer_page(self, customer_id, page_size=20, continuation_token=None):
+        try:
+            seek_sql = ""
+            params = [customer_id]
+            if continuation_token:
+                last_date, last_order_id = ContinuationToken.decode(continuation_token, 2)
+                seek_sql = "AND (order_date < %s OR (order_date = %s AND order_id < %s))"
+                params += [last_date, last_date, last_order_id]
+            # One extra order tells whether another page exists
+            params.append(page_size + 1)
+
+            shard = self.shards[self._shard_of(customer_id, 'get_orders_by_customer_page')]
+            branch_sql = f"""
+                         SELECT {self._ORDER_LINE_COLUMNS}
+                         FROM (SELECT order_id, customer_id, order_date, total_price, shipping_address
+                               FROM {{orders}}
+                               WHERE customer_id = %s {seek_sql}
+                               ORDER BY order_date DESC, order_id DESC
+                               LIMIT %s) o
+                                  JOIN {{order_items}} oi ON o.order_id = oi.order_id
+                         """
+            order_by = "ORDER BY o.order_date DESC, o.order_id DESC"
+            with self._cursor(shard, 'get_orders_by_customer_page', dictionary=True) as (connection, cursor):
+                archived_before = shard.read_archive_boundary(connection, cursor)
+                cursor.execute(*shard.union_orders(branch_sql, params, [shard.LIVE_ORDER_TABLES], order_by))
+                rows = cursor.fetchall()
+                if shard.page_needs_archive(rows, page_size, archived_before):
+                    cursor.execute(*shard.union_orders(
+                        branch_sql, params, [shard.LIVE_ORDER_TABLES, shard.ARCHIVE_ORDER_TABLES], order_by))
+                    rows = cursor.fetchall()
+            if not rows:
+                self._ensure_customer(customer_id, 'get_orders_by_customer_page')
+
+            orders = self._build_orders(rows, 'get_orders_by_customer_page')
+            next_token = None
+            if len(orders) > page_size:
+                orders = dict(list(orders.items())[:page_size])
+                last_order = orders[next(reversed(orders))][0]
+                next_token = ContinuationToken.encode(last_order.order_date, last_order.order_id)
+            return orders, next_token
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return {}, None
+
+    def iter_orders_by_customer(self, customer_id):
+        """Yields the customer's orders newest first, one shard page at a time."""
+        token = None
+        while True:
+            orders, token = self.get_orders_by_customer_page(customer_id, self.STREAM_PAGE_SIZE, token)
+            yield from orders.values()
+            if token is None:
+                return
+
+    def get_orders_by_date(self, order_date):
+        return self._orders_between(*self.catalog.day_range(order_date), None, 'get_orders_by_date')
+
+    _ORDER_LINES_BETWEEN_SQL = f"""
+                               SELECT {_ORDER_LINE_COLUMNS}
+                               FROM {{orders}} o
+                                        JOIN {{order_items}} oi ON o.order_id = oi.order_id
+                               WHERE o.order_date >= %s
+                                 AND o.order_date < %s
+                               """
+
+    def get_orders_between(self, start, end, group_by=None):
+        """
+        Same results as OrderProcessorRepositoryImpl.get_orders_between,
+        gathered from every shard in parallel and merged newest first (or,
+        with group_by, summed per period).
+        """
+        return self._orders_between(start, end, group_by, 'get_orders_between')
+
+    def _orders_between(self, start, end, group_by, method):
+        start = self.catalog.to_datetime(start)
+        end = self.catalog.to_datetime(end)
+        if group_by is not None:
+            return self._merge_order_totals(
+                self._scatter(lambda shard: shard.get_order_totals(start, end, group_by, method)))
+
+        try:
+            per_shard = self._scatter(lambda shard: self._read_order_rows(
+                shard, method, self._ORDER_LINES_BETWEEN_SQL, (start, end), self._NEWEST_FIRST, start))
+
+            # Each shard's rows are already newest first, so a k-way merge
+            # keeps every order's lines together
+            rows = list(heapq.merge(*per_shard, key=self._newest_first_key, reverse=True))
+            return self._complete_orders(rows, method)
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return {}
+
+    @staticmethod
+    def _merge_order_totals(per_shard):
+        merged = {}
+        for totals in per_shard:
+            for row in totals:
+                entry = merged.setdefault(row['period'], {'period': row['period'], 'order_count': 0,
+                                                          'revenue': Decimal('0.00'), 'units': 0})
+                entry['order_count'] += row['order_count']
+                entry['revenue'] += row['revenue']
+                entry['units'] += row['units']
+        return [merged[period] for period in sorted(merged)]
+
+    def iter_orders_by_date(self, order_date):
+        return self._iter_orders_between(*self.catalog.day_range(order_date), 'iter_orders_by_date')
+
+    def iter_orders_between(self, start, end):
+        """
+        Streaming variant of get_orders_between: each shard's rows come from
+        an unbuffered cursor and are merged newest first as they are read,
+        and orders are completed from the catalog STREAM_PAGE_SIZE at a time.
+        One connection per shard is held until the generator is exhausted
+        or closed.
+        """
+        return self._iter_orders_between(start, end, 'iter_orders_between')
+
+    def _iter_orders_between(self, start, end, method):
+        start = self.catalog.to_datetime(start)
+        end = self.catalog.to_datetime(end)
+        streams = [self._iter_order_rows(shard, method, self._ORDER_LINES_BETWEEN_SQL,
+                                         (start, end), self._NEWEST_FIRST, start)
+                   for shard in self.shards]
+        try:
+            rows = []
+            order_ids = set()
+            for row in heapq.merge(*streams, key=self._newest_first_key, reverse=True):
+                if row['order_id'] not in order_ids:
+                    if len(order_ids) == self.STREAM_PAGE_SIZE:
+                        yield from self._complete_orders(rows, method).values()
+                        rows = []
+                        order_ids = set()
+                    order_ids.add(row['order_id'])
+                rows.append(row)
+            yield from self._complete_orders(rows, method).values()
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+        finally:
+            for stream in streams:
+                stream.close()
+
+    def get_order_lines_frame_by_date(self, order_date):
+        return self._order_lines_frame_between(*self.catalog.day_range(order_date), 'get_order_lines_frame_by_date')
+
+    def get_order_lines_frame_between(self, start, end):
+        """
+        Same frame as OrderProcessorRepositoryImpl.get_order_lines_frame_between:
+        order lines read from every shard in parallel, priced at the unit
+        price each line was sold at. Lines written before unit_price existed
+        fall back to the catalog's current price. Requires NumPy.
+        """
+        return self._order_lines_frame_between(start, end, 'get_order_lines_frame_between')
+
+    def _order_lines_frame_between(self, start, end, method):
+        schema = self.catalog.ORDER_LINES_FRAME_SCHEMA
+        price_column, price_dtype = schema[-1]
+        # Read as float so a NULL unit_price arrives as NaN
+        line_schema = schema[:-1] + [(price_column, 'float64')]
+        cents = self.catalog.CENTS_EXPRESSION
+        sql = f"""SELECT o.order_id,
+                         o.customer_id,
+                         o.order_date,
+                         {cents.format('o.total_price')},
+                         oi.product_id,
+                         oi.quantity,
+                         {cents.format('oi.unit_price')}
+                  FROM {{orders}} o
+                           JOIN {{order_items}} oi ON o.order_id = oi.order_id
+                  WHERE o.order_date >= %s
+                    AND o.order_date < %s"""
+        start = self.catalog.to_datetime(start)
+        params = (start, self.catalog.to_datetime(end))
+        frames = self._scatter(lambda shard: shard.read_frame(method, sql, params, line_schema, orders_from=start))
+        products = self.catalog.get_products_frame()
+
+        columns = {name: np.concatenate([frame[name] for frame in frames]) for name, _ in line_schema}
+        # Lines whose product is gone are dropped, as the single-database
+        # join does
+        position = np.searchsorted(products['product_id'], columns['product_id'])
+        position = np.minimum(position, max(len(products) - 1, 0))
+        if len(products):
+            known = products['product_id'][position] == columns['product_id']
+            current_cents = products['price_cents'][position]
+        else:
+            known = np.zeros(len(position), dtype=bool)
+            current_cents = np.zeros(len(position), dtype=price_dtype)
+        sold_cents = columns[price_column]
+        columns[price_column] = np.where(np.isnan(sold_cents), current_cents, sold_cents).astype(price_dtype)
+        order = np.lexsort((columns['order_id'][known], columns['order_date'][known]))
+        return ResultFrame({name: values[known][order] for name, values in columns.items()})
+
+    # Sales summaries: per shard, merged
+
+    def rebuild_sales_summaries(self):
+        return all(self._scatter(lambda shard: shard.rebuild_sales_summaries()))
+
+    def archive_orders(self, retention_days, batch_size=None):
+        """Runs OrderProcessorRepositoryImpl.archive_orders on every shard in parallel."""
+        archived = self._scatter(lambda shard: shard.archive_orders(retention_days, batch_size))
+        if None in archived:
+            return None
+        return sum(archived)
+
+    def get_daily_product_sales(self, start, end, product_id=None):
+        merged = {}
+        for rows in self._scatter(lambda shard: shard.get_daily_product_sales(start, end, product_id)):
+            for row in rows:
+                key = (row['sales_date'], row['product_id'])
+                entry = merged.setdefault(key, dict(row, units=0, revenue=Decimal('0.00')))
+                entry['units'] += row['units']
+                entry['revenue'] += row['revenue']
+        return [merged[key] for key in sorted(merged) if merged[key]['units'] != 0]
+
+    def get_best_sellers(self, start, end, limit=10):
+        totals = {}
+        for row in self.get_daily_product_sales(start, end):
+            units, revenue = totals.get(row['product_id'], (0, Decimal('0.00')))
+            totals[row['product_id']] = (units + row['units'], revenue + row['revenue'])
+        ranked = sorted((product_id for product_id in totals if totals[product_id][0] > 0),
+                        key=lambda product_id: (-totals[product_id][0], product_id))[:limit]
+        try:
+            products = self._products_by_id(ranked, 'get_best_sellers')
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            products = {}
+        return [{
+            'product_id': product_id,
+            'name': products[product_id].name if product_id in products else None,
+            'units': totals[product_id][0],
+            'revenue': totals[product_id][1]
+        } for product_id in ranked]
+
+    def get_customer_sales(self, customer_id):
+        try:
+            shard = self.shards[self._shard_of(customer_id, 'get_customer_sales')]
+            rows = self._read_rows(shard, 'get_customer_sales',
+                                   "SELECT order_count, units, revenue_cents FROM customer_sales "
+                                   "WHERE customer_id = %s", (customer_id,))
+            if not rows:
+                self._ensure_customer(customer_id, 'get_customer_sales')
+                rows = [{'order_count': 0, 'units': 0, 'revenue_cents': 0}]
+            return {
+                'order_count': int(rows[0]['order_count']),
+                'units': int(rows[0]['units']),
+                'revenue': self.catalog.from_cents(rows[0]['revenue_cents'])
+            }
+
+        except mysql.connector.Error as e:
+            logger.error("Database error: %s", e)
+            return None
+
+    @contextmanager
+    def unit_of_work(self, *, customer_id=None):
+        """
+        Runs the block's calls for one customer in two units of work: one on
+        the catalog (stock, order ids) and one on the customer's shard (cart,
+        orders). The customer's catalog row stays locked for the whole block,
+        so the customer cannot be moved in the meantime:
+
+            with repository.unit_of_work(customer_id=customer.customer_id):
+                repository.add_to_cart(customer, product, 2)
+                repository.place_order(customer, repository.get_all_from_cart(customer), address)
+
+        Calls about other customers do not belong in the block. As with
+        place_order there is no distributed transaction: the shard commits
+        first, then the catalog. customer_id is keyword-only so the call
+        keeps the OrderProcessorRepository signature; it is required here.
+        """
+        if customer_id is None:
+            raise TypeError("A sharded unit of work is scoped to one customer; pass customer_id")
+        with self.catalog.unit_of_work():
+            with self._cursor(self.catalog, 'unit_of_work') as (_, cursor):
+                shard = self.shards[self._lock_customer(cursor, customer_id)]
+            with shard.unit_of_work() as unit:
+                yield unit
+
+    # Rebalancing
+
+    def shard_stats(self):
+        """[{'shard', 'customers', 'orders'}] per shard, counted in parallel."""
+        def count(shard):
+            rows = self._read_rows(shard, 'shard_stats',
+                                   "SELECT COUNT(DISTINCT customer_id) AS customers, COUNT(*) AS orders FROM orders", ())
+            return rows[0]
+
+        return [{'shard': index, 'customers': int(row['customers']), 'orders': int(row['orders'])}
+                for index, row in enumerate(self._scatter(count))]
+
+    def move_customer(self, customer_id, target):
+        """
+        Moves a customer's cart, orders, order lines and sales to shard
+        target and repoints the catalog. Returns the number of orders moved.
+
+        The customer's catalog row (see _lock_customer) and their rows on the
+        source shard stay locked until the copy is committed on the target
+        and the catalog points there; then the source rows are deleted.
+        Leftovers of an interrupted move on the target are cleared first,
+        so a failed move can simply be run again. Order ids are kept; order
+        line ids are reassigned on the target. Archived orders land in the
+        target's live tables, where its next archive_orders run picks them up.
+        """
+        if not 0 <= target < len(self.shards):
+            raise ValueError(f"Shard must be between 0 and {len(self.shards) - 1}")
+
+        connections = []
+        try:
+            catalog_connection = self.catalog.connection_for('move_customer')
+            connections.append(catalog_connection)
+            catalog_cursor = catalog_connection.cursor(dictionary=True)
+            # Holding the customer's row keeps their cart writes, checkouts
+            # and cancels out until the move is done
+            catalog_connection.start_transaction()
+            source_index = self._lock_customer(catalog_cursor, customer_id)
+            if source_index == target:
+                catalog_connection.rollback()
+                return 0
+            source, destination = self.shards[source_index], self.shards[target]
+
+            source_connection = source.connection_for('move_customer')
+            connections.append(source_connection)
+            source_cursor = source_connection.cursor(dictionary=True)
+            source_connection.start_transaction()
+            lock = source.LOCK_ROWS_CLAUSE
+            source_cursor.execute("SELECT product_id, quantity FROM cart WHERE customer_id = %s ORDER BY cart_id"
+                                  + lock, (customer_id,))
+            cart_rows = source_cursor.fetchall()
+            orders = []
+            lines_by_order = {}
+            for orders_table, items_table in (source.LIVE_ORDER_TABLES, source.ARCHIVE_ORDER_TABLES):
+                source_cursor.execute("SELECT order_id, customer_id, order_date, total_price, shipping_address "
+                                      f"FROM {orders_table} WHERE customer_id = %s ORDER BY order_id" + lock,
+                                      (customer_id,))
+                orders += source_cursor.fetchall()
+                source_cursor.execute(f"""
+                                      SELECT oi.order_id, oi.product_id, oi.quantity, oi.unit_price,
+                                             {source.CENTS_EXPRESSION.format('oi.unit_price')} AS price_cents
+                                      FROM {items_table} oi
+                                               JOIN {orders_table} o ON oi.order_id = o.order_id
+                                      WHERE o.customer_id = %s
+                                      ORDER BY oi.order_item_id
+                                      """, (customer_id,))
+                for line in source_cursor.fetchall():
+                    lines_by_order.setdefault(line['order_id'], []).append(line)
+            orders.sort(key=lambda order: order['order_id'])
+            # Lines written before unit_price existed are summarised at the
+            # catalog's current price, as rebuild_sales_summaries does
+            unpriced = [line for lines in lines_by_order.values() for line in lines if line['price_cents'] is None]
+            current_cents = self._price_cents_by_id(catalog_cursor, [line['product_id'] for line in unpriced])
+            for line in unpriced:
+                line['price_cents'] = current_cents.get(line['product_id'])
+
+            destination_connection = destination.connection_for('move_customer')
+            connections.append(destination_connection)
+            destination_cursor = destination_connection.cursor(dictionary=True)
+            destination_connection.start_transaction()
+            self._clear_customer(destination, destination_cursor, customer_id)
+            self._copy_customer(destination, destination_cursor, customer_id, cart_rows, orders, lines_by_order)
+            destination_connection.commit()
+
+            catalog_cursor.execute("DELETE FROM customer_shards WHERE customer_id = %s", (customer_id,))
+            if target != customer_id % len(self.shards):
+                catalog_cursor.execute("INSERT INTO customer_shards (customer_id, shard) VALUES (%s, %s)",
+                                       (customer_id, target))
+            catalog_cursor.execute("UPDATE order_shards SET shard = %s WHERE customer_id = %s",
+                                   (target, customer_id))
+            catalog_connection.commit()
+
+            try:
+                self._clear_customer(source, source_cursor, customer_id)
+                source_connection.commit()
+            except mysql.connector.Error:
+                logger.error("Customer %s was moved to shard %s but their rows on shard %s could not be "
+                             "deleted; they are no longer read and can be removed by hand",
+                             customer_id, target, source_index)
+                raise
+            return len(orders)
+
+        except BaseException:
+            self._rollback(*connections)
+            raise
+        finally:
+            for connection in reversed(connections):
+                connection.close()
+
+    def _price_cents_by_id(self, cursor, product_ids):
+        """Current catalog price in cents per product id, read on cursor."""
+        product_ids = sorted(set(product_ids))
+        prices = {}
+        for start in range(0, len(product_ids), self.LOOKUP_BATCH_SIZE):
+            chunk = product_ids[start:start + self.LOOKUP_BATCH_SIZE]
+            cursor.execute(
+                f"SELECT product_id, {self.catalog.CENTS_EXPRESSION.format('price')} AS price_cents "
+                "FROM products WHERE product_id IN (" + ", ".join(["%s"] * len(chunk)) + ")",
+                chunk
+            )
+            prices.update((row['product_id'], row['price_cents']) for row in cursor.fetchall())
+        return prices
+
+    @staticmethod
+    def _clear_customer(shard, cursor, customer_id):
+        # remove_order takes each order back out of the sales summaries
+        for tables in (shard.LIVE_ORDER_TABLES, shard.ARCHIVE_ORDER_TABLES):
+            cursor.execute(f"SELECT order_id FROM {tables[0]} WHERE customer_id = %s", (customer_id,))
+            for row in cursor.fetchall():
+                shard.remove_order(cursor, row['order_id'], tables)
+        cursor.execute("DELETE FROM customer_sales WHERE customer_id = %s", (customer_id,))
+        cursor.execute("DELETE FROM cart WHERE customer_id = %s", (customer_id,))
+
+    @staticmethod
+    def _copy_customer(shard, cursor, customer_id, cart_rows, orders, lines_by_order):
+        for row in cart_rows:
+            cursor.execute("INSERT INTO cart (customer_id, product_id, quantity) VALUES (%s, %s, %s)",
+                           (customer_id, row['product_id'], row['quantity']))
+        for order in orders:
+            order_date = shard.to_datetime(order['order_date'])
+            cursor.execute(
+                """INSERT INTO orders
+                       (order_id, customer_id, order_date, total_price, shipping_address)
+                   VALUES (%s, %s, %s, %s, %s)""",
+                (order['order_id'], customer_id, order_date, order['total_price'], order['shipping_address'])
+            )
+            lines = lines_by_order.get(order['order_id'], [])
+            sales = {}
+            for line in lines:
+                cursor.execute(
+                    "INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (%s, %s, %s, %s)",
+                    (order['order_id'], line['product_id'], line['quantity'], line['unit_price'])
+                )
+                units, revenue_cents = sales.get(line['product_id'], (0, 0))
+                sales[line['product_id']] = (units + line['quantity'],
+                                             revenue_cents + (line['price_cents'] or 0) * line['quantity'])
+            total_cents = int(Decimal(str(order['total_price'])) * 100)
+            shard.apply_sales(cursor, customer_id, order_date.date(), sales, sign=1, order_total_cents=total_cents)
@@ -0,0 +1,218 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dao.async_order_processor_repository import AsyncOrderProcessorRepository
+from exception.ConnectionPoolTimeoutException import ConnectionPoolTimeoutException
+
+
+class ThreadOffloadOrderProcessorRepository(AsyncOrderProcessorRepository):
+    """
+    AsyncOrderProcessorRepository over any synchronous repository (MySQL,
+    SQLite, cached). Every call runs whole on a worker thread, so it keeps
+    the transaction boundaries of the wrapped method, and the event loop
+    never blocks on the database.
+
+    At most pool_size calls run at once: that is the number of worker
+    threads, and it should match the connection pool size. Further calls
+    wait on the event loop, not in a thread, for up to pool_timeout seconds
+    and then raise ConnectionPoolTimeoutException.
+
+    A unit of work is bound to the thread that opened it, so it cannot span
+    awaits; run_in_unit_of_work runs a synchronous callable inside one on a
+    single worker thread instead.
+    """
+
+    # Rows moved per thread hop by the async iter_* methods
+    STREAM_BATCH_SIZE = 100
+
+    def __init__(self, repository, pool_size=5, pool_timeout=10.0):
+        self.repository = repository
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="repository")
+        self._slots = None
+        self._slots_loop = None
+
+    def _get_slots(self):
+        # A semaphore belongs to one event loop; make one per running loop
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.pool_size)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _acquire(self):
+        try:
+            await asyncio.wait_for(self._get_slots().acquire(), self.pool_timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionPoolTimeoutException(self.pool_timeout)
+
+    async def _run(self, function, *args):
+        await self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, function, *args)
+        finally:
+            self._get_slots().release()
+
+    @staticmethod
+    def _next_batch(iterator, size):
+        batch = []
+        for item in iterator:
+            batch.append(item)
+            if len(batch) == size:
+                break
+        return batch
+
+    async def _stream(self, function, *args):
+        # The sync generator holds its connection until exhausted or closed,
+        # so its slot stays taken for the whole iteration
+        await self._acquire()
+        loop = asyncio.get_running_loop()
+        iterator = None
+        try:
+            iterator = await loop.run_in_executor(self._executor, function, *args)
+            while True:
+                batch = await loop.run_in_executor(self._executor, self._next_batch,
+                                                   iterator, self.STREAM_BATCH_SIZE)
+                for item in batch:
+                    yield item
+                if len(batch) < self.STREAM_BATCH_SIZE:
+                    return
+        finally:
+            if iterator is not None and hasattr(iterator, 'close'):
+                await loop.run_in_executor(self._executor, iterator.close)
+            self._get_slots().release()
+
+    async def close(self):
+        """Waits for running calls, then closes the wrapped repository if it can be closed."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown)
+        close = getattr(self.repository, 'close', None)
+        if close:
+            close()
+
+    async def create_product(self, product):
+        return await self._run(self.repository.create_product, product)
+
+    async def bulk_create_products(self, products):
+        return await self._run(self.repository.bulk_create_products, products)
+
+    async def create_customer(self, customer):
+        return await self._run(self.repository.create_customer, customer)
+
+    async def get_existing_emails(self, emails):
+        return await self._run(self.repository.get_existing_emails, emails)
+
+    async def bulk_create_customers(self, customers, prepare=None):
+        return await self._run(self.repository.bulk_create_customers, customers, prepare)
+
+    async def delete_product(self, product_id):
+        return await self._run(self.repository.delete_product, product_id)
+
+    async def delete_customer(self, customer_id):
+        return await self._run(self.repository.delete_customer, customer_id)
+
+    async def add_to_cart(self, customer, product, quantity):
+        return await self._run(self.repository.add_to_cart, customer, product, quantity)
+
+    async def remove_from_cart(self, customer, product):
+        return await self._run(self.repository.remove_from_cart, customer, product)
+
+    async def get_all_from_cart(self, customer):
+        return await self._run(self.repository.get_all_from_cart, customer)
+
+    async def get_cart_summary(self, customer):
+        return await self._run(self.repository.get_cart_summary, customer)
+
+    async def place_order(self, customer, cart_items, shipping_address, total_price=None):
+        return await self._run(self.repository.place_order, customer, cart_items, shipping_address, total_price)
+
+    async def cancel_order(self, order_id, restocked=None):
+        return await self._run(self.repository.cancel_order, order_id, restocked)
+
+    async def get_orders_by_customer(self, customer_id):
+        return await self._run(self.repository.get_orders_by_customer, customer_id)
+
+    async def get_orders_by_date(self, order_date):
+        return await self._run(self.repository.get_orders_by_date, order_date)
+
+    async def get_orders_between(self, start, end, group_by=None):
+        return await self._run(self.repository.get_orders_between, start, end, group_by)
+
+    async def get_products_page(self, page_size=50, continuation_token=None):
+        return await self._run(self.repository.get_products_page, page_size, continuation_token)
+
+    async def get_customers_page(self, page_size=50, continuation_token=None):
+        return await self._run(self.repository.get_customers_page, page_size, continuation_token)
+
+    async def get_orders_by_customer_page(self, customer_id, page_size=20, continuation_token=None):
+        return await self._run(self.repository.get_orders_by_customer_page,
+                               customer_id, page_size, continuation_token)
+
+    def iter_orders_by_customer(self, customer_id):
+        return self._stream(self.repository.iter_orders_by_customer, customer_id)
+
+    def iter_orders_by_date(self, order_date):
+        return self._stream(self.repository.iter_orders_by_date, order_date)
+
+    def iter_orders_between(self, start, end):
+        return self._stream(self.repository.iter_orders_between, start, end)
+
+    async def get_product_by_id(self, product_id):
+        return await self._run(self.repository.get_product_by_id, product_id)
+
+    async def get_products_frame(self):
+        return await self._run(self.repository.get_products_frame)
+
+    async def get_order_lines_frame_by_date(self, order_date):
+        return await self._run(self.repository.get_order_lines_frame_by_date, order_date)
+
+    async def get_order_lines_frame_between(self, start, end):
+        return await self._run(self.repository.get_order_lines_frame_between, start, end)
+
+    async def get_daily_product_sales(self, start, end, product_id=None):
+        return await self._run(self.repository.get_daily_product_sales, start, end, product_id)
+
+    async def get_best_sellers(self, start, end, limit=10):
+        return await self._run(self.repository.get_best_sellers, start, end, limit)
+
+    async def get_customer_sales(self, customer_id):
+        return await self._run(self.repository.get_customer_sales, customer_id)
+
+    async def rebuild_sales_summaries(self):
+        return await self._run(self.repository.rebuild_sales_summaries)
+
+    async def archive_orders(self, retention_days, batch_size=None):
+        return await self._run(self.repository.archive_orders, retention_days, batch_size)
+
+    async def run_in_unit_of_work(self, work, **scope):
+        """
+        Calls work(repository) with the wrapped synchronous repository inside
+        repository.unit_of_work(**scope) on one worker thread, and returns
+        its result. Everything work does commits together, or rolls back if
+        it raises:
+
+            await repository.run_in_unit_of_work(
+                lambda sync: sync.place_order(customer, sync.get_all_from_cart(customer), address))
+
+        scope is passed on, e.g. customer_id for a sharded repository.
+        """
+        def run():
+            with self.repository.unit_of_work(**scope):
+                return work(self.repository)
+
+        return await self._run(run)
+
+    # Methods the synchronous implementations add beyond the interface
+
+    async def get_order_by_id(self, order_id):
+        return await self._run(self.repository.get_order_by_id, order_id)
+
+    async def get_all_products(self):
+        return await self._run(self.repository.get_all_products)
+
+    async def get_all_customers(self):
+        return await self._run(self.repository.get_all_customers)
+
+    async def update_customer(self, customer):
+        return await self._run(self.repository.update_customer, customer)
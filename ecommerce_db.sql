@@ -120,8 +120,7 @@ WHERE order_item_id = 2;
 
 ALTER TABLE order_items AUTO_INCREMENT = 1;
 
--- ------------------
-
-
-
-
+-- ------------------
+
+-- Later schema changes (cart constraints, secondary indexes, ...) are versioned
+-- migrations in util/migrations.py. Apply them with: python -m main.migrate
@@ -1,43 +1,15 @@
-class Customer:
-    def __init__(self, customer_id=None, name=None, email=None, password=None):
-        self.__customer_id = customer_id
-        self.__name = name
-        self.__email = email
-        self.__password = password
-
-    # Getters
-    @property
-    def customer_id(self):
-        return self.__customer_id
-
-    @property
-    def name(self):
-        return self.__name
-
-    @property
-    def email(self):
-        return self.__email
+from entity.entity import Entity
 
-    @property
-    def password(self):
-        return self.__password
 
-    # Setters
-    @customer_id.setter
-    def customer_id(self, customer_id):
-        self.__customer_id = customer_id
+class Customer(Entity):
+    __slots__ = ('customer_id', 'name', 'email', 'password')
+    _ID_FIELD = 'customer_id'
 
-    @name.setter
-    def name(self, name):
-        self.__name = name
-
-    @email.setter
-    def email(self, email):
-        self.__email = email
-
-    @password.setter
-    def password(self, password):
-        self.__password = password
+    def __init__(self, customer_id=None, name=None, email=None, password=None):
+        self.customer_id = customer_id
+        self.name = name
+        self.email = email
+        self.password = password
 
     def __str__(self):
-        return f"Customer ID: {self.__customer_id}, Name: {self.__name}, Email: {self.__email}"
\ No newline at end of file
+        return f"Customer ID: {self.customer_id}, Name: {self.name}, Email: {self.email}"
@@ -0,0 +1,28 @@
+class Entity:
+    """
+    Base for the entity classes. Subclasses declare their fields in
+    __slots__, so instances carry no per-instance __dict__.
+
+    Two entities of the same class are equal when they share a primary key;
+    entities not yet saved (key None) are only equal to themselves. The hash
+    follows the key, so assign it before putting an entity in a set or dict.
+    """
+
+    __slots__ = ()
+
+    # Name of the primary-key attribute
+    _ID_FIELD = None
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        key = getattr(self, self._ID_FIELD)
+        if key is None:
+            return self is other
+        return key == getattr(other, self._ID_FIELD)
+
+    def __hash__(self):
+        key = getattr(self, self._ID_FIELD)
+        if key is None:
+            return object.__hash__(self)
+        return hash((type(self).__name__, key))
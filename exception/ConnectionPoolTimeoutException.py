@@ -0,0 +1,4 @@
+class ConnectionPoolTimeoutException(Exception):
+    def __init__(self, timeout):
+        super().__init__(f"Timed out after {timeout} seconds waiting for a database connection")
+        self.timeout = timeout
@@ -0,0 +1,4 @@
+class UnitOfWorkRolledBackException(Exception):
+    def __init__(self, reason="a repository call inside it failed"):
+        super().__init__(f"Unit of work was rolled back: {reason}")
+        self.reason = reason
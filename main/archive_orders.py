@@ -0,0 +1,29 @@
+import argparse
+import sys
+from dao.order_processor_repository_factory import OrderProcessorRepositoryFactory
+from util.db_property_util import DBPropertyUtil
+
+
+def main(argv=None):
+    archive_config = DBPropertyUtil.get_archive_properties()
+    parser = argparse.ArgumentParser(prog="python -m main.archive_orders",
+                                     description="Move orders older than the retention window to the archive tables")
+    parser.add_argument('--days', type=int, default=archive_config['retention_days'],
+                        help="retention window in days (default: [archive] retention_days)")
+    parser.add_argument('--batch-size', type=int, default=archive_config['batch_size'],
+                        help="orders moved per transaction (default: [archive] batch_size)")
+    args = parser.parse_args(argv)
+    if args.days < 0 or args.batch_size < 1:
+        parser.error("--days must not be negative and --batch-size must be positive")
+
+    repository = OrderProcessorRepositoryFactory.get_repository()
+    archived = repository.archive_orders(args.days, args.batch_size)
+    if archived is None:
+        print("Archiving stopped on a database error; batches already moved stay archived.")
+        return 1
+    print(f"Archived {archived} orders placed more than {args.days} days ago.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,25 @@
-import re
+import logging
 from datetime import datetime
 from entity.customer import Customer
 from entity.product import Product
 from entity.cart import Cart
 from entity.order import Order
 from entity.order_item import OrderItem
-from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.order_processor_repository_factory import OrderProcessorRepositoryFactory
 from exception.CustomerNotFoundException import CustomerNotFoundException
 from exception.ProductNotFoundException import ProductNotFoundException
 from exception.OrderNotFoundException import OrderNotFoundException
+from util.db_property_util import DBPropertyUtil
+from util.password_hasher import PasswordHasher
+from util.validators import Validators
 
 
 class EcomApp:
+    # Rows shown per screen in the listing menus
+    PAGE_SIZE = 20
+
     def __init__(self):
-        self.processor = OrderProcessorRepositoryImpl()
+        self.processor = OrderProcessorRepositoryFactory.get_repository()
 
     def display_menu(self):
         print("\n===== E-Commerce Application Menu =====")
@@ -34,53 +40,21 @@ class EcomApp:
         print("15. View Orders by Date")
         print("16. Exit")
 
-    # Validation helper methods
+    # Validation helper methods; the rules live in util.validators
     def validate_name(self, name):
-        if not name.strip():
-            raise ValueError("Name cannot be empty")
-        if len(name) > 100:
-            raise ValueError("Name cannot exceed 100 characters")
-        if not re.match(r'^[a-zA-Z\s\-\.\']+$', name):
-            raise ValueError("Name can only contain letters, spaces, hyphens, apostrophes, and periods")
-        return name
+        return Validators.validate_name(name)
 
     def validate_email(self, email):
-        if not email.strip():
-            raise ValueError("Email cannot be empty")
-        if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-            raise ValueError("Please enter a valid email address (e.g., user@example.com)")
-        return email.lower()
+        return Validators.validate_email(email)
 
     def validate_password(self, password):
-        if len(password) < 8:
-            raise ValueError("Password must be at least 8 characters long")
-        if not re.search(r'[A-Z]', password):
-            raise ValueError("Password must contain at least one uppercase letter")
-        if not re.search(r'[a-z]', password):
-            raise ValueError("Password must contain at least one lowercase letter")
-        if not re.search(r'[0-9]', password):
-            raise ValueError("Password must contain at least one number")
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            raise ValueError("Password must contain at least one special character")
-        return password
+        return Validators.validate_password(password)
 
     def validate_price(self, price):
-        try:
-            price = float(price)
-            if price <= 0:
-                raise ValueError("Price must be greater than 0")
-            return round(price, 2)
-        except ValueError:
-            raise ValueError("Price must be a valid number")
+        return Validators.validate_price(price)
 
     def validate_stock(self, stock):
-        try:
-            stock = int(stock)
-            if stock < 0:
-                raise ValueError("Stock quantity cannot be negative")
-            return stock
-        except ValueError:
-            raise ValueError("Stock quantity must be a whole number")
+        return Validators.validate_stock(stock)
 
     def register_customer(self):
         print("\n--- Register Customer ---")
@@ -95,7 +69,7 @@ class EcomApp:
                 if input("Try again? (yes/no): ").lower() != 'yes':
                     return
 
-        customer = Customer(name=name, email=email, password=password)
+        customer = Customer(name=name, email=email, password=PasswordHasher.hash(password))
         if self.processor.create_customer(customer):
             print("Customer registered successfully!")
         else:
@@ -105,14 +79,9 @@ class EcomApp:
         print("\n--- Create Product ---")
         while True:
             try:
-                name = input("Enter product name: ").strip()
-                if not name:
-                    raise ValueError("Product name cannot be empty")
-
+                name = Validators.validate_product_name(input("Enter product name: "))
                 price = self.validate_price(input("Enter price: "))
-                description = input("Enter description: ").strip()
-                if not description:
-                    raise ValueError("Description cannot be empty")
+                description = Validators.validate_description(input("Enter description: "))
 
                 stock = self.validate_stock(input("Enter stock quantity: "))
                 break
@@ -127,30 +96,42 @@ class EcomApp:
         else:
             print("Failed to create product.")
 
+    # Paging helper
+    def show_next_page(self):
+        return input("\nPress Enter for the next page or 'q' to stop: ").strip().lower() != 'q'
+
     def view_all_products(self):
         print("\n--- All Products ---")
-        products = self.processor.get_all_products()
+        products, next_token = self.processor.get_products_page(self.PAGE_SIZE)
         if not products:
             print("No products available.")
             return
 
         print(f"\n{'ID':<5} {'Name':<20} {'Price':<10} {'Stock':<10} Description")
         print("-" * 70)
-        for product in products:
-            print(
-                f"{product.product_id:<5} {product.name:<20} ${product.price:<9.2f} {product.stock_quantity:<10} {product.description}")
+        while True:
+            for product in products:
+                print(
+                    f"{product.product_id:<5} {product.name:<20} ${product.price:<9.2f} {product.stock_quantity:<10} {product.description}")
+            if not next_token or not self.show_next_page():
+                break
+            products, next_token = self.processor.get_products_page(self.PAGE_SIZE, next_token)
 
     def view_all_customers(self):
         print("\n--- All Customers ---")
-        customers = self.processor.get_all_customers()
+        customers, next_token = self.processor.get_customers_page(self.PAGE_SIZE)
         if not customers:
             print("No customers registered.")
             return
 
         print(f"\n{'ID':<5} {'Name':<20} {'Email':<30}")
         print("-" * 60)
-        for customer in customers:
-            print(f"{customer.customer_id:<5} {customer.name:<20} {customer.email:<30}")
+        while True:
+            for customer in customers:
+                print(f"{customer.customer_id:<5} {customer.name:<20} {customer.email:<30}")
+            if not next_token or not self.show_next_page():
+                break
+            customers, next_token = self.processor.get_customers_page(self.PAGE_SIZE, next_token)
 
     def delete_product(self):
         print("\n--- Delete Product ---")
@@ -272,20 +253,18 @@ class EcomApp:
         customer = Customer(customer_id=customer_id)
 
         try:
-            cart_items = self.processor.get_all_from_cart(customer)
-            if not cart_items:
+            summary = self.processor.get_cart_summary(customer)
+            if not summary['items']:
                 print("Your cart is empty!")
                 return
 
             print("\nYour Cart Items:")
-            total = 0
-            for cart, product in cart_items:
-                item_total = product.price * cart.quantity
-                total += item_total
+            for cart, product, line_total in summary['items']:
                 print(f"Cart ID: {cart.cart_id}")
-                print(f"{product.name} - ${product.price:.2f} x {cart.quantity} = ${item_total:.2f}")
+                print(f"{product.name} - ${product.price:.2f} x {cart.quantity} = ${line_total}")
                 print("-" * 30)
-            print(f"\nTotal: ${total:.2f}")
+            print(f"\nItems: {summary['item_count']}")
+            print(f"Total: ${summary['total']}")
         except CustomerNotFoundException as e:
             print(f"Error: {e}")
 
@@ -297,23 +276,24 @@ class EcomApp:
         customer = Customer(customer_id=customer_id)
 
         try:
-            cart_items = self.processor.get_all_from_cart(customer)
-            if not cart_items:
+            summary = self.processor.get_cart_summary(customer)
+            if not summary['items']:
                 print("Your cart is empty!")
                 return
 
             print("\nOrder Summary:")
-            total = 0.0
-            for cart, product in cart_items:
-                item_total = float(product.price) * cart.quantity
-                total += item_total
-                print(f"{product.name} - ${float(product.price):.2f} x {cart.quantity} = ${item_total:.2f}")
-            print(f"\nTotal: ${total:.2f}")
+            for cart, product, line_total in summary['items']:
+                print(f"{product.name} - ${product.price:.2f} x {cart.quantity} = ${line_total}")
+            print(f"\nTotal: ${summary['total']}")
             print(f"Shipping to: {shipping_address}")
 
             confirm = input("\nConfirm order (yes/no)? ").lower()
             if confirm == 'yes':
-                order, order_items = self.processor.place_order(customer, cart_items, shipping_address, total)
+                # The repository re-prices the cart in the checkout transaction
+                # and refuses the order if it no longer matches this total
+                cart_items = [(cart, product) for cart, product, _ in summary['items']]
+                order, order_items = self.processor.place_order(customer, cart_items, shipping_address,
+                                                                summary['total'])
                 if order:
                     print(f"\nOrder placed successfully! Order ID: {order.order_id}")
                     print("Order Items:")
@@ -356,19 +336,24 @@ class EcomApp:
         customer_id = int(input("Enter customer ID: "))
 
         try:
-            orders = self.processor.get_orders_by_customer(customer_id)
+            orders, next_token = self.processor.get_orders_by_customer_page(customer_id, self.PAGE_SIZE)
             if not orders:
                 print("No orders found for this customer.")
                 return
 
-            for order_id, (order, items) in orders.items():
-                print(f"\nOrder ID: {order.order_id}")
-                print(f"Date: {order.order_date}")
-                print(f"Total: ${order.total_price:.2f}")
-                print(f"Shipping Address: {order.shipping_address}")
-                print("\nProducts:")
-                for item, product in items:
-                    print(f"  {product.name} - ${product.price:.2f} x {item.quantity}")
+            while True:
+                for order_id, (order, items) in orders.items():
+                    print(f"\nOrder ID: {order.order_id}")
+                    print(f"Date: {order.order_date}")
+                    print(f"Total: ${order.total_price:.2f}")
+                    print(f"Shipping Address: {order.shipping_address}")
+                    print("\nProducts:")
+                    for item, product in items:
+                        print(f"  {product.name} - ${product.price:.2f} x {item.quantity}")
+                if not next_token or not self.show_next_page():
+                    break
+                orders, next_token = self.processor.get_orders_by_customer_page(
+                    customer_id, self.PAGE_SIZE, next_token)
         except CustomerNotFoundException as e:
             print(f"Error: {e}")
 
@@ -461,7 +446,7 @@ class EcomApp:
                     customer.email = new_email
                 elif field == '3':
                     new_password = self.validate_password(input("Enter new password: "))
-                    customer.password = new_password
+                    customer.password = PasswordHasher.hash(new_password)
                 else:
                     print("Invalid field selection")
                     continue
@@ -525,5 +510,6 @@ class EcomApp:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=DBPropertyUtil.get_logging_properties()['level'], format="%(message)s")
     app = EcomApp()
     app.run()
\ No newline at end of file
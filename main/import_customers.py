@@ -0,0 +1,44 @@
+import argparse
+import sys
+from dao.order_processor_repository_factory import OrderProcessorRepositoryFactory
+from util.customer_importer import CustomerImporter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m main.import_customers",
+                                     description="Bulk-register customers from a CSV or JSONL export")
+    parser.add_argument('path', help="CSV with a name,email,password header, or JSONL")
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="default: from the file extension")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="records per commit (default 10000)")
+    parser.add_argument('--workers', type=int, help="password hashing processes (default: one per core)")
+    parser.add_argument('--rejects', help="rejected-records report (default: <path>.rejects.csv)")
+    parser.add_argument('--resume', action='store_true', help="continue from the last committed chunk")
+    parser.add_argument('--prehashed', action='store_true',
+                        help="store passwords that are already PasswordHasher hashes unchanged "
+                             "(migrating from a store that uses the same scheme)")
+    args = parser.parse_args(argv)
+
+    importer = CustomerImporter(OrderProcessorRepositoryFactory.get_repository(),
+                                chunk_size=args.chunk_size,
+                                rejects_path=args.rejects or args.path + '.rejects.csv',
+                                checkpoint_path=args.path + '.checkpoint',
+                                workers=args.workers,
+                                prehashed=args.prehashed)
+    try:
+        summary = importer.run(args.path, args.format, resume=args.resume)
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
+        return 1
+
+    print(f"Records read: {summary['records']} (resumed after {summary['resumed_from']})")
+    print(f"Registered: {summary['inserted']}, already registered: {summary['existing']}, "
+          f"duplicates in file: {summary['duplicates']}, rejected in total: {summary['rejected']}")
+    print(f"Rejected records: {importer.rejects_path}")
+    if not summary['completed']:
+        print("Import stopped on a database error; rerun with --resume to continue.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import argparse
+import sys
+from dao.order_processor_repository_factory import OrderProcessorRepositoryFactory
+from util.product_importer import ProductImporter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m main.import_products",
+                                     description="Bulk-load products from a CSV or JSONL feed")
+    parser.add_argument('path', help="CSV with a name,price,description,stock_quantity header, or JSONL")
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="default: from the file extension")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="records per commit (default 10000)")
+    parser.add_argument('--rejects', help="rejected-records report (default: <path>.rejects.csv)")
+    parser.add_argument('--resume', action='store_true', help="continue from the last committed chunk")
+    args = parser.parse_args(argv)
+
+    importer = ProductImporter(OrderProcessorRepositoryFactory.get_repository(),
+                               chunk_size=args.chunk_size,
+                               rejects_path=args.rejects or args.path + '.rejects.csv',
+                               checkpoint_path=args.path + '.checkpoint')
+    try:
+        summary = importer.run(args.path, args.format, resume=args.resume)
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
+        return 1
+
+    print(f"Records read: {summary['records']} (resumed after {summary['resumed_from']})")
+    print(f"Inserted: {summary['inserted']}, already in catalog: {summary['existing']}, "
+          f"duplicates in file: {summary['duplicates']}, rejected in total: {summary['rejected']}")
+    print(f"Rejected records: {importer.rejects_path}")
+    if not summary['completed']:
+        print("Import stopped on a database error; rerun with --resume to continue.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import argparse
+import sys
+from util.db_property_util import DBPropertyUtil
+from util.migration_runner import MigrationRunner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m main.migrate",
+                                     description="Apply versioned schema migrations")
+    parser.add_argument('--target', type=int, help="stop after this version")
+    parser.add_argument('--status', action='store_true', help="only show the current and pending versions")
+    args = parser.parse_args(argv)
+
+    backend = DBPropertyUtil.get_backend()
+    if backend == 'sqlite':
+        # SQLite databases are migrated when they are opened
+        from util.sqlite_conn_util import SQLiteDatabase
+        database = SQLiteDatabase(DBPropertyUtil.get_sqlite_properties()['path'])
+        runners = [("", MigrationRunner(database.get_connection, 'sqlite'))]
+    else:
+        from util.db_conn_util import DBConnUtil
+        runners = [("", MigrationRunner(DBConnUtil.get_connection, 'mysql'))]
+        # Shard databases carry the same schema as the catalog
+        runners += [(f"Shard {index}: ", MigrationRunner(pool.get_connection, 'mysql'))
+                    for index, pool in enumerate(DBConnUtil.get_shard_pools())]
+
+    for label, runner in runners:
+        print(f"{label}Current schema version: {runner.current_version()}")
+        if args.status:
+            for version, description, _ in runner.pending():
+                print(f"{label}Pending {version}: {description}")
+            continue
+
+        applied = runner.migrate(args.target)
+        if not applied:
+            print(f"{label}Schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
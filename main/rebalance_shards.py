@@ -0,0 +1,38 @@
+import argparse
+import sys
+from dao.order_processor_repository_factory import OrderProcessorRepositoryFactory
+from exception.CustomerNotFoundException import CustomerNotFoundException
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m main.rebalance_shards",
+                                     description="Show shard sizes or move a customer to another shard")
+    parser.add_argument('--status', action='store_true', help="show the customers and orders on each shard")
+    parser.add_argument('--customer', type=int, help="customer to move")
+    parser.add_argument('--to', type=int, dest='target', help="shard to move the customer to")
+    args = parser.parse_args(argv)
+    if not args.status and (args.customer is None or args.target is None):
+        parser.error("either --status or both --customer and --to are required")
+
+    repository = OrderProcessorRepositoryFactory.get_repository()
+    repository = getattr(repository, 'repository', repository)  # past the product cache
+    if not hasattr(repository, 'move_customer'):
+        print("Sharding is not configured.")
+        return 1
+
+    if args.status:
+        for stats in repository.shard_stats():
+            print(f"Shard {stats['shard']}: {stats['customers']} customers, {stats['orders']} orders")
+        return 0
+
+    try:
+        moved = repository.move_customer(args.customer, args.target)
+    except (CustomerNotFoundException, ValueError) as e:
+        print(e)
+        return 1
+    print(f"Customer {args.customer} is on shard {args.target} ({moved} orders moved).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
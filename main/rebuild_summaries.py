@@ -0,0 +1,20 @@
+import argparse
+import sys
+from dao.order_processor_repository_factory import OrderProcessorRepositoryFactory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m main.rebuild_summaries",
+                                     description="Recompute the sales summary tables from the order history")
+    parser.parse_args(argv)
+
+    repository = OrderProcessorRepositoryFactory.get_repository()
+    if not repository.rebuild_sales_summaries():
+        print("Rebuild failed; the previous summaries were kept.")
+        return 1
+    print("Sales summaries rebuilt.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from dao.thread_offload_order_processor_repository import ThreadOffloadOrderProcessorRepository
+from entity.customer import Customer
+from entity.product import Product
+from exception.ConnectionPoolTimeoutException import ConnectionPoolTimeoutException
+from exception.CustomerNotFoundException import CustomerNotFoundException
+
+
+class TestAsyncRepository(unittest.IsolatedAsyncioTestCase):
+    """The asyncio interface over the SQLite stand-in"""
+
+    async def asyncSetUp(self):
+        self.repository = ThreadOffloadOrderProcessorRepository(
+            OrderProcessorRepositorySqliteImpl(':memory:'), pool_size=4, pool_timeout=5)
+        await self.repository.create_product(Product(name="Async Product", price=2.5, stock_quantity=5))
+        self.product = (await self.repository.get_all_products())[0]
+
+    async def asyncTearDown(self):
+        await self.repository.close()
+
+    async def _customer(self, number):
+        customer = Customer(name=f"Shopper {number}", email=f"shopper{number}@unittest.com", password="p")
+        await self.repository.create_customer(customer)
+        customers, _ = await self.repository.get_customers_page(page_size=100)
+        return next(c for c in customers if c.email == customer.email)
+
+    async def test_concurrent_checkouts_keep_transactions(self):
+        """Eight shoppers race for five units; each checkout stays atomic"""
+        shoppers = [await self._customer(number) for number in range(8)]
+        for shopper in shoppers:
+            await self.repository.add_to_cart(shopper, self.product, 1)
+
+        async def checkout(shopper):
+            cart_items = await self.repository.get_all_from_cart(shopper)
+            order, _ = await self.repository.place_order(shopper, cart_items, "1 Async St")
+            return order
+
+        orders = await asyncio.gather(*(checkout(shopper) for shopper in shoppers))
+        self.assertEqual(sum(1 for order in orders if order), 5)
+        self.assertEqual((await self.repository.get_product_by_id(self.product.product_id)).stock_quantity, 0)
+
+    async def test_exceptions_and_streaming(self):
+        with self.assertRaises(CustomerNotFoundException):
+            await self.repository.get_orders_by_customer(999)
+
+        shopper = await self._customer(1)
+        for _ in range(3):
+            await self.repository.add_to_cart(shopper, self.product, 1)
+            await self.repository.place_order(shopper, await self.repository.get_all_from_cart(shopper), "x")
+
+        self.repository.STREAM_BATCH_SIZE = 2
+        streamed = [order async for order, _ in self.repository.iter_orders_by_customer(shopper.customer_id)]
+        self.assertEqual(len(streamed), 3)
+
+    async def test_rebuild_sales_summaries(self):
+        shopper = await self._customer(1)
+        await self.repository.add_to_cart(shopper, self.product, 2)
+        await self.repository.place_order(shopper, await self.repository.get_all_from_cart(shopper), "x")
+
+        self.assertTrue(await self.repository.rebuild_sales_summaries())
+        self.assertEqual((await self.repository.get_customer_sales(shopper.customer_id))['units'], 2)
+
+    async def test_archive_orders(self):
+        shopper = await self._customer(1)
+        await self.repository.add_to_cart(shopper, self.product, 1)
+        order, _ = await self.repository.place_order(shopper, await self.repository.get_all_from_cart(shopper), "x")
+
+        # A negative window archives everything
+        self.assertEqual(await self.repository.archive_orders(-1), 1)
+        found, _ = await self.repository.get_order_by_id(order.order_id)
+        self.assertEqual(found.order_id, order.order_id)
+
+    async def test_run_in_unit_of_work(self):
+        shopper = await self._customer(1)
+
+        def checkout(repository):
+            repository.add_to_cart(shopper, self.product, 2)
+            order, _ = repository.place_order(shopper, repository.get_all_from_cart(shopper), "1 Async St")
+            return order
+
+        order = await self.repository.run_in_unit_of_work(checkout)
+        self.assertEqual((await self.repository.get_order_by_id(order.order_id))[0].customer_id,
+                         shopper.customer_id)
+
+        def abandoned(repository):
+            checkout(repository)
+            raise RuntimeError("abandon the unit")
+
+        with self.assertRaises(RuntimeError):
+            await self.repository.run_in_unit_of_work(abandoned)
+        self.assertEqual(len(await self.repository.get_orders_by_customer(shopper.customer_id)), 1)
+        self.assertEqual(await self.repository.get_all_from_cart(shopper), [])
+        self.assertEqual((await self.repository.get_product_by_id(self.product.product_id)).stock_quantity, 3)
+
+    async def test_waiting_for_a_slot_times_out(self):
+        repository = ThreadOffloadOrderProcessorRepository(self.repository.repository, pool_size=1, pool_timeout=0.05)
+        await repository._acquire()
+        with self.assertRaises(ConnectionPoolTimeoutException):
+            await repository.get_all_products()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from benchmarks.dataset import DatasetGenerator
+from benchmarks.entities import compare_entity_layouts
+from benchmarks.runner import BenchmarkRunner, compare_runs, percentile
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.repository = OrderProcessorRepositorySqliteImpl(':memory:')
+        self.dataset = DatasetGenerator(self.repository.database.get_connection, seed=7,
+                                        customers=20, products=10, orders=200, batch_size=50,
+                                        rebuild_summaries=self.repository.rebuild_sales_summaries)
+        self.dataset.seed_database()
+
+    def tearDown(self):
+        self.repository.close()
+
+    def test_dataset_is_seeded(self):
+        """The generator writes the requested number of rows"""
+        connection = self.repository.database.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM orders")
+            self.assertEqual(cursor.fetchone()[0], 200)
+            cursor.execute("SELECT COUNT(*) FROM order_items WHERE order_id NOT IN (SELECT order_id FROM orders)")
+            self.assertEqual(cursor.fetchone()[0], 0)
+            cursor.execute("SELECT COUNT(*) FROM order_items WHERE unit_price IS NULL")
+            self.assertEqual(cursor.fetchone()[0], 0)
+            # The sales summaries were rebuilt from the seeded orders
+            cursor.execute("SELECT SUM(order_count) FROM customer_sales")
+            self.assertEqual(cursor.fetchone()[0], 200)
+        finally:
+            connection.close()
+
+    def test_dataset_is_reproducible(self):
+        """The same seed produces the same skewed picks"""
+        other_repository = OrderProcessorRepositorySqliteImpl(':memory:')
+        other = DatasetGenerator(other_repository.database.get_connection, seed=7,
+                                 customers=20, products=10, orders=200, batch_size=50).seed_database()
+        self.assertEqual([self.dataset.pick_product() for _ in range(20)],
+                         [other.pick_product() for _ in range(20)])
+        other_repository.close()
+
+    def test_runner_report(self):
+        """Every scenario reports calls and latency percentiles"""
+        report = BenchmarkRunner(self.repository, self.dataset, iterations=5, warmup=1).run()
+        self.assertEqual(set(report['results']), set(BenchmarkRunner.SCENARIOS))
+        for result in report['results'].values():
+            self.assertEqual(result['calls'], 5)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertEqual(report['meta']['dataset']['orders'], 200)
+
+    def test_percentile_and_compare(self):
+        self.assertEqual(percentile([1, 2, 3, 4], 0.5), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 0.99), 4)
+
+        base = {'results': {'m': {'p50_ms': 1.0, 'p95_ms': 2.0, 'p99_ms': 3.0, 'throughput_per_s': 100.0}}}
+        slower = {'results': {'m': {'p50_ms': 1.5, 'p95_ms': 2.0, 'p99_ms': 3.0, 'throughput_per_s': 70.0}}}
+        self.assertEqual(compare_runs(base, slower)['regressions'], ['m'])
+        self.assertEqual(compare_runs(base, base)['regressions'], [])
+
+    def test_entity_layout_comparison(self):
+        """Slotted entities use less memory than the __dict__ layout"""
+        report = compare_entity_layouts(orders=500, items_per_order=2)
+        self.assertEqual(report['slots']['objects'], 2500)
+        self.assertLess(report['slots']['peak_bytes'], report['dict']['peak_bytes'])
+
+
+if __name__ == "__main__":
+    unittest.main()
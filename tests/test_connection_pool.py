@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+import time
+import unittest
+
+from exception.ConnectionPoolTimeoutException import ConnectionPoolTimeoutException
+from util.connection_pool import ConnectionPool
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(
+            lambda: sqlite3.connect(":memory:", check_same_thread=False),
+            pool_size=2, timeout=0.2, idle_timeout=None, validation_interval=0
+        )
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_connection_is_reused(self):
+        """Closing a pooled connection returns it instead of reconnecting"""
+        first = self.pool.get_connection()
+        raw = first.raw_connection
+        first.close()
+
+        second = self.pool.get_connection()
+        self.assertIs(second.raw_connection, raw)
+        second.close()
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['total_created'], 1)
+        self.assertEqual(stats['total_borrows'], 2)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['borrowed'], 0)
+
+    def test_checkout_timeout(self):
+        """Borrowing past pool_size waits and then raises"""
+        held = [self.pool.get_connection(), self.pool.get_connection()]
+        with self.assertRaises(ConnectionPoolTimeoutException):
+            self.pool.get_connection()
+        self.assertEqual(self.pool.stats()['total_timeouts'], 1)
+        for connection in held:
+            connection.close()
+
+    def test_waiter_gets_released_connection(self):
+        """A blocked borrower is woken when another thread releases"""
+        held = [self.pool.get_connection(), self.pool.get_connection()]
+        threading.Timer(0.05, held[0].close).start()
+
+        connection = self.pool.get_connection()
+        self.assertTrue(connection.is_connected())
+        connection.close()
+        held[1].close()
+        self.assertGreater(self.pool.stats()['max_wait_time'], 0)
+
+    def test_invalid_connection_is_replaced(self):
+        """Validation on borrow discards dead connections"""
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:"), pool_size=1,
+                              validation_interval=0, validate=lambda raw: False)
+        pool.get_connection().close()
+        pool.get_connection().close()
+        self.assertEqual(pool.stats()['total_invalidated'], 1)
+        self.assertEqual(pool.stats()['total_created'], 2)
+        pool.close()
+
+    def test_idle_eviction(self):
+        """Connections idle past idle_timeout are closed"""
+        pool = ConnectionPool(lambda: sqlite3.connect(":memory:"), pool_size=2, idle_timeout=0.01)
+        pool.get_connection().close()
+        time.sleep(0.02)
+        self.assertEqual(pool.evict_idle(), 1)
+        self.assertEqual(pool.stats()['open'], 0)
+        pool.close()
+
+    def test_release_rolls_back_open_transaction(self):
+        """Uncommitted work never leaks to the next borrower"""
+        connection = self.pool.get_connection()
+        connection.execute("CREATE TABLE t (x INTEGER)")
+        connection.commit()
+        connection.execute("INSERT INTO t VALUES (1)")
+        connection.close()
+
+        connection = self.pool.get_connection()
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
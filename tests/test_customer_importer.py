@@ -0,0 +1,101 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.customer import Customer
+from util.customer_importer import CustomerImporter
+from util.password_hasher import PasswordHasher
+from util.query_metrics import QueryMetrics
+
+
+class TestPasswordHasher(unittest.TestCase):
+    def test_hash_and_verify(self):
+        stored = PasswordHasher.hash("Secret#123", iterations=1000)
+        self.assertTrue(PasswordHasher.is_hashed(stored))
+        self.assertFalse(PasswordHasher.is_hashed("pbkdf2_sha256$600000$salt$digest"))
+        self.assertLessEqual(len(stored), 100)
+        self.assertTrue(PasswordHasher.verify("Secret#123", stored))
+        self.assertFalse(PasswordHasher.verify("secret#123", stored))
+        self.assertFalse(PasswordHasher.verify("Secret#123", "plain-text"))
+        self.assertNotEqual(stored, PasswordHasher.hash("Secret#123", iterations=1000))
+
+
+class TestCustomerImporter(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "customers.csv")
+        self.repository = OrderProcessorRepositorySqliteImpl(':memory:')
+        self.repository.create_customer(Customer(name="Old Account", email="old@example.com", password="x"))
+
+    def tearDown(self):
+        self.repository.close()
+
+    def _run(self, rows, workers, prehashed=False):
+        with open(self.path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CustomerImporter.FIELDS)
+            writer.writerows(rows)
+        importer = CustomerImporter(self.repository, chunk_size=3, rejects_path=self.path + ".rejects.csv",
+                                    workers=workers, iterations=1000, prehashed=prehashed)
+        return importer.run(self.path)
+
+    def test_import_validates_deduplicates_and_hashes(self):
+        summary = self._run([
+            ("Ann Lee", "Ann@Example.com", "pw-ann"),
+            ("B0b", "bob@example.com", "pw-bob"),
+            ("Cara Diaz", "not-an-email", "pw-cara"),
+            ("Ann Again", "ann@example.com", "pw-ann2"),
+            ("Old Account", "OLD@example.com", "pw-old"),
+            ("Dan O'Neil", "dan@example.com", "pw-dan"),
+            ("Eve Stone", "eve@example.com", ""),
+        ], workers=2)
+
+        self.assertTrue(summary['completed'])
+        self.assertEqual((summary['inserted'], summary['existing'], summary['duplicates'], summary['rejected']),
+                         (2, 1, 1, 5))
+
+        customers = {customer.email: customer for customer in self.repository.get_all_customers()}
+        self.assertEqual(sorted(customers), ["ann@example.com", "dan@example.com", "old@example.com"])
+        self.assertTrue(PasswordHasher.verify("pw-ann", self._password("ann@example.com")))
+        self.assertEqual(self._password("old@example.com"), "x")
+
+    def test_single_worker_runs_in_process(self):
+        summary = self._run([("Fay Wu", "fay@example.com", "pw-fay")], workers=1)
+        self.assertEqual(summary['inserted'], 1)
+        self.assertTrue(PasswordHasher.verify("pw-fay", self._password("fay@example.com")))
+
+    def test_hash_like_passwords_are_hashed_unless_prehashed(self):
+        stored = PasswordHasher.hash("pw-gus", iterations=1000)
+        self._run([("Gus Hale", "gus@example.com", stored), ("Hal Ford", "hal@example.com", "pbkdf2_sha256$x")],
+                  workers=1)
+        self.assertTrue(PasswordHasher.verify(stored, self._password("gus@example.com")))
+        self.assertTrue(PasswordHasher.verify("pbkdf2_sha256$x", self._password("hal@example.com")))
+
+        self._run([("Ida Moss", "ida@example.com", stored), ("Jo Park", "jo@example.com", "pbkdf2_sha256$x")],
+                  workers=1, prehashed=True)
+        self.assertEqual(self._password("ida@example.com"), stored)
+        self.assertTrue(PasswordHasher.verify("pbkdf2_sha256$x", self._password("jo@example.com")))
+
+    def test_registered_emails_are_looked_up_once_per_chunk(self):
+        self.repository.close()
+        self.repository = OrderProcessorRepositorySqliteImpl(':memory:', metrics=QueryMetrics())
+        rows = [(f"User {chr(65 + index)}", f"user{index}@example.com", "pw") for index in range(7)]
+        self.assertEqual(self._run(rows, workers=1)['inserted'], 7)
+
+        lookups = [statement for statement in self.repository.metrics.snapshot()['statements'].values()
+                   if statement['sql'].startswith("SELECT email FROM customers")]
+        self.assertEqual(lookups[0]['calls'], 3)
+
+    def _password(self, email):
+        connection = self.repository.database.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT password FROM customers WHERE email = %s", (email,))
+            return cursor.fetchone()[0]
+        finally:
+            connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from util.db_property_util import DBPropertyUtil
+
+
+PROPERTIES = """[database]
+host=localhost
+port=3306
+user=root
+password=secret
+database=ecommerce_db
+
+[pool]
+pool_size=3
+"""
+
+
+class TestDBPropertyUtil(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".properties")
+        with os.fdopen(handle, "w") as f:
+            f.write(PROPERTIES)
+        DBPropertyUtil.load(self.path)
+
+    def tearDown(self):
+        DBPropertyUtil.set_config_path(None)
+        DBPropertyUtil.invalidate()
+        os.remove(self.path)
+
+    def test_config_is_parsed_once(self):
+        """Repeated lookups reuse the cached parser"""
+        first = DBPropertyUtil.get_config()
+        self.assertIs(DBPropertyUtil.get_config(), first)
+        self.assertEqual(DBPropertyUtil.get_property_string()['port'], 3306)
+
+    def test_pool_defaults(self):
+        """Missing pool keys fall back to defaults"""
+        pool = DBPropertyUtil.get_pool_properties()
+        self.assertEqual(pool['pool_size'], 3)
+        self.assertEqual(pool['pool_timeout'], 10.0)
+
+    def test_replica_hosts(self):
+        """Replica hosts default to the primary's port; no [replicas] section means none"""
+        self.assertEqual(DBPropertyUtil.get_replica_properties()['hosts'], [])
+        with mock.patch.dict(os.environ, {"ECOM_REPLICAS_HOSTS": "replica1, replica2:3307"}):
+            DBPropertyUtil.reload()
+            self.assertEqual(DBPropertyUtil.get_replica_properties()['hosts'],
+                             [("replica1", 3306), ("replica2", 3307)])
+
+    def test_shard_databases(self):
+        """Shards are host[:port]/database; a shard without a database is rejected"""
+        self.assertEqual(DBPropertyUtil.get_shard_properties()['databases'], [])
+        with mock.patch.dict(os.environ, {"ECOM_SHARDS_DATABASES": "db1/shop_0, db2:3307/shop_1"}):
+            DBPropertyUtil.reload()
+            self.assertEqual(DBPropertyUtil.get_shard_properties()['databases'],
+                             [("db1", 3306, "shop_0"), ("db2", 3307, "shop_1")])
+        with mock.patch.dict(os.environ, {"ECOM_SHARDS_DATABASES": "db1"}):
+            DBPropertyUtil.reload()
+            with self.assertRaises(ValueError):
+                DBPropertyUtil.get_shard_properties()
+
+    def test_environment_override(self):
+        """ECOM_<SECTION>_<KEY> wins over the file after a reload"""
+        with mock.patch.dict(os.environ, {"ECOM_DATABASE_HOST": "db.internal"}):
+            DBPropertyUtil.reload()
+            self.assertEqual(DBPropertyUtil.get_property_string()['host'], "db.internal")
+
+    def test_reload_picks_up_file_changes(self):
+        """reload() re-reads the file"""
+        with open(self.path, "w") as f:
+            f.write(PROPERTIES.replace("port=3306", "port=3307"))
+        self.assertEqual(DBPropertyUtil.get_property_string()['port'], 3306)
+        DBPropertyUtil.reload()
+        self.assertEqual(DBPropertyUtil.get_property_string()['port'], 3307)
+
+
+if __name__ == "__main__":
+    unittest.main()
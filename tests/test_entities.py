@@ -0,0 +1,43 @@
+import pickle
+import unittest
+
+from entity.cart import Cart
+from entity.customer import Customer
+from entity.order import Order
+from entity.order_item import OrderItem
+from entity.product import Product
+
+
+class TestEntities(unittest.TestCase):
+    def test_entities_have_no_instance_dict(self):
+        for entity in (Cart(), Customer(), Order(), OrderItem(), Product()):
+            self.assertFalse(hasattr(entity, '__dict__'), type(entity).__name__)
+            with self.assertRaises(AttributeError):
+                entity.unknown_field = 1
+
+    def test_public_attributes_are_unchanged(self):
+        product = Product(product_id=1, name="Pen", price="2.50", description="Blue", stock_quantity=4)
+        self.assertEqual(product.price, 2.5)
+        product.stock_quantity = 3
+        self.assertEqual(product.stock_quantity, 3)
+        self.assertEqual(str(product), "Product ID: 1,Name: Pen,Price: 2.5,Description: Blue,Stock Quantity: 3")
+        self.assertIsNotNone(Order(order_id=1).order_date)
+
+    def test_equality_and_hash_by_id(self):
+        self.assertEqual(Product(product_id=1, name="A"), Product(product_id=1, name="B"))
+        self.assertNotEqual(Product(product_id=1), Product(product_id=2))
+        self.assertNotEqual(Product(product_id=1), OrderItem(order_item_id=1))
+        self.assertEqual(len({Customer(customer_id=5), Customer(customer_id=5)}), 1)
+
+        unsaved = Customer(name="New")
+        self.assertEqual(unsaved, unsaved)
+        self.assertNotEqual(unsaved, Customer(name="New"))
+
+    def test_entities_pickle(self):
+        cart = Cart(cart_id=3, customer_id=1, product_id=2, quantity=4)
+        copy = pickle.loads(pickle.dumps(cart))
+        self.assertEqual((copy.cart_id, copy.quantity), (3, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
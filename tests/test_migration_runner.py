@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from util.migration_runner import MigrationRunner
+from util.migrations import MIGRATIONS
+from util.sqlite_conn_util import SQLITE_SCHEMA, SQLiteDatabase
+
+
+class TestMigrationRunner(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "migrate.db")
+
+    def _query(self, database, sql, params=()):
+        connection = database.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            connection.close()
+
+    def test_new_database_is_at_latest_version(self):
+        database = SQLiteDatabase(self.path)
+        runner = MigrationRunner(database.get_connection, 'sqlite', verbose=False)
+        self.assertEqual(runner.current_version(), MIGRATIONS[-1][0])
+        self.assertEqual(runner.pending(), [])
+        self.assertEqual(runner.migrate(), [])
+        database.close()
+
+    def test_base_schema_is_upgraded_and_cart_merged(self):
+        """An unversioned database gets the cart constraints with duplicate rows merged"""
+        raw = sqlite3.connect(self.path)
+        raw.executescript(SQLITE_SCHEMA)
+        raw.execute("INSERT INTO customers (name, email, password) VALUES ('A', 'a@x.com', 'p')")
+        raw.execute("INSERT INTO products (name, price, stock_quantity) VALUES ('P', 1, 5)")
+        raw.executemany("INSERT INTO cart (customer_id, product_id, quantity) VALUES (1, 1, ?)", [(2,), (3,)])
+        raw.commit()
+        raw.close()
+
+        database = SQLiteDatabase(self.path)
+        self.assertEqual(self._query(database, "SELECT customer_id, product_id, quantity FROM cart"), [(1, 1, 5)])
+        versions = self._query(database, "SELECT version FROM schema_version ORDER BY version")
+        self.assertEqual([row[0] for row in versions], [migration[0] for migration in MIGRATIONS])
+        database.close()
+
+    def test_date_filter_uses_index(self):
+        """The half-open order_date range is served by idx_orders_order_date"""
+        database = SQLiteDatabase(self.path)
+        plan = self._query(database, "EXPLAIN QUERY PLAN SELECT order_id FROM orders o "
+                                     "WHERE o.order_date >= %s AND o.order_date < %s",
+                           ("2024-01-01 00:00:00", "2024-01-02 00:00:00"))
+        self.assertIn("idx_orders_order_date", " ".join(str(row[-1]) for row in plan))
+        database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
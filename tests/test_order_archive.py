@@ -0,0 +1,187 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from dao.sharded_order_processor_repository import ShardedOrderProcessorRepository
+from entity.customer import Customer
+from entity.product import Product
+from exception.OrderNotFoundException import OrderNotFoundException
+from util.query_metrics import QueryMetrics
+
+
+class TestOrderArchive(unittest.TestCase):
+    def setUp(self):
+        self.metrics = QueryMetrics()
+        self.processor = OrderProcessorRepositorySqliteImpl(':memory:', metrics=self.metrics)
+        self.processor.create_customer(Customer(name="Alice", email="alice@unittest.com", password="test123"))
+        self.alice = self.processor.get_customers_page()[0][0]
+        self.processor.create_product(Product(name="Widget", price=Decimal("2.50"), stock_quantity=100))
+        self.widget = self.processor.get_all_products()[0]
+        self.old_day = datetime.now().replace(microsecond=0) - timedelta(days=400)
+
+        # Five orders placed 400 days ago (a minute apart) and two today
+        self.old_orders = [self._order(quantity, self.old_day + timedelta(minutes=quantity))
+                           for quantity in range(1, 6)]
+        self.new_orders = [self._order(quantity) for quantity in (6, 7)]
+
+    def tearDown(self):
+        self.processor.close()
+
+    def _order(self, quantity, order_date=None):
+        self.processor.add_to_cart(self.alice, self.widget, quantity)
+        order, _ = self.processor.place_order(self.alice, self.processor.get_all_from_cart(self.alice), "1 Test St")
+        if order_date is not None:
+            connection = self.processor.database.get_connection()
+            try:
+                connection.cursor().execute("UPDATE orders SET order_date = %s WHERE order_id = %s",
+                                            (order_date, order.order_id))
+                connection.commit()
+            finally:
+                connection.close()
+        return order.order_id
+
+    def _count(self, table):
+        connection = self.processor.database.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            return cursor.fetchone()[0]
+        finally:
+            connection.close()
+
+    def _archive_statements(self):
+        return [statement for statement in self.metrics.snapshot()['statements'].values()
+                if 'orders_archive' in statement['sql']]
+
+    def test_archive_moves_old_orders_in_batches(self):
+        history = self.processor.get_orders_by_customer(self.alice.customer_id)
+
+        self.assertEqual(self.processor.archive_orders(365, batch_size=2), 5)
+        self.assertEqual((self._count('orders'), self._count('orders_archive')), (2, 5))
+        self.assertEqual((self._count('order_items'), self._count('order_items_archive')), (2, 5))
+        # Three batches of at most two orders each
+        batches = [statement for statement in self.metrics.snapshot()['statements'].values()
+                   if statement['sql'].startswith("INSERT INTO orders_archive")]
+        self.assertEqual(batches[0]['calls'], 3)
+        self.assertEqual(self.processor.archive_orders(365), 0)
+
+        # The history reads the same with part of it archived
+        archived_history = self.processor.get_orders_by_customer(self.alice.customer_id)
+        self.assertEqual(list(archived_history), list(history))
+        self.assertEqual([[item.quantity for item, _ in items] for _, items in archived_history.values()],
+                         [[7], [6], [5], [4], [3], [2], [1]])
+        self.assertEqual([order.order_id for order, _ in self.processor.iter_orders_by_customer(
+            self.alice.customer_id)], list(history))
+
+    def test_pages_continue_into_the_archive(self):
+        self.processor.archive_orders(365)
+
+        order_ids, token = [], None
+        while True:
+            page, token = self.processor.get_orders_by_customer_page(self.alice.customer_id, 3, token)
+            order_ids += list(page)
+            if token is None:
+                break
+        self.assertEqual(order_ids, self.new_orders[::-1] + self.old_orders[::-1])
+
+    def test_date_reads_consult_the_archive_only_when_needed(self):
+        self.processor.archive_orders(365)
+        self.metrics.reset()
+
+        self.assertEqual(sorted(self.processor.get_orders_by_date(date.today())), self.new_orders)
+        self.assertEqual(len(self.processor.get_order_lines_frame_by_date(date.today())), 2)
+        self.assertEqual(self._archive_statements(), [])
+
+        old_date = self.old_day.date()
+        self.assertEqual(sorted(self.processor.get_orders_by_date(old_date)), self.old_orders)
+        self.assertEqual(len(list(self.processor.iter_orders_by_date(old_date))), 5)
+        self.assertEqual(len(self.processor.get_order_lines_frame_by_date(old_date)), 5)
+        totals = self.processor.get_orders_between(old_date, date.today() + timedelta(days=1), group_by='day')
+        self.assertEqual([row['order_count'] for row in totals], [5, 2])
+        self.assertNotEqual(self._archive_statements(), [])
+
+    def _boundary_reads(self):
+        return sum(statement['calls'] for statement in self.metrics.snapshot()['statements'].values()
+                   if statement['sql'].startswith("SELECT archived_before"))
+
+    def test_a_known_boundary_skips_the_lookup(self):
+        self.assertEqual(self.processor.archive_orders(365), 5)
+        self.metrics.reset()
+
+        # Whole-history reads need the archive whatever the boundary is now
+        for _ in range(3):
+            self.assertEqual(len(self.processor.get_orders_by_customer(self.alice.customer_id)), 7)
+        self.assertEqual(self._boundary_reads(), 0)
+
+        # A range after the known boundary reads it, as it may have moved
+        self.assertEqual(sorted(self.processor.get_orders_by_date(date.today())), self.new_orders)
+        self.assertEqual(self._boundary_reads(), 1)
+
+    def test_reads_see_orders_archived_by_another_repository(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "shop.db")
+            reader = OrderProcessorRepositorySqliteImpl(path)
+            archiver = OrderProcessorRepositorySqliteImpl(path)
+            try:
+                reader.create_customer(Customer(name="Dana", email="dana@unittest.com", password="test123"))
+                dana = reader.get_customers_page()[0][0]
+                reader.create_product(Product(name="Gizmo", price=Decimal("1.00"), stock_quantity=5))
+                gizmo = reader.get_all_products()[0]
+                reader.add_to_cart(dana, gizmo, 1)
+                order, _ = reader.place_order(dana, reader.get_all_from_cart(dana), "3 Test St")
+                self.assertEqual(list(reader.get_orders_by_date(date.today())), [order.order_id])
+
+                # No wait and no cache expiry: the next read finds it archived
+                self.assertEqual(archiver.archive_orders(-1), 1)
+                self.assertEqual(list(reader.get_orders_by_date(date.today())), [order.order_id])
+            finally:
+                reader.close()
+                archiver.close()
+
+    def test_archived_orders_are_read_only(self):
+        self.processor.archive_orders(365)
+
+        order, items = self.processor.get_order_by_id(self.old_orders[0])
+        self.assertEqual((order.order_id, [item.quantity for item in items]), (self.old_orders[0], [1]))
+        self.assertFalse(self.processor.cancel_order(self.old_orders[0]))
+        with self.assertRaises(OrderNotFoundException):
+            self.processor.get_order_by_id(999)
+
+        # Sales summaries keep counting archived orders, also after a rebuild
+        expected = {'order_count': 7, 'units': 28, 'revenue': Decimal('70.00')}
+        self.assertEqual(self.processor.get_customer_sales(self.alice.customer_id), expected)
+        self.assertTrue(self.processor.rebuild_sales_summaries())
+        self.assertEqual(self.processor.get_customer_sales(self.alice.customer_id), expected)
+
+    def test_sharded_archive(self):
+        catalog = OrderProcessorRepositorySqliteImpl(':memory:')
+        shards = [OrderProcessorRepositorySqliteImpl(':memory:', foreign_keys=False) for _ in range(2)]
+        sharded = ShardedOrderProcessorRepository(catalog, shards)
+        try:
+            sharded.create_customer(Customer(name="Bob", email="bob@unittest.com", password="test123"))
+            bob = sharded.get_customers_page()[0][0]
+            sharded.create_product(Product(name="Gadget", price=Decimal("10.00"), stock_quantity=10))
+            gadget = sharded.get_all_products()[0]
+            sharded.add_to_cart(bob, gadget, 1)
+            order, _ = sharded.place_order(bob, sharded.get_all_from_cart(bob), "2 Test St")
+
+            # Nothing is old enough yet; a negative window archives everything
+            self.assertEqual(sharded.archive_orders(365), 0)
+            self.assertEqual(sharded.archive_orders(-1), 1)
+            self.assertEqual(list(sharded.get_orders_by_customer(bob.customer_id)), [order.order_id])
+            self.assertEqual(list(sharded.get_orders_by_date(date.today())), [order.order_id])
+
+            # A move takes archived orders along
+            target = 1 - sharded.shard_for(bob.customer_id)
+            self.assertEqual(sharded.move_customer(bob.customer_id, target), 1)
+            self.assertEqual(sharded.get_order_by_id(order.order_id)[0].order_id, order.order_id)
+            self.assertEqual(sharded.get_customer_sales(bob.customer_id)['order_count'], 1)
+        finally:
+            sharded.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
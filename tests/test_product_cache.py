@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+
+from dao.cached_order_processor_repository import CachedOrderProcessorRepository
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.customer import Customer
+from entity.product import Product
+from exception.ProductNotFoundException import ProductNotFoundException
+from util.ttl_cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(max_size=2, ttl=None)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entries_expire_after_ttl(self):
+        cache = TTLCache(max_size=10, ttl=5)
+        with mock.patch('util.ttl_cache.time.monotonic', return_value=100.0):
+            cache.put('a', 1)
+        with mock.patch('util.ttl_cache.time.monotonic', return_value=104.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('util.ttl_cache.time.monotonic', return_value=105.0):
+            self.assertIsNone(cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expirations']), (1, 1, 1))
+
+    def test_replace_keeps_the_expiry(self):
+        cache = TTLCache(max_size=10, ttl=5)
+        with mock.patch('util.ttl_cache.time.monotonic', return_value=100.0):
+            cache.put('a', 1)
+        with mock.patch('util.ttl_cache.time.monotonic', return_value=104.0):
+            self.assertTrue(cache.replace('a', 2))
+            self.assertFalse(cache.replace('b', 2))
+            self.assertEqual(cache.get('a'), 2)
+        with mock.patch('util.ttl_cache.time.monotonic', return_value=105.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+
+class TestCachedRepository(unittest.TestCase):
+    def setUp(self):
+        self.backend = OrderProcessorRepositorySqliteImpl(':memory:')
+        self.processor = CachedOrderProcessorRepository(self.backend, max_size=100, ttl=60)
+
+        self.customer = Customer(name="Cache User", email="cache@unittest.com", password="test123")
+        self.processor.create_customer(self.customer)
+        self.customer.customer_id = self.processor.get_customers_page()[0][0].customer_id
+
+        self.processor.create_product(Product(name="Cached Product", price=5.0, stock_quantity=10))
+        self.product = self.processor.get_all_products()[0]
+
+    def tearDown(self):
+        self.backend.close()
+
+    def test_product_reads_hit_the_cache(self):
+        with mock.patch.object(self.backend, 'get_product_by_id', wraps=self.backend.get_product_by_id) as lookup:
+            first = self.processor.get_product_by_id(self.product.product_id)
+            second = self.processor.get_product_by_id(self.product.product_id)
+        self.assertIs(first, second)
+        lookup.assert_not_called()  # populated by get_all_products in setUp
+
+        with mock.patch.object(self.backend, 'get_all_products', wraps=self.backend.get_all_products) as listing:
+            self.processor.get_all_products()
+        listing.assert_not_called()
+        self.assertGreater(self.processor.cache_stats()['products']['hits'], 0)
+
+    def test_create_and_delete_invalidate(self):
+        self.processor.create_product(Product(name="Second Product", price=1.0, stock_quantity=1))
+        self.assertEqual(len(self.processor.get_all_products()), 2)
+
+        self.assertTrue(self.processor.delete_product(self.product.product_id))
+        self.assertEqual([p.name for p in self.processor.get_all_products()], ["Second Product"])
+        with self.assertRaises(ProductNotFoundException):
+            self.processor.get_product_by_id(self.product.product_id)
+
+    def test_orders_adjust_cached_stock(self):
+        self.processor.add_to_cart(self.customer, self.product, 3)
+        cart_items = self.processor.get_all_from_cart(self.customer)
+        order, _ = self.processor.place_order(self.customer, cart_items, "1 Cache St")
+        self.assertEqual(self.processor.get_product_by_id(self.product.product_id).stock_quantity, 7)
+        # Products handed out earlier are left as they were
+        self.assertEqual(self.product.stock_quantity, 10)
+
+        with mock.patch.object(self.backend, 'get_order_by_id') as lookup:
+            self.assertTrue(self.processor.cancel_order(order.order_id))
+        lookup.assert_not_called()
+        self.assertEqual(self.processor.get_product_by_id(self.product.product_id).stock_quantity, 10)
+        self.assertEqual(self.backend.get_product_by_id(self.product.product_id).stock_quantity, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
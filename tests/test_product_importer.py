@@ -0,0 +1,95 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.product import Product
+from util.product_importer import ProductImporter
+
+
+class TestProductImporter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.repository = OrderProcessorRepositorySqliteImpl(':memory:')
+        self.repository.BULK_INSERT_ROWS = 3  # several INSERT statements per chunk
+        self.repository.create_product(Product(name="Existing", price=1, description="d", stock_quantity=1))
+
+    def tearDown(self):
+        self.repository.close()
+
+    def _write_csv(self, rows):
+        path = os.path.join(self.directory, "feed.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(ProductImporter.FIELDS)
+            writer.writerows(rows)
+        return path
+
+    def _importer(self, path, chunk_size=4):
+        return ProductImporter(self.repository, chunk_size=chunk_size,
+                               rejects_path=path + ".rejects.csv", checkpoint_path=path + ".checkpoint")
+
+    def _names(self):
+        return sorted(product.name for product in self.repository.get_all_products())
+
+    def test_csv_import_validates_and_deduplicates(self):
+        path = self._write_csv([
+            ("Pen", "1.50", "Blue pen", "10"),
+            ("Pencil", "abc", "HB", "5"),
+            ("PEN", "2.00", "Red pen", "3"),
+            ("Existing", "4.00", "Again", "1"),
+            ("Eraser", "0.75", "White", "-1"),
+            ("Notebook", "3.20", "A5", "7"),
+        ])
+        summary = self._importer(path).run(path)
+
+        self.assertTrue(summary['completed'])
+        self.assertEqual((summary['records'], summary['inserted'], summary['existing'],
+                          summary['duplicates'], summary['rejected']), (6, 2, 1, 1, 4))
+        self.assertEqual(self._names(), ["Existing", "Notebook", "Pen"])
+        with open(path + ".rejects.csv", newline="") as f:
+            reasons = {int(row['record']): row['reason'] for row in csv.DictReader(f)}
+        self.assertEqual(reasons, {2: "Price must be a valid number", 3: "Duplicate name in file",
+                                   4: "Product already exists", 5: "Stock quantity must be a whole number"})
+        self.assertFalse(os.path.exists(path + ".checkpoint"))
+
+    def test_jsonl_import(self):
+        path = os.path.join(self.directory, "feed.jsonl")
+        with open(path, "w") as f:
+            f.write(json.dumps({"name": "Lamp", "price": 20, "description": "Desk", "stock_quantity": 2}) + "\n")
+            f.write("{not json\n")
+            f.write(json.dumps({"name": "Mug", "price": 5}) + "\n")
+        summary = self._importer(path).run(path)
+        self.assertEqual((summary['inserted'], summary['rejected']), (1, 2))
+        self.assertIn("Lamp", self._names())
+
+    def test_resume_after_failed_chunk(self):
+        path = self._write_csv([(f"Item {n}", "1.00", "Bulk", "1") for n in range(10)])
+        importer = self._importer(path, chunk_size=4)
+
+        original = self.repository.bulk_create_products
+        calls = []
+
+        def fail_second_chunk(products):
+            calls.append(len(products))
+            return original(products) if len(calls) == 1 else None
+
+        with mock.patch.object(self.repository, 'bulk_create_products', side_effect=fail_second_chunk):
+            summary = importer.run(path)
+
+        self.assertFalse(summary['completed'])
+        self.assertEqual(summary['inserted'], 4)
+        self.assertTrue(os.path.exists(path + ".checkpoint"))
+
+        summary = importer.run(path, resume=True)
+        self.assertTrue(summary['completed'])
+        self.assertEqual(summary['resumed_from'], 4)
+        self.assertEqual(summary['inserted'], 6)
+        self.assertEqual(len(self._names()), 11)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from datetime import date, timedelta
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.customer import Customer
+from entity.product import Product
+from util.query_metrics import LatencyHistogram, QueryMetrics
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = LatencyHistogram(buckets=(0.01, 0.1))
+        for seconds in (0.005, 0.01, 0.05, 3.0):
+            histogram.observe(seconds)
+        self.assertEqual(histogram.cumulative(), [(0.01, 2), (0.1, 3), (float('inf'), 4)])
+        self.assertEqual(histogram.quantile(0.5), 0.01)
+        self.assertEqual(histogram.quantile(0.99), 3.0)
+
+
+class TestQueryMetrics(unittest.TestCase):
+    def test_bulk_statements_share_one_entry(self):
+        metrics = QueryMetrics()
+        metrics.observe_statement('bulk', "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)", 0.001, 2)
+        metrics.observe_statement('bulk', "INSERT INTO t (a, b)\n  VALUES (%s, %s)", 0.001, 1)
+        metrics.observe_statement('bulk', "SELECT a FROM t WHERE a IN (%s, %s, %s)", 0.001, 3)
+        statements = metrics.snapshot()['statements']
+        self.assertEqual(sorted(entry['sql'] for entry in statements.values()),
+                         ["INSERT INTO t (a, b) VALUES (%s)", "SELECT a FROM t WHERE a IN (%s)"])
+        self.assertEqual(sum(entry['rows'] for entry in statements.values()), 6)
+
+    def test_slow_queries_are_logged_without_parameters(self):
+        metrics = QueryMetrics(slow_query_ms=10)
+        with self.assertLogs('ecom.slow_query', level='WARNING') as logs:
+            metrics.observe_statement('get_product_by_id', "SELECT * FROM products WHERE product_id = %s", 0.02, 1)
+            metrics.observe_statement('get_product_by_id', "SELECT 1", 0.001, 1)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("get_product_by_id", logs.output[0])
+        self.assertEqual(metrics.snapshot()['slow_queries'], 1)
+
+
+class TestInstrumentedRepository(unittest.TestCase):
+    def setUp(self):
+        self.metrics = QueryMetrics()
+        self.processor = OrderProcessorRepositorySqliteImpl(':memory:', metrics=self.metrics)
+        self.processor.create_customer(Customer(name="Metrics User", email="metrics@unittest.com", password="x1"))
+        self.customer = self.processor.get_customers_page()[0][0]
+        for name in ("Metered A", "Metered B"):
+            self.processor.create_product(Product(name=name, price=3.0, stock_quantity=10))
+
+    def tearDown(self):
+        self.processor.close()
+
+    def test_methods_and_statements_are_recorded(self):
+        self.assertEqual(len(self.processor.get_all_products()), 2)
+        products = self.processor.get_all_products()
+        self.processor.add_to_cart(self.customer, products[0], 2)
+        self.processor.place_order(self.customer, self.processor.get_all_from_cart(self.customer), "1 Metric St")
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['methods']['get_all_products']['calls'], 2)
+        self.assertEqual(snapshot['methods']['get_all_products']['rows'], 4)
+        self.assertEqual(snapshot['methods']['create_product']['calls'], 2)
+        self.assertGreater(snapshot['methods']['place_order']['latency']['count'], 0)
+        self.assertGreaterEqual(snapshot['connection_acquire']['count'], 7)
+
+        place_order = [entry for entry in snapshot['statements'].values() if entry['method'] == 'place_order']
+        self.assertTrue(any(entry['sql'].startswith("INSERT INTO orders") and entry['rows'] == 1
+                            for entry in place_order))
+
+    def test_rollback_counts_as_error(self):
+        product = self.processor.get_all_products()[0]
+        self.processor.add_to_cart(self.customer, product, 50)
+        order, _ = self.processor.place_order(self.customer, self.processor.get_all_from_cart(self.customer), "x")
+        self.assertIsNone(order)
+        self.assertEqual(self.metrics.snapshot()['methods']['place_order']['errors'], 1)
+
+    def test_private_helpers_are_charged_to_the_public_method(self):
+        try:
+            self.processor.get_products_frame()
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        self.assertIn('get_products_frame', self.metrics.snapshot()['methods'])
+        self.assertNotIn('read_frame', self.metrics.snapshot()['methods'])
+
+    def test_by_date_reads_are_charged_to_their_own_name(self):
+        today = date.today()
+        self.processor.get_orders_by_date(today)
+        list(self.processor.iter_orders_by_date(today))
+        self.processor.get_orders_between(today, today + timedelta(days=1), group_by='day')
+        methods = self.metrics.snapshot()['methods']
+        self.assertEqual(methods['get_orders_by_date']['calls'], 1)
+        self.assertEqual(methods['get_orders_between']['calls'], 1)
+        self.assertIn('iter_orders_by_date', methods)
+        self.assertNotIn('iter_orders_between', methods)
+
+    def test_prometheus_text(self):
+        self.processor.get_all_products()
+        text = self.metrics.to_prometheus()
+        self.assertIn('ecom_repository_method_calls_total{method="get_all_products"} 1', text)
+        self.assertIn('ecom_repository_connection_acquire_seconds_bucket{le="+Inf"}', text)
+        self.assertIn('# TYPE ecom_repository_statement_duration_seconds histogram', text)
+        self.assertEqual(text.count('# TYPE ecom_repository_statement_duration_seconds histogram'), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
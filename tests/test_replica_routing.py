@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.customer import Customer
+from entity.product import Product
+from util.replica_router import ReplicaRouter
+
+
+class TestReplicaRouting(unittest.TestCase):
+    """A primary and a replica file with different contents show where each read went"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        primary_path = os.path.join(directory, "primary.db")
+        replica_path = os.path.join(directory, "replica.db")
+
+        seed = OrderProcessorRepositorySqliteImpl(replica_path)
+        seed.create_product(Product(name="Replica Product", price=1.0, stock_quantity=1))
+        seed.close()
+
+        self.processor = OrderProcessorRepositorySqliteImpl(primary_path, replica_paths=[replica_path],
+                                                            read_your_writes_window=5.0)
+        self.router = self.processor.router
+
+    def tearDown(self):
+        self.processor.close()
+
+    def _product_names(self):
+        return [product.name for product in self.processor.get_all_products()]
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(self._product_names(), ["Replica Product"])
+        self.assertEqual(self.router.stats()['replica_reads'], 1)
+
+    def test_reads_after_a_write_go_to_the_primary(self):
+        self.assertTrue(self.processor.create_product(Product(name="Primary Product", price=2.0, stock_quantity=3)))
+        self.assertEqual(self._product_names(), ["Primary Product"])
+
+        # Another session has not written, so it still reads the replica
+        names = []
+        reader = threading.Thread(target=lambda: names.extend(self._product_names()))
+        reader.start()
+        reader.join()
+        self.assertEqual(names, ["Replica Product"])
+
+        # Once the window has passed, reads return to the replica
+        with mock.patch('util.replica_router.time.monotonic', return_value=self.router._session.last_write + 5.0):
+            self.assertEqual(self._product_names(), ["Replica Product"])
+
+    def test_unit_of_work_stays_on_the_primary(self):
+        self.processor.create_customer(Customer(name="Router User", email="router@unittest.com", password="x1"))
+        self.router._session.last_write = None
+        with self.processor.unit_of_work():
+            self.assertEqual(self._product_names(), [])
+        self.assertEqual(self.router.stats()['replica_reads'], 0)
+
+    def test_reads_after_a_unit_of_work_go_to_the_primary(self):
+        with self.processor.unit_of_work():
+            self.processor.create_product(Product(name="Unit Product", price=2.0, stock_quantity=3))
+        self.assertEqual(self._product_names(), ["Unit Product"])
+        self.assertEqual(self.router.stats()['replica_reads'], 0)
+        self.assertEqual(self.router.stats()['writes'], 1)
+
+    def test_unavailable_replica_falls_back_to_the_primary(self):
+        def broken():
+            raise ConnectionError("replica down")
+
+        router = ReplicaRouter([broken], read_your_writes_window=5.0)
+        primary = mock.Mock(return_value="primary connection")
+        with self.assertLogs('util.replica_router', level='WARNING'):
+            self.assertEqual(router.connect(True, primary), "primary connection")
+        self.assertEqual(router.stats()['fallbacks'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from datetime import datetime
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.customer import Customer
+from entity.product import Product
+from util.result_frame import ResultFrame, np
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestResultFrame(unittest.TestCase):
+    def setUp(self):
+        self.processor = OrderProcessorRepositorySqliteImpl(':memory:')
+        self.processor.create_customer(Customer(name="Frame User", email="frame@unittest.com", password="p"))
+        self.customer = self.processor.get_customers_page()[0][0]
+        self.processor.create_product(Product(name="Pen", price=1.10, stock_quantity=100))
+        self.processor.create_product(Product(name="Book", price=12.99, stock_quantity=100))
+        self.products = self.processor.get_all_products()
+
+    def tearDown(self):
+        self.processor.close()
+
+    def _execute(self, sql, params):
+        connection = self.processor.database.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _order(self, lines, order_date):
+        for product, quantity in lines:
+            self.processor.add_to_cart(self.customer, product, quantity)
+        order, _ = self.processor.place_order(self.customer, self.processor.get_all_from_cart(self.customer), "1 St")
+        self._execute("UPDATE orders SET order_date = %s WHERE order_id = %s", (order_date, order.order_id))
+        return order
+
+    def test_products_frame_uses_integer_cents(self):
+        frame = self.processor.get_products_frame()
+        self.assertEqual(len(frame), 2)
+        self.assertEqual(frame['price_cents'].dtype, np.int64)
+        self.assertEqual(frame['price_cents'].tolist(), [110, 1299])
+        self.assertEqual(frame['stock_quantity'].sum(), 200)
+
+    def test_order_lines_rollup_matches_sql_totals(self):
+        pen, book = self.products
+        self._order([(pen, 3), (book, 1)], datetime(2024, 3, 1, 9))
+        self._order([(book, 2)], datetime(2024, 3, 1, 17))
+        self._order([(pen, 1)], datetime(2024, 3, 2, 8))
+
+        frame = self.processor.get_order_lines_frame_between("2024-03-01", "2024-03-03")
+        self.assertEqual(len(frame), 4)
+        self.assertEqual(frame['quantity'].sum(), 7)
+
+        orders = frame.first_per('order_id')
+        days, revenue = orders.group_sum(orders['order_date'].astype('datetime64[D]'), 'order_total_cents')
+        totals = self.processor.get_orders_between("2024-03-01", "2024-03-03", group_by='day')
+        self.assertEqual([str(day) for day in days], [str(row['period']) for row in totals])
+        self.assertEqual(revenue.tolist(), [int(row['revenue'] * 100) for row in totals])
+
+        self.assertEqual(len(self.processor.get_order_lines_frame_by_date("2024-03-02")), 1)
+
+    def test_order_lines_keep_the_price_they_were_sold_at(self):
+        pen, book = self.products
+        order = self._order([(pen, 2)], datetime(2024, 3, 1, 9))
+        legacy = self._order([(book, 1)], datetime(2024, 3, 1, 10))
+        self._execute("UPDATE order_items SET unit_price = NULL WHERE order_id = %s", (legacy.order_id,))
+        self._execute("UPDATE products SET price = %s", (99.00,))
+
+        frame = self.processor.get_order_lines_frame_by_date("2024-03-01")
+        self.assertEqual(frame['order_id'].tolist(), [order.order_id, legacy.order_id])
+        self.assertEqual(frame['unit_price_cents'].tolist(), [110, 9900])
+
+    def test_empty_frame_keeps_schema(self):
+        frame = self.processor.get_order_lines_frame_by_date("2000-01-01")
+        self.assertEqual(len(frame), 0)
+        self.assertIn('unit_price_cents', frame)
+        self.assertEqual(frame.group_sum('product_id', 'quantity')[1].tolist(), [])
+
+    def test_columns_must_have_equal_length(self):
+        with self.assertRaises(ValueError):
+            ResultFrame({'a': np.arange(2), 'b': np.arange(3)})
+
+
+if __name__ == "__main__":
+    unittest.main()
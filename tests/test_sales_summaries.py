@@ -0,0 +1,90 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.customer import Customer
+from entity.product import Product
+from exception.CustomerNotFoundException import CustomerNotFoundException
+
+
+class TestSalesSummaries(unittest.TestCase):
+    def setUp(self):
+        self.processor = OrderProcessorRepositorySqliteImpl(':memory:')
+        for name, email in (("Alice", "alice@unittest.com"), ("Bob", "bob@unittest.com")):
+            self.processor.create_customer(Customer(name=name, email=email, password="test123"))
+        self.alice, self.bob = self.processor.get_customers_page()[0]
+        for name, price in (("Widget", "2.50"), ("Gadget", "10.00")):
+            self.processor.create_product(Product(name=name, price=Decimal(price), stock_quantity=100))
+        self.widget, self.gadget = sorted(self.processor.get_all_products(), key=lambda p: p.name, reverse=True)
+        self.today = date.today()
+        self.tomorrow = self.today + timedelta(days=1)
+
+    def tearDown(self):
+        self.processor.close()
+
+    def _execute(self, sql, params=()):
+        connection = self.processor.database.get_connection()
+        try:
+            connection.cursor().execute(sql, params)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _order(self, customer, *lines):
+        for product, quantity in lines:
+            self.processor.add_to_cart(customer, product, quantity)
+        order, _ = self.processor.place_order(customer, self.processor.get_all_from_cart(customer), "1 Test St")
+        return order
+
+    def _snapshot(self):
+        return (self.processor.get_daily_product_sales(self.today, self.tomorrow),
+                self.processor.get_customer_sales(self.alice.customer_id),
+                self.processor.get_customer_sales(self.bob.customer_id))
+
+    def test_orders_update_summaries(self):
+        self._order(self.alice, (self.widget, 4), (self.gadget, 1))
+        self._order(self.bob, (self.widget, 2))
+
+        daily = self.processor.get_daily_product_sales(self.today, self.tomorrow)
+        self.assertEqual([(row['product_id'], row['units'], row['revenue']) for row in daily],
+                         [(self.widget.product_id, 6, Decimal('15.00')),
+                          (self.gadget.product_id, 1, Decimal('10.00'))])
+        self.assertEqual(daily[0]['sales_date'], self.today)
+        self.assertEqual(self.processor.get_customer_sales(self.alice.customer_id),
+                         {'order_count': 1, 'units': 5, 'revenue': Decimal('20.00')})
+        self.assertEqual([row['name'] for row in self.processor.get_best_sellers(self.today, self.tomorrow)],
+                         ["Widget", "Gadget"])
+
+    def test_cancel_subtracts_the_sold_price(self):
+        """A price change between the order and its cancellation does not skew the totals"""
+        self._order(self.alice, (self.widget, 3))
+        order = self._order(self.alice, (self.gadget, 2))
+        self._execute("UPDATE products SET price = %s WHERE product_id = %s", (Decimal('99.00'), self.widget.product_id))
+        self._execute("UPDATE products SET price = %s WHERE product_id = %s", (Decimal('1.00'), self.gadget.product_id))
+
+        self.assertTrue(self.processor.cancel_order(order.order_id))
+        self.assertEqual(self.processor.get_customer_sales(self.alice.customer_id),
+                         {'order_count': 1, 'units': 3, 'revenue': Decimal('7.50')})
+        self.assertEqual([row['product_id'] for row in self.processor.get_best_sellers(self.today, self.tomorrow)],
+                         [self.widget.product_id])
+
+    def test_incremental_summaries_match_a_rebuild(self):
+        self._order(self.alice, (self.widget, 1), (self.gadget, 2))
+        cancelled = self._order(self.bob, (self.gadget, 5))
+        self._order(self.bob, (self.widget, 7))
+        self.processor.cancel_order(cancelled.order_id)
+
+        incremental = self._snapshot()
+        self.assertTrue(self.processor.rebuild_sales_summaries())
+        self.assertEqual(self._snapshot(), incremental)
+
+    def test_customer_without_orders(self):
+        self.assertEqual(self.processor.get_customer_sales(self.bob.customer_id),
+                         {'order_count': 0, 'units': 0, 'revenue': Decimal('0.00')})
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.get_customer_sales(9999)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from dao.sharded_order_processor_repository import ShardedOrderProcessorRepository
+from entity.customer import Customer
+from entity.product import Product
+from exception.CustomerNotFoundException import CustomerNotFoundException
+from exception.OrderNotFoundException import OrderNotFoundException
+from util.query_metrics import QueryMetrics
+
+
+class TestSharding(unittest.TestCase):
+    def setUp(self):
+        self.catalog = OrderProcessorRepositorySqliteImpl(':memory:')
+        self.shards = [OrderProcessorRepositorySqliteImpl(':memory:', foreign_keys=False) for _ in range(2)]
+        self.processor = ShardedOrderProcessorRepository(self.catalog, self.shards)
+        for name in ("Alice", "Bob", "Carol"):
+            self.processor.create_customer(Customer(name=name, email=f"{name.lower()}@unittest.com",
+                                                    password="test123"))
+        self.customers = self.processor.get_customers_page()[0]
+        for name, price in (("Widget", "2.50"), ("Gadget", "10.00")):
+            self.processor.create_product(Product(name=name, price=Decimal(price), stock_quantity=100))
+        self.widget, self.gadget = sorted(self.processor.get_all_products(), key=lambda p: p.name, reverse=True)
+        self.today = date.today()
+        self.tomorrow = self.today + timedelta(days=1)
+
+    def tearDown(self):
+        self.processor.close()
+
+    def _order(self, customer, *lines):
+        for product, quantity in lines:
+            self.processor.add_to_cart(customer, product, quantity)
+        order, _ = self.processor.place_order(customer, self.processor.get_all_from_cart(customer), "1 Test St")
+        return order
+
+    def _column(self, shard, sql):
+        connection = shard.database.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql)
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            connection.close()
+
+    def _execute(self, repository, sql, params=()):
+        connection = repository.database.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _shard_order_ids(self, shard):
+        return self._column(shard, "SELECT order_id FROM orders ORDER BY order_id")
+
+    def test_requires_a_shard(self):
+        with self.assertRaises(ValueError):
+            ShardedOrderProcessorRepository(self.catalog, [])
+
+    def test_orders_live_on_the_customers_shard(self):
+        orders = [self._order(customer, (self.widget, 2)) for customer in self.customers]
+        self.assertEqual(len({order.order_id for order in orders}), 3)
+
+        for customer, order in zip(self.customers, orders):
+            shard = self.shards[self.processor.shard_for(customer.customer_id)]
+            self.assertIn(order.order_id, self._shard_order_ids(shard))
+            found, items = self.processor.get_order_by_id(order.order_id)
+            self.assertEqual((found.customer_id, [item.quantity for item in items]), (customer.customer_id, [2]))
+        self.assertEqual(sum(len(self._shard_order_ids(shard)) for shard in self.shards), 3)
+        self.assertEqual(self.processor.get_product_by_id(self.widget.product_id).stock_quantity, 94)
+
+    def test_cart_is_kept_on_the_shard(self):
+        alice = self.customers[0]
+        self.processor.add_to_cart(alice, self.widget, 2)
+        self.processor.add_to_cart(alice, self.gadget, 1)
+
+        summary = self.processor.get_cart_summary(alice)
+        self.assertEqual((summary['item_count'], summary['total']), (3, Decimal('15.00')))
+        self.assertTrue(self.processor.remove_from_cart(alice, self.gadget))
+        self.assertFalse(self.processor.remove_from_cart(alice, self.gadget))
+        self.assertEqual([product.name for _, product in self.processor.get_all_from_cart(alice)], ["Widget"])
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.get_all_from_cart(Customer(customer_id=999))
+
+    def test_orders_by_date_gathers_every_shard(self):
+        orders = [self._order(customer, (self.widget, 1), (self.gadget, 1)) for customer in self.customers]
+
+        gathered = self.processor.get_orders_by_date(self.today)
+        self.assertEqual(sorted(gathered), sorted(order.order_id for order in orders))
+        first = gathered[orders[0].order_id]
+        self.assertEqual(first['customer'].name, "Alice")
+        self.assertEqual(sorted(product.name for _, product in first['items']), ["Gadget", "Widget"])
+        self.assertEqual(len(list(self.processor.iter_orders_by_date(self.today))), 3)
+
+        totals = self.processor.get_orders_between(self.today, self.tomorrow, group_by='day')
+        self.assertEqual([(row['order_count'], row['revenue'], row['units']) for row in totals],
+                         [(3, Decimal('37.50'), 6)])
+
+        frame = self.processor.get_order_lines_frame_by_date(self.today)
+        self.assertEqual(len(frame), 6)
+        self.assertEqual(int((frame['quantity'] * frame['unit_price_cents']).sum()), 3750)
+        self.assertEqual(self.processor.get_orders_by_date(datetime(2000, 1, 1)), {})
+
+    def test_order_lines_frame_keeps_the_sold_price(self):
+        alice, bob = self.customers[:2]
+        sold = self._order(alice, (self.widget, 2))
+        legacy = self._order(bob, (self.widget, 1))
+        self._execute(self.shards[self.processor.shard_for(bob.customer_id)],
+                      "UPDATE order_items SET unit_price = NULL WHERE order_id = %s", (legacy.order_id,))
+        self._execute(self.catalog, "UPDATE products SET price = %s WHERE product_id = %s",
+                      (4.00, self.widget.product_id))
+
+        frame = self.processor.get_order_lines_frame_by_date(self.today)
+        self.assertEqual(frame['order_id'].tolist(), [sold.order_id, legacy.order_id])
+        self.assertEqual(frame['unit_price_cents'].tolist(), [250, 400])
+
+    def test_catalog_lookups_are_batched(self):
+        orders = [self._order(customer, (self.widget, 1), (self.gadget, 1)) for customer in self.customers]
+
+        self.processor.LOOKUP_BATCH_SIZE = 1
+        gathered = self.processor.get_orders_by_date(self.today)
+        self.assertEqual(sorted(gathered), sorted(order.order_id for order in orders))
+        self.assertEqual(sorted(entry['customer'].name for entry in gathered.values()), ["Alice", "Bob", "Carol"])
+        self.assertTrue(all(len(entry['items']) == 2 for entry in gathered.values()))
+
+    def test_iter_orders_between_merges_the_shards_lazily(self):
+        orders = [self._order(customer, (self.widget, 1)) for customer in self.customers * 2]
+
+        self.processor.STREAM_PAGE_SIZE = 2
+        stream = self.processor.iter_orders_between(self.today, self.tomorrow)
+        newest = next(stream)
+        self.assertEqual((newest['order'].order_id, newest['customer'].name), (orders[-1].order_id, "Carol"))
+        self.assertEqual([entry['order'].order_id for entry in stream],
+                         list(self.processor.get_orders_between(self.today, self.tomorrow))[1:])
+        stream.close()
+
+    def test_orders_by_customer_pages(self):
+        alice = self.customers[0]
+        orders = [self._order(alice, (self.widget, quantity)) for quantity in (1, 2, 3)]
+
+        page, token = self.processor.get_orders_by_customer_page(alice.customer_id, page_size=2)
+        self.assertEqual(list(page), [orders[2].order_id, orders[1].order_id])
+        page, token = self.processor.get_orders_by_customer_page(alice.customer_id, 2, token)
+        self.assertEqual((list(page), token), ([orders[0].order_id], None))
+        self.assertEqual(len(self.processor.get_orders_by_customer(alice.customer_id)), 3)
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.get_orders_by_customer(999)
+
+    def test_cancel_restores_catalog_stock(self):
+        order = self._order(self.customers[1], (self.gadget, 4))
+        self.assertEqual(self.processor.get_product_by_id(self.gadget.product_id).stock_quantity, 96)
+
+        self.assertTrue(self.processor.cancel_order(order.order_id))
+        self.assertEqual(self.processor.get_product_by_id(self.gadget.product_id).stock_quantity, 100)
+        self.assertFalse(self.processor.cancel_order(order.order_id))
+        with self.assertRaises(OrderNotFoundException):
+            self.processor.get_order_by_id(order.order_id)
+
+    def test_sales_are_merged_across_shards(self):
+        for customer in self.customers:
+            self._order(customer, (self.widget, 2))
+        self._order(self.customers[0], (self.gadget, 1))
+
+        daily = self.processor.get_daily_product_sales(self.today, self.tomorrow)
+        self.assertEqual([(row['product_id'], row['units']) for row in daily],
+                         [(self.widget.product_id, 6), (self.gadget.product_id, 1)])
+        self.assertEqual([row['name'] for row in self.processor.get_best_sellers(self.today, self.tomorrow)],
+                         ["Widget", "Gadget"])
+        self.assertEqual(self.processor.get_customer_sales(self.customers[0].customer_id),
+                         {'order_count': 2, 'units': 3, 'revenue': Decimal('15.00')})
+
+    def test_move_customer(self):
+        alice = self.customers[0]
+        orders = [self._order(alice, (self.widget, 1)), self._order(alice, (self.gadget, 2))]
+        self.processor.add_to_cart(alice, self.widget, 5)
+        source = self.processor.shard_for(alice.customer_id)
+        target = 1 - source
+
+        self.assertEqual(self.processor.move_customer(alice.customer_id, target), 2)
+        self.assertEqual(self.processor.shard_for(alice.customer_id), target)
+        self.assertEqual(self._shard_order_ids(self.shards[source]), [])
+        self.assertEqual(self._shard_order_ids(self.shards[target]), [order.order_id for order in orders])
+        self.assertEqual(self.processor.get_cart_summary(alice)['item_count'], 5)
+        self.assertEqual(self.processor.get_customer_sales(alice.customer_id),
+                         {'order_count': 2, 'units': 3, 'revenue': Decimal('22.50')})
+        self.assertEqual(self._column(self.shards[source], "SELECT customer_id FROM customer_sales"), [])
+
+        # Orders stay cancellable where they now live, and moving back works
+        self.assertTrue(self.processor.cancel_order(orders[0].order_id))
+        self.assertEqual(self.processor.move_customer(alice.customer_id, source), 1)
+        self.assertEqual(self.processor.shard_for(alice.customer_id), source)
+        self.assertEqual(self.processor.shard_stats()[source]['orders'], 1)
+        self.assertEqual(self.processor.move_customer(alice.customer_id, source), 0)
+        with self.assertRaises(ValueError):
+            self.processor.move_customer(alice.customer_id, 2)
+
+    def test_move_customer_prices_legacy_lines_from_the_catalog(self):
+        alice = self.customers[0]
+        order = self._order(alice, (self.gadget, 2))
+        source = self.processor.shard_for(alice.customer_id)
+        self._execute(self.shards[source], "UPDATE order_items SET unit_price = NULL WHERE order_id = %s",
+                      (order.order_id,))
+
+        self.processor.move_customer(alice.customer_id, 1 - source)
+        self.assertEqual([(row['product_id'], row['revenue'])
+                          for row in self.processor.get_daily_product_sales(self.today, self.tomorrow)],
+                         [(self.gadget.product_id, Decimal('20.00'))])
+
+    def test_unit_of_work_is_scoped_to_one_customer(self):
+        alice = self.customers[0]
+        with self.assertRaises(TypeError):
+            with self.processor.unit_of_work():
+                pass
+        with self.processor.unit_of_work(customer_id=alice.customer_id):
+            self.processor.add_to_cart(alice, self.widget, 2)
+            order, _ = self.processor.place_order(alice, self.processor.get_all_from_cart(alice), "1 Test St")
+        self.assertEqual(self.processor.get_order_by_id(order.order_id)[0].customer_id, alice.customer_id)
+
+        with self.assertRaises(RuntimeError):
+            with self.processor.unit_of_work(customer_id=alice.customer_id):
+                self.processor.add_to_cart(alice, self.gadget, 1)
+                self.processor.place_order(alice, self.processor.get_all_from_cart(alice), "1 Test St")
+                raise RuntimeError("abandon the unit")
+        self.assertEqual(len(self.processor.get_orders_by_customer(alice.customer_id)), 1)
+        self.assertEqual(self.processor.get_all_from_cart(alice), [])
+        self.assertEqual(self.processor.get_product_by_id(self.gadget.product_id).stock_quantity, 100)
+        self.assertEqual(self.processor.get_product_by_id(self.widget.product_id).stock_quantity, 98)
+
+    def test_metrics_are_charged_to_the_public_method(self):
+        metrics = QueryMetrics()
+        for repository in [self.catalog] + self.shards:
+            repository.metrics = metrics
+        alice = self.customers[0]
+        self._order(alice, (self.widget, 1))
+        self.processor.get_orders_between(self.today, self.tomorrow)
+        self.processor.get_orders_by_date(self.today)
+        list(self.processor.iter_orders_by_date(self.today))
+        self.processor.get_customer_sales(alice.customer_id)
+        self.assertEqual(sorted(metrics.snapshot()['methods']),
+                         ['add_to_cart', 'get_all_from_cart', 'get_customer_sales', 'get_orders_between',
+                          'get_orders_by_date', 'iter_orders_by_date', 'place_order'])
+
+    def test_writes_lock_the_customer(self):
+        alice = self.customers[0]
+        with mock.patch.object(self.processor, '_lock_customer', wraps=self.processor._lock_customer) as lock:
+            order = self._order(alice, (self.widget, 1))
+            self.assertTrue(self.processor.cancel_order(order.order_id))
+            self.processor.move_customer(alice.customer_id, 1 - self.processor.shard_for(alice.customer_id))
+        # add_to_cart, place_order, cancel_order and move_customer
+        self.assertEqual([call.args[1] for call in lock.call_args_list], [alice.customer_id] * 4)
+        self.assertEqual(self.processor.place_order(Customer(customer_id=999), [], "1 Test St"), (None, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,347 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.customer import Customer
+from entity.product import Product
+from entity.order import Order
+from entity.cart import Cart
+from exception.CustomerNotFoundException import CustomerNotFoundException
+from exception.ProductNotFoundException import ProductNotFoundException
+from exception.OrderNotFoundException import OrderNotFoundException
+
+
+class TestSqliteBackend(unittest.TestCase):
+    """Same scenarios as test_ecommerce.py, run against an in-memory SQLite database"""
+
+    def setUp(self):
+        self.processor = OrderProcessorRepositorySqliteImpl(':memory:')
+
+        self.test_customer = Customer(name="Test User", email="test@unittest.com", password="test123")
+        self.test_product = Product(name="Test Product", price=10.99, description="Unit Test Item", stock_quantity=100)
+
+        self.processor.create_customer(self.test_customer)
+        self.processor.create_product(self.test_product)
+
+        self.test_customer.customer_id = self._scalar(
+            "SELECT customer_id FROM customers WHERE email = %s", ("test@unittest.com",))
+        self.test_product.product_id = self._scalar(
+            "SELECT product_id FROM products WHERE name = %s", ("Test Product",))
+
+    def tearDown(self):
+        self.processor.close()
+
+    def _scalar(self, sql, params=()):
+        connection = self.processor.database.get_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+            connection.commit()
+            return row[0] if row else None
+        finally:
+            connection.close()
+
+    def test_create_product(self):
+        """Product creation and duplicate rejection"""
+        new_product = Product(name="New Test Product", price=19.99, description="New Item", stock_quantity=50)
+        self.assertTrue(self.processor.create_product(new_product))
+        self.assertFalse(self.processor.create_product(new_product))
+        self.assertIsNotNone(self._scalar("SELECT product_id FROM products WHERE name = %s", ("New Test Product",)))
+
+    def test_add_to_cart(self):
+        """Adding the same product twice accumulates quantity"""
+        first = self.processor.add_to_cart(self.test_customer, self.test_product, 2)
+        self.assertTrue(first)
+        second = self.processor.add_to_cart(self.test_customer, self.test_product, 3)
+        self.assertEqual(first.cart_id, second.cart_id)
+
+        cart_items = self.processor.get_all_from_cart(self.test_customer)
+        self.assertEqual(len(cart_items), 1)
+        self.assertIsInstance(cart_items[0][0], Cart)
+        self.assertEqual(cart_items[0][0].quantity, 5)
+        self.assertEqual(cart_items[0][1].name, "Test Product")
+
+    def test_place_and_cancel_order(self):
+        """Placing an order decrements stock, cancelling restores it"""
+        self.processor.add_to_cart(self.test_customer, self.test_product, 4)
+        cart_items = self.processor.get_all_from_cart(self.test_customer)
+
+        order, order_items = self.processor.place_order(self.test_customer, cart_items, "123 Test St")
+        self.assertIsInstance(order, Order)
+        self.assertEqual(len(order_items), 1)
+        self.assertEqual(self._scalar("SELECT stock_quantity FROM products WHERE product_id = %s",
+                                      (self.test_product.product_id,)), 96)
+        self.assertEqual(self.processor.get_all_from_cart(self.test_customer), [])
+
+        orders = self.processor.get_orders_by_customer(self.test_customer.customer_id)
+        self.assertIn(order.order_id, orders)
+
+        self.assertTrue(self.processor.cancel_order(order.order_id))
+        self.assertEqual(self._scalar("SELECT stock_quantity FROM products WHERE product_id = %s",
+                                      (self.test_product.product_id,)), 100)
+
+    def test_place_order_with_many_lines(self):
+        """Order lines carry their generated ids and every product's stock is decremented"""
+        products = [self.test_product]
+        for i in range(4):
+            product = Product(name=f"Line Product {i}", price=2.5, description="Line", stock_quantity=10)
+            self.processor.create_product(product)
+            product.product_id = self._scalar("SELECT product_id FROM products WHERE name = %s", (product.name,))
+            products.append(product)
+        for quantity, product in enumerate(products, 1):
+            self.processor.add_to_cart(self.test_customer, product, quantity)
+
+        cart_items = self.processor.get_all_from_cart(self.test_customer)
+        order, order_items = self.processor.place_order(self.test_customer, cart_items, "123 Test St")
+
+        _, stored_items = self.processor.get_order_by_id(order.order_id)
+        self.assertEqual(sorted((i.order_item_id, i.product_id, i.quantity) for i in order_items),
+                         sorted((i.order_item_id, i.product_id, i.quantity) for i in stored_items))
+        for quantity, product in enumerate(products, 1):
+            self.assertEqual(self._scalar("SELECT stock_quantity FROM products WHERE product_id = %s",
+                                          (product.product_id,)), product.stock_quantity - quantity)
+
+    def test_place_order_rejects_stale_stock(self):
+        """Stock is validated against the database, not the caller's snapshot, and nothing is written"""
+        self.processor.add_to_cart(self.test_customer, self.test_product, 5)
+        cart_items = self.processor.get_all_from_cart(self.test_customer)
+        self._scalar("UPDATE products SET stock_quantity = 3 WHERE product_id = %s", (self.test_product.product_id,))
+
+        order, order_items = self.processor.place_order(self.test_customer, cart_items, "123 Test St")
+        self.assertIsNone(order)
+        self.assertEqual(self._scalar("SELECT COUNT(*) FROM orders"), 0)
+        self.assertEqual(self._scalar("SELECT stock_quantity FROM products WHERE product_id = %s",
+                                      (self.test_product.product_id,)), 3)
+        self.assertEqual(len(self.processor.get_all_from_cart(self.test_customer)), 1)
+
+    def test_cart_summary_and_server_side_total(self):
+        """The cart is priced in SQL and checkout charges the same exact total"""
+        pen = Product(name="Pen", price=0.1, description="x", stock_quantity=50)
+        self.processor.create_product(pen)
+        pen.product_id = self._scalar("SELECT product_id FROM products WHERE name = %s", ("Pen",))
+        self.processor.add_to_cart(self.test_customer, self.test_product, 3)
+        self.processor.add_to_cart(self.test_customer, pen, 7)
+
+        summary = self.processor.get_cart_summary(self.test_customer)
+        self.assertEqual([line_total for _, _, line_total in summary['items']],
+                         [Decimal('32.97'), Decimal('0.70')])
+        self.assertEqual(summary['item_count'], 10)
+        self.assertEqual(summary['total'], Decimal('33.67'))
+
+        cart_items = [(cart, product) for cart, product, _ in summary['items']]
+        order, _ = self.processor.place_order(self.test_customer, cart_items, "123 Test St", summary['total'])
+        self.assertEqual(order.total_price, Decimal('33.67'))
+        self.assertEqual(Decimal(str(self._scalar("SELECT total_price FROM orders"))), Decimal('33.67'))
+
+        empty = self.processor.get_cart_summary(self.test_customer)
+        self.assertEqual((empty['items'], empty['item_count'], empty['total']), ([], 0, Decimal('0.00')))
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.get_cart_summary(Customer(customer_id=999))
+
+    def test_place_order_refuses_changed_prices(self):
+        """A total confirmed before a price change is not charged"""
+        self.processor.add_to_cart(self.test_customer, self.test_product, 2)
+        summary = self.processor.get_cart_summary(self.test_customer)
+        self._scalar("UPDATE products SET price = 12.99 WHERE product_id = %s", (self.test_product.product_id,))
+
+        cart_items = [(cart, product) for cart, product, _ in summary['items']]
+        order, _ = self.processor.place_order(self.test_customer, cart_items, "123 Test St", summary['total'])
+        self.assertIsNone(order)
+        self.assertEqual(self._scalar("SELECT COUNT(*) FROM orders"), 0)
+
+    def test_concurrent_checkouts_do_not_oversell(self):
+        """Two shoppers racing for the last units: exactly one order wins"""
+        path = os.path.join(tempfile.mkdtemp(), "race.db")
+        repository = OrderProcessorRepositorySqliteImpl(path)
+        repository.create_product(Product(name="Last One", price=5, description="x", stock_quantity=2))
+        product = repository.get_all_products()[0]
+
+        carts = []
+        for i in range(2):
+            customer = Customer(name="Racer", email=f"racer{i}@unittest.com", password="x")
+            repository.create_customer(customer)
+            customer.customer_id = i + 1
+            repository.add_to_cart(customer, product, 2)
+            carts.append((customer, repository.get_all_from_cart(customer)))
+
+        results = []
+        threads = [threading.Thread(target=lambda c=c, items=items: results.append(
+            repository.place_order(c, items, "Somewhere")[0])) for c, items in carts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(1 for order in results if order is not None), 1)
+        self.assertEqual(repository.get_all_products()[0].stock_quantity, 0)
+        repository.close()
+
+    def test_customer_not_found_exception(self):
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.add_to_cart(Customer(customer_id=999), self.test_product, 1)
+
+    def test_product_not_found_exception(self):
+        with self.assertRaises(ProductNotFoundException):
+            self.processor.add_to_cart(self.test_customer, Product(product_id=999), 1)
+
+    def test_missing_ids_raise_without_pre_checks(self):
+        """Not-found errors still surface where the existence probe only runs on a miss"""
+        ghost = Customer(customer_id=999)
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.get_all_from_cart(ghost)
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.get_orders_by_customer(999)
+        with self.assertRaises(CustomerNotFoundException):
+            list(self.processor.iter_orders_by_customer(999))
+        with self.assertRaises(ProductNotFoundException):
+            self.processor.remove_from_cart(self.test_customer, Product(product_id=999))
+        with self.assertRaises(ProductNotFoundException):
+            self.processor.delete_product(999)
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.delete_customer(999)
+
+    def test_existence_cache_forgets_deleted_customer(self):
+        """A cached live id is dropped as soon as it is deleted"""
+        self.assertEqual(self.processor.get_all_from_cart(self.test_customer), [])
+        self.assertTrue(self.processor._live_ids.is_live('customers', self.test_customer.customer_id))
+
+        self.assertTrue(self.processor.delete_customer(self.test_customer.customer_id))
+        # place_order reports a missing customer by returning no order
+        self.assertEqual(self.processor.place_order(self.test_customer, [], "123 Test St"), (None, []))
+
+    def test_deleting_product_clears_it_from_carts(self):
+        """Cart rows follow their product through the cascading foreign key"""
+        self.processor.add_to_cart(self.test_customer, self.test_product, 1)
+        self.assertTrue(self.processor.delete_product(self.test_product.product_id))
+        self.assertEqual(self.processor.get_all_from_cart(self.test_customer), [])
+
+    def test_order_not_found_exception(self):
+        with self.assertRaises(OrderNotFoundException):
+            self.processor.get_order_by_id(999)
+
+    def test_get_orders_by_date(self):
+        """Orders placed today are returned with order, customer and items"""
+        self.processor.add_to_cart(self.test_customer, self.test_product, 1)
+        cart_items = self.processor.get_all_from_cart(self.test_customer)
+        self.processor.place_order(self.test_customer, cart_items, "123 Test St")
+
+        orders = self.processor.get_orders_by_date(datetime.now().date().isoformat())
+        self.assertEqual(len(orders), 1)
+        order_data = next(iter(orders.values()))
+        self.assertIsInstance(order_data['order'], Order)
+        self.assertIsInstance(order_data['order'].order_date, datetime)
+        self.assertIsInstance(order_data['customer'], Customer)
+        self.assertEqual(len(order_data['items']), 1)
+
+    def test_get_orders_between_with_totals(self):
+        """Range query returns orders, and per-day / per-hour totals are aggregated in SQL"""
+        rows = [(1, "2024-03-01 09:15:00", "10.00", 2), (2, "2024-03-01 09:45:00", "5.50", 1),
+                (3, "2024-03-02 18:00:00", "20.00", 4), (4, "2024-03-05 08:00:00", "1.00", 1)]
+        for order_id, order_date, total, quantity in rows:
+            self._scalar("INSERT INTO orders (order_id, customer_id, order_date, total_price, shipping_address) "
+                         "VALUES (%s, %s, %s, %s, 'x')",
+                         (order_id, self.test_customer.customer_id, order_date, total))
+            self._scalar("INSERT INTO order_items (order_id, product_id, quantity) VALUES (%s, %s, %s)",
+                         (order_id, self.test_product.product_id, quantity))
+
+        orders = self.processor.get_orders_between("2024-03-01", "2024-03-03")
+        self.assertEqual(sorted(orders), [1, 2, 3])
+
+        daily = self.processor.get_orders_between("2024-03-01", "2024-03-03", group_by='day')
+        self.assertEqual([(d['period'].isoformat(), d['order_count'], str(d['revenue']), d['units']) for d in daily],
+                         [("2024-03-01", 2, "15.50", 3), ("2024-03-02", 1, "20.00", 4)])
+
+        hourly = self.processor.get_orders_between(datetime(2024, 3, 1), datetime(2024, 3, 2), group_by='hour')
+        self.assertEqual(len(hourly), 1)
+        self.assertEqual(hourly[0]['period'], datetime(2024, 3, 1, 9))
+        self.assertEqual(hourly[0]['order_count'], 2)
+
+        with self.assertRaises(ValueError):
+            self.processor.get_orders_between("2024-03-01", "2024-03-03", group_by='week')
+
+    def test_keyset_pagination(self):
+        """Pages cover every row exactly once and end with a None token"""
+        for i in range(6):
+            self.processor.create_product(Product(name=f"Paged {i}", price=1, description="p", stock_quantity=1))
+
+        seen, token = [], None
+        while True:
+            products, token = self.processor.get_products_page(3, token)
+            seen.extend(p.product_id for p in products)
+            if token is None:
+                break
+        self.assertEqual(seen, sorted(p.product_id for p in self.processor.get_all_products()))
+
+        customers, token = self.processor.get_customers_page(5)
+        self.assertEqual(len(customers), 1)
+        self.assertIsNone(token)
+
+        with self.assertRaises(ValueError):
+            self.processor.get_products_page(3, "not-a-token")
+
+    def test_order_history_pagination(self):
+        """Order history pages newest first, including orders sharing a timestamp"""
+        for order_id in range(1, 6):
+            order_date = "2024-03-01 10:00:00" if order_id <= 3 else f"2024-03-0{order_id} 10:00:00"
+            self._scalar("INSERT INTO orders (order_id, customer_id, order_date, total_price, shipping_address) "
+                         "VALUES (%s, %s, %s, 1, 'x')", (order_id, self.test_customer.customer_id, order_date))
+            self._scalar("INSERT INTO order_items (order_id, product_id, quantity) VALUES (%s, %s, 1)",
+                         (order_id, self.test_product.product_id))
+
+        pages, token = [], None
+        while True:
+            orders, token = self.processor.get_orders_by_customer_page(self.test_customer.customer_id, 2, token)
+            pages.append(list(orders))
+            if token is None:
+                break
+        self.assertEqual(pages, [[5, 4], [3, 2], [1]])
+
+        with self.assertRaises(CustomerNotFoundException):
+            self.processor.get_orders_by_customer_page(999)
+
+    def test_streaming_order_queries(self):
+        """iter_* variants yield the same orders as the list variants, one at a time"""
+        self.processor.STREAM_BATCH_SIZE = 2
+        for order_id in range(1, 5):
+            self._scalar("INSERT INTO orders (order_id, customer_id, order_date, total_price, shipping_address) "
+                         "VALUES (%s, %s, '2024-03-01 10:00:00', 1, 'x')",
+                         (order_id, self.test_customer.customer_id))
+            for _ in range(order_id):
+                self._scalar("INSERT INTO order_items (order_id, product_id, quantity) VALUES (%s, %s, 1)",
+                             (order_id, self.test_product.product_id))
+
+        streamed = list(self.processor.iter_orders_by_customer(self.test_customer.customer_id))
+        self.assertEqual([(order.order_id, len(items)) for order, items in streamed], [(4, 4), (3, 3), (2, 2), (1, 1)])
+
+        by_date = list(self.processor.iter_orders_by_date("2024-03-01"))
+        self.assertEqual(sorted(entry['order'].order_id for entry in by_date),
+                         sorted(self.processor.get_orders_by_date("2024-03-01")))
+
+        # Abandoning a stream hands its connection back to the pool
+        stream = self.processor.iter_orders_between("2024-03-01", "2024-03-02")
+        next(stream)
+        stream.close()
+        self.assertEqual(self.processor.database.stats()['borrowed'], 0)
+
+        with self.assertRaises(CustomerNotFoundException):
+            next(self.processor.iter_orders_by_customer(999))
+
+    def test_file_backed_database_persists(self):
+        """A file-backed database keeps data across repository instances"""
+        path = os.path.join(tempfile.mkdtemp(), "ecom.db")
+        repository = OrderProcessorRepositorySqliteImpl(path)
+        repository.create_product(Product(name="Persisted", price=1.5, description="x", stock_quantity=1))
+        repository.close()
+
+        repository = OrderProcessorRepositorySqliteImpl(path)
+        self.assertEqual([p.name for p in repository.get_all_products()], ["Persisted"])
+        repository.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from unittest import mock
+
+from dao.cached_order_processor_repository import CachedOrderProcessorRepository
+from dao.order_processor_repository_sqlite_impl import OrderProcessorRepositorySqliteImpl
+from entity.customer import Customer
+from entity.product import Product
+from exception.UnitOfWorkRolledBackException import UnitOfWorkRolledBackException
+
+
+class TestUnitOfWork(unittest.TestCase):
+    def setUp(self):
+        self.processor = OrderProcessorRepositorySqliteImpl(':memory:')
+        self.processor.create_customer(Customer(name="Unit User", email="unit@unittest.com", password="x1"))
+        self.customer = self.processor.get_customers_page()[0][0]
+        for index in range(5):
+            self.processor.create_product(Product(name=f"Unit Product {index}", price=2.0, stock_quantity=10))
+        self.products = self.processor.get_all_products()
+
+    def tearDown(self):
+        self.processor.close()
+
+    def _borrows(self):
+        return self.processor.database.stats()['total_borrows']
+
+    def test_calls_share_one_connection_and_commit(self):
+        borrows = self._borrows()
+        with self.processor.unit_of_work():
+            for product in self.products:
+                self.processor.add_to_cart(self.customer, product, 2)
+            order, order_items = self.processor.place_order(
+                self.customer, self.processor.get_all_from_cart(self.customer), "1 Unit St")
+        self.assertEqual(self._borrows() - borrows, 1)
+        self.assertEqual(len(order_items), 5)
+        self.assertEqual(self.processor.get_order_by_id(order.order_id)[0].total_price, order.total_price)
+        self.assertEqual(self.processor.get_all_from_cart(self.customer), [])
+
+    def test_exception_rolls_back_every_call(self):
+        with self.assertRaises(RuntimeError):
+            with self.processor.unit_of_work():
+                self.processor.add_to_cart(self.customer, self.products[0], 1)
+                self.processor.delete_product(self.products[1].product_id)
+                raise RuntimeError("abandon checkout")
+        self.assertEqual(self.processor.get_all_from_cart(self.customer), [])
+        self.assertEqual(len(self.processor.get_all_products()), 5)
+
+    def test_failed_call_dooms_the_unit(self):
+        with self.assertRaises(UnitOfWorkRolledBackException):
+            with self.processor.unit_of_work():
+                self.processor.add_to_cart(self.customer, self.products[0], 50)
+                order, _ = self.processor.place_order(
+                    self.customer, self.processor.get_all_from_cart(self.customer), "1 Unit St")
+                self.assertIsNone(order)  # not enough stock
+                with self.assertRaises(UnitOfWorkRolledBackException):
+                    self.processor.get_all_products()
+        self.assertEqual(self.processor.get_all_from_cart(self.customer), [])
+
+    def test_nested_units_commit_once(self):
+        with self.processor.unit_of_work() as outer:
+            with self.processor.unit_of_work() as inner:
+                self.processor.add_to_cart(self.customer, self.products[0], 1)
+            self.assertIs(inner, outer)
+            with mock.patch.object(outer.connection, 'commit', wraps=outer.connection.commit) as commit:
+                self.processor.add_to_cart(self.customer, self.products[1], 1)
+            commit.assert_not_called()
+        self.assertEqual(len(self.processor.get_all_from_cart(self.customer)), 2)
+
+    def test_cache_is_cleared_when_the_unit_rolls_back(self):
+        cached = CachedOrderProcessorRepository(self.processor, max_size=100, ttl=60)
+        cached.get_all_products()
+        with self.assertRaises(RuntimeError):
+            with cached.unit_of_work():
+                cached.delete_product(self.products[0].product_id)
+                raise RuntimeError("undo")
+        self.assertEqual(len(cached.get_all_products()), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
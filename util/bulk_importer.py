@@ -0,0 +1,173 @@
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+
+
+class BulkImporter(ABC):
+    """
+    Streams a CSV or JSONL feed into the database in committed chunks.
+
+    Subclasses turn a record into an entity (_parse, raising ValueError for
+    invalid records), name the key that must be unique (_unique_key) and
+    write a chunk (_write_chunk, returning the entities skipped because they
+    already exist, or None if the chunk failed and was rolled back).
+
+    Rejected records are appended to a CSV report (record number, reason,
+    raw record). After each committed chunk, the number of records consumed
+    is saved to a checkpoint file. With resume=True a later run skips that
+    many records, so an interrupted import continues where it stopped.
+    Chunks are idempotent because existing keys are skipped, so replaying
+    one is harmless, though its rejects may be reported twice. The
+    checkpoint is deleted once the import completes.
+    """
+
+    FIELDS = ()
+    EXISTS_REASON = "Already exists"
+    DUPLICATE_REASON = "Duplicate in file"
+
+    def __init__(self, repository, chunk_size=10000, rejects_path=None, checkpoint_path=None):
+        self.repository = repository
+        self.chunk_size = chunk_size
+        self.rejects_path = rejects_path
+        self.checkpoint_path = checkpoint_path
+
+    @abstractmethod
+    def _parse(self, record):
+        pass
+
+    @abstractmethod
+    def _unique_key(self, entity):
+        pass
+
+    @abstractmethod
+    def _write_chunk(self, entities):
+        pass
+
+    @staticmethod
+    def detect_format(path):
+        return 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+    def _records(self, path, file_format):
+        # Yields (record_number, dict or None, raw text); None means unparseable
+        with open(path, newline='', encoding='utf-8') as f:
+            if file_format == 'csv':
+                for number, row in enumerate(csv.DictReader(f), start=1):
+                    yield number, row, json.dumps(row)
+            else:
+                number = 0
+                for line in f:
+                    if not line.strip():
+                        continue
+                    number += 1
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    yield number, record if isinstance(record, dict) else None, line.rstrip('\r\n')
+
+    def _require_fields(self, record):
+        missing = [field for field in self.FIELDS if record.get(field) in (None, '')]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)}")
+
+    def _source_fingerprint(self, path):
+        stat = os.stat(path)
+        return {'source': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def _read_checkpoint(self, path):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        fingerprint = self._source_fingerprint(path)
+        if any(checkpoint.get(key) != value for key, value in fingerprint.items()):
+            raise ValueError(f"Checkpoint {self.checkpoint_path} belongs to a different or modified file")
+        return checkpoint['records']
+
+    def _write_checkpoint(self, path, records):
+        if not self.checkpoint_path:
+            return
+        checkpoint = dict(self._source_fingerprint(path), records=records)
+        temporary_path = self.checkpoint_path + '.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def run(self, path, file_format=None, resume=False):
+        """
+        Imports path and returns a summary dict: records, inserted,
+        existing, duplicates, rejected, resumed_from and completed (False if
+        a chunk failed; rerun with resume=True).
+        """
+        file_format = file_format or self.detect_format(path)
+        resumed_from = self._read_checkpoint(path) if resume else 0
+        summary = {'records': resumed_from, 'inserted': 0, 'existing': 0, 'duplicates': 0,
+                   'rejected': 0, 'resumed_from': resumed_from, 'completed': False}
+
+        rejects = None
+        if self.rejects_path:
+            rejects = open(self.rejects_path, 'a' if resumed_from else 'w', newline='', encoding='utf-8')
+        try:
+            writer = csv.writer(rejects) if rejects else None
+            if writer and not resumed_from:
+                writer.writerow(['record', 'reason', 'raw'])
+
+            def reject(number, reason, raw):
+                summary['rejected'] += 1
+                if writer:
+                    writer.writerow([number, reason, raw])
+
+            seen_keys = set()
+            chunk = []  # (record_number, raw, entity)
+            consumed = resumed_from
+
+            def flush():
+                skipped = self._write_chunk([entity for _, _, entity in chunk])
+                if skipped is None:
+                    return False
+                skipped_ids = {id(entity) for entity in skipped}
+                for number, raw, entity in chunk:
+                    if id(entity) in skipped_ids:
+                        summary['existing'] += 1
+                        reject(number, self.EXISTS_REASON, raw)
+                summary['inserted'] += len(chunk) - len(skipped)
+                if rejects:
+                    rejects.flush()
+                self._write_checkpoint(path, consumed)
+                chunk.clear()
+                return True
+
+            for number, record, raw in self._records(path, file_format):
+                if number <= resumed_from:
+                    continue
+                consumed = number
+                summary['records'] += 1
+                if record is None:
+                    reject(number, "Unparseable record", raw)
+                    continue
+                try:
+                    entity = self._parse(record)
+                except ValueError as e:
+                    reject(number, str(e), raw)
+                    continue
+                key = self._unique_key(entity)
+                if key in seen_keys:
+                    summary['duplicates'] += 1
+                    reject(number, self.DUPLICATE_REASON, raw)
+                    continue
+                seen_keys.add(key)
+                chunk.append((number, raw, entity))
+                if len(chunk) >= self.chunk_size and not flush():
+                    return summary
+
+            if chunk and not flush():
+                return summary
+
+            summary['completed'] = True
+            if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            return summary
+        finally:
+            if rejects:
+                rejects.close()
@@ -0,0 +1,214 @@
+import threading
+import time
+from collections import deque
+from exception.ConnectionPoolTimeoutException import ConnectionPoolTimeoutException
+
+
+class PooledConnection:
+    """
+    Thin proxy around a raw driver connection. close() hands the connection
+    back to its pool instead of tearing down the socket.
+    """
+
+    def __init__(self, pool, raw_connection):
+        self._pool = pool
+        self._raw = raw_connection
+        self._released = False
+
+    @property
+    def raw_connection(self):
+        return self._raw
+
+    def is_connected(self):
+        # The pool validates on borrow, so a checked-out connection is live
+        # until it is released. This avoids a server ping on every close().
+        return not self._released
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool._release(self._raw)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Bounded pool of driver connections.
+
+    factory             -- callable returning a new raw connection
+    pool_size           -- maximum number of open connections
+    timeout             -- seconds to wait for a free connection before giving up
+    idle_timeout        -- idle connections older than this are closed (None disables)
+    validation_interval -- connections idle for longer than this are validated on
+                           borrow; 0 validates on every borrow
+    validate            -- callable(raw_connection) -> bool used for validation
+    """
+
+    def __init__(self, factory, pool_size=5, timeout=10.0, idle_timeout=300.0,
+                 validation_interval=30.0, validate=None):
+        if pool_size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self._factory = factory
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._idle_timeout = idle_timeout
+        self._validation_interval = validation_interval
+        self._validate = validate
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw_connection, released_at), newest on the right
+        self._open = 0
+        self._borrowed = 0
+        self._closed = False
+
+        self._total_borrows = 0
+        self._total_created = 0
+        self._total_evicted = 0
+        self._total_invalidated = 0
+        self._total_timeouts = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def get_connection(self):
+        started = time.monotonic()
+        deadline = started + self._timeout
+        stale = []
+        raw, released_at = None, None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                stale.extend(self._evict_idle_locked(time.monotonic()))
+                if self._idle:
+                    # LIFO: reuse the most recently returned (warmest) connection
+                    raw, released_at = self._idle.pop()
+                    break
+                if self._open < self._pool_size:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._total_timeouts += 1
+                    self._close_quietly(stale)
+                    raise ConnectionPoolTimeoutException(self._timeout)
+                self._cond.wait(remaining)
+            self._borrowed += 1
+
+        self._close_quietly(stale)
+
+        try:
+            if raw is not None and not self._is_valid(raw, released_at):
+                self._close_quietly([raw])
+                with self._cond:
+                    self._total_invalidated += 1
+                raw = None
+            if raw is None:
+                raw = self._factory()
+                with self._cond:
+                    self._total_created += 1
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._borrowed -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._total_borrows += 1
+            self._total_wait_time += waited
+            self._max_wait_time = max(self._max_wait_time, waited)
+        return PooledConnection(self, raw)
+
+    def _is_valid(self, raw, released_at):
+        if self._validate is None:
+            return True
+        if time.monotonic() - released_at < self._validation_interval:
+            return True
+        try:
+            return bool(self._validate(raw))
+        except Exception:
+            return False
+
+    def _release(self, raw):
+        healthy = True
+        try:
+            # Never hand the next borrower a half-finished transaction
+            if getattr(raw, 'in_transaction', False):
+                raw.rollback()
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._borrowed -= 1
+            if healthy and not self._closed:
+                self._idle.append((raw, time.monotonic()))
+                raw = None
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+        if raw is not None:
+            self._close_quietly([raw])
+
+    def _evict_idle_locked(self, now):
+        evicted = []
+        if self._idle_timeout is None:
+            return evicted
+        while self._idle and now - self._idle[0][1] > self._idle_timeout:
+            evicted.append(self._idle.popleft()[0])
+            self._open -= 1
+            self._total_evicted += 1
+        return evicted
+
+    @staticmethod
+    def _close_quietly(connections):
+        for raw in connections:
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    def evict_idle(self):
+        """Close idle connections that have exceeded idle_timeout."""
+        with self._cond:
+            evicted = self._evict_idle_locked(time.monotonic())
+        self._close_quietly(evicted)
+        return len(evicted)
+
+    def close(self):
+        """Close every idle connection; borrowed ones are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        self._close_quietly(idle)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pool_size': self._pool_size,
+                'open': self._open,
+                'borrowed': self._borrowed,
+                'idle': len(self._idle),
+                'total_borrows': self._total_borrows,
+                'total_created': self._total_created,
+                'total_evicted': self._total_evicted,
+                'total_invalidated': self._total_invalidated,
+                'total_timeouts': self._total_timeouts,
+                'total_wait_time': self._total_wait_time,
+                'avg_wait_time': (self._total_wait_time / self._total_borrows
+                                  if self._total_borrows else 0.0),
+                'max_wait_time': self._max_wait_time,
+            }
@@ -0,0 +1,30 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+class ContinuationToken:
+    """
+    Opaque keyset-pagination cursor: the sort key of the last row on a
+    page, serialized as URL-safe base64 JSON. Datetimes survive the round trip.
+    """
+
+    @staticmethod
+    def encode(*values):
+        payload = [{'dt': value.isoformat()} if isinstance(value, datetime) else value for value in values]
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode(token, expected_length):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = [datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+                      for value in payload]
+        except (binascii.Error, ValueError, TypeError, KeyError, AttributeError):
+            raise ValueError("Invalid continuation token")
+        if len(values) != expected_length:
+            raise ValueError("Invalid continuation token")
+        return values
@@ -1,33 +1,138 @@
+import logging
+import threading
 from util.db_property_util import DBPropertyUtil
+from util.connection_pool import ConnectionPool
 import mysql.connector
 
+logger = logging.getLogger(__name__)
+
+
 class DBConnUtil:
+    _pool = None
+    _replica_pools = None
+    _shard_pools = None
+    _pool_lock = threading.Lock()
+
     @staticmethod
     def get_connection():
+        """
+        Borrows a connection from the shared pool. Calling close() on it
+        returns it to the pool.
+        """
         try:
-            db_config = DBPropertyUtil.get_property_string('db.properties')
-
-            if not db_config:
-                raise ValueError("Database configuration is empty")
-
-            connection = mysql.connector.connect(
-                host=db_config['host'],
-                port=db_config['port'],
-                user=db_config['user'],
-                password=db_config['password'],
-                database=db_config['database'],
-                autocommit=True
-            )
-
-            if connection.is_connected():
-                print("Database connection successful")
-                return connection
-            else:
-                raise ConnectionError("Failed to establish database connection")
+            return DBConnUtil.get_pool().get_connection()
 
         except mysql.connector.Error as e:
-            print(f"Database connection error: {e}")
+            logger.error("Database connection error: %s", e)
             raise
         except Exception as e:
-            print(f"General error: {e}")
-            raise
\ No newline at end of file
+            logger.error("General error: %s", e)
+            raise
+
+    @staticmethod
+    def get_pool():
+        if DBConnUtil._pool is None:
+            with DBConnUtil._pool_lock:
+                if DBConnUtil._pool is None:
+                    pool_config = DBPropertyUtil.get_pool_properties('db.properties')
+                    DBConnUtil._pool = ConnectionPool(
+                        DBConnUtil._create_connection,
+                        pool_size=pool_config['pool_size'],
+                        timeout=pool_config['pool_timeout'],
+                        idle_timeout=pool_config['idle_timeout'],
+                        validation_interval=pool_config['validation_interval'],
+                        validate=lambda connection: connection.is_connected()
+                    )
+        return DBConnUtil._pool
+
+    @staticmethod
+    def get_replica_pools():
+        """
+        One pool per [replicas] host, sized like the primary pool; an
+        empty list when no replicas are configured
+        """
+        if DBConnUtil._replica_pools is None:
+            with DBConnUtil._pool_lock:
+                if DBConnUtil._replica_pools is None:
+                    pool_config = DBPropertyUtil.get_pool_properties('db.properties')
+                    DBConnUtil._replica_pools = [
+                        ConnectionPool(
+                            lambda host=host, port=port: DBConnUtil._create_connection(host, port),
+                            pool_size=pool_config['pool_size'],
+                            timeout=pool_config['pool_timeout'],
+                            idle_timeout=pool_config['idle_timeout'],
+                            validation_interval=pool_config['validation_interval'],
+                            validate=lambda connection: connection.is_connected()
+                        )
+                        for host, port in DBPropertyUtil.get_replica_properties('db.properties')['hosts']
+                    ]
+        return DBConnUtil._replica_pools
+
+    @staticmethod
+    def get_shard_pools():
+        """
+        One pool per [shards] database, sized like the primary pool; an
+        empty list when sharding is not configured. Shard connections do
+        not check foreign keys, since customers and products live in the
+        primary (catalog) database.
+        """
+        if DBConnUtil._shard_pools is None:
+            with DBConnUtil._pool_lock:
+                if DBConnUtil._shard_pools is None:
+                    pool_config = DBPropertyUtil.get_pool_properties('db.properties')
+                    DBConnUtil._shard_pools = [
+                        ConnectionPool(
+                            lambda host=host, port=port, database=database: DBConnUtil._create_connection(
+                                host, port, database, foreign_key_checks=False),
+                            pool_size=pool_config['pool_size'],
+                            timeout=pool_config['pool_timeout'],
+                            idle_timeout=pool_config['idle_timeout'],
+                            validation_interval=pool_config['validation_interval'],
+                            validate=lambda connection: connection.is_connected()
+                        )
+                        for host, port, database in DBPropertyUtil.get_shard_properties('db.properties')['databases']
+                    ]
+        return DBConnUtil._shard_pools
+
+    @staticmethod
+    def get_pool_stats():
+        return DBConnUtil.get_pool().stats()
+
+    @staticmethod
+    def close_pool():
+        with DBConnUtil._pool_lock:
+            if DBConnUtil._pool is not None:
+                DBConnUtil._pool.close()
+                DBConnUtil._pool = None
+            for pool in (DBConnUtil._replica_pools or []) + (DBConnUtil._shard_pools or []):
+                pool.close()
+            DBConnUtil._replica_pools = None
+            DBConnUtil._shard_pools = None
+
+    @staticmethod
+    def _create_connection(host=None, port=None, database=None, foreign_key_checks=True):
+        db_config = DBPropertyUtil.get_property_string('db.properties')
+
+        if not db_config:
+            raise ValueError("Database configuration is empty")
+
+        connection = mysql.connector.connect(
+            host=host or db_config['host'],
+            port=port or db_config['port'],
+            user=db_config['user'],
+            password=db_config['password'],
+            database=database or db_config['database'],
+            autocommit=True,
+            # Pooled connections are reused, so never leave unread rows behind
+            consume_results=True
+        )
+
+        if connection.is_connected():
+            if not foreign_key_checks:
+                cursor = connection.cursor()
+                cursor.execute("SET SESSION foreign_key_checks = 0")
+                cursor.close()
+            logger.debug("Database connection successful")
+            return connection
+        else:
+            raise ConnectionError("Failed to establish database connection")
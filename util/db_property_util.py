@@ -1,24 +1,39 @@
 import os
+import logging
+import threading
 import configparser
 
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
 class DBPropertyUtil:
+    """
+    Process-wide, lazily loaded view of db.properties.
+
+    The file is parsed once per path and cached. Lookup order for the file:
+    explicit path passed to load()/set_config_path(), the ECOM_DB_PROPERTIES
+    environment variable, then the given file name relative to the project
+    root. Any key can be overridden with an ECOM_<SECTION>_<KEY> environment
+    variable, e.g. ECOM_DATABASE_HOST or ECOM_POOL_POOL_SIZE.
+    """
+
+    PATH_ENV_VAR = 'ECOM_DB_PROPERTIES'
+    ENV_PREFIX = 'ECOM_'
+
+    _lock = threading.Lock()
+    _configs = {}
+    _explicit_path = None
+
     @staticmethod
     def get_property_string(file_name='db.properties'):
         """
-        Reads database configuration from properties file with absolute path
+        Returns the [database] section as a dict
         """
         try:
-            # Absolute path to the properties file
-            file_path = r"C:\Users\Ragavi\PycharmProjects\ecom_app\db.properties"
-
-            print(f"Loading config from: {file_path}")  # Debug output
-
-            config = configparser.ConfigParser()
-            files_read = config.read(file_path)
-
-            if not files_read:
-                raise FileNotFoundError(f"Config file not found at {file_path}")
+            config = DBPropertyUtil.get_config(file_name)
 
             if not config.has_section('database'):
                 raise ValueError("Missing [database] section in config file")
@@ -38,11 +53,269 @@ class DBPropertyUtil:
             }
 
         except configparser.Error as e:
-            print(f"Config file syntax error: {e}")
+            logger.error("Config file syntax error: %s", e)
             raise
         except ValueError as e:
-            print(f"Invalid configuration: {e}")
+            logger.error("Invalid configuration: %s", e)
             raise
         except Exception as e:
-            print(f"Unexpected error reading config: {e}")
-            raise
\ No newline at end of file
+            logger.error("Unexpected error reading config: %s", e)
+            raise
+
+    @staticmethod
+    def get_pool_properties(file_name='db.properties'):
+        """
+        Reads the optional [pool] section; missing keys fall back to defaults
+        """
+        try:
+            config = DBPropertyUtil.get_config(file_name)
+            return {
+                'pool_size': config.getint('pool', 'pool_size', fallback=5),
+                'pool_timeout': config.getfloat('pool', 'pool_timeout', fallback=10.0),
+                'idle_timeout': config.getfloat('pool', 'idle_timeout', fallback=300.0),
+                'validation_interval': config.getfloat('pool', 'validation_interval', fallback=30.0)
+            }
+
+        except (configparser.Error, ValueError) as e:
+            logger.error("Invalid pool configuration: %s", e)
+            raise
+
+    @staticmethod
+    def get_backend(file_name='db.properties'):
+        """
+        Returns the configured backend name: 'mysql' (default) or 'sqlite'
+        """
+        config = DBPropertyUtil.get_config(file_name)
+        return config.get('database', 'backend', fallback='mysql').strip().lower()
+
+    @staticmethod
+    def get_sqlite_properties(file_name='db.properties'):
+        """
+        Reads the optional [sqlite] section. Relative paths are resolved
+        against the project root; ':memory:' gives a throwaway database.
+        """
+        try:
+            config = DBPropertyUtil.get_config(file_name)
+            path = DBPropertyUtil._resolve_sqlite_path(config.get('sqlite', 'path', fallback='ecommerce.db'))
+            replica_paths = config.get('sqlite', 'replica_paths', fallback='')
+            shard_paths = config.get('sqlite', 'shard_paths', fallback='')
+            return {
+                'path': path,
+                'pool_size': config.getint('sqlite', 'pool_size', fallback=5),
+                'replica_paths': [DBPropertyUtil._resolve_sqlite_path(replica.strip())
+                                  for replica in replica_paths.split(',') if replica.strip()],
+                'shard_paths': [DBPropertyUtil._resolve_sqlite_path(shard.strip())
+                                for shard in shard_paths.split(',') if shard.strip()]
+            }
+
+        except (configparser.Error, ValueError) as e:
+            logger.error("Invalid sqlite configuration: %s", e)
+            raise
+
+    @staticmethod
+    def _resolve_sqlite_path(path):
+        if path != ':memory:' and not os.path.isabs(path):
+            path = os.path.join(PROJECT_ROOT, path)
+        return path
+
+    @staticmethod
+    def get_replica_properties(file_name='db.properties'):
+        """
+        Reads the optional [replicas] section. hosts is a comma-separated
+        list of host[:port] read replicas sharing the [database] credentials
+        (port defaults to the primary's); empty means no replicas.
+        """
+        try:
+            config = DBPropertyUtil.get_config(file_name)
+            default_port = config.getint('database', 'port', fallback=3306)
+            hosts = []
+            for entry in config.get('replicas', 'hosts', fallback='').split(','):
+                entry = entry.strip()
+                if not entry:
+                    continue
+                host, _, port = entry.partition(':')
+                hosts.append((host, int(port) if port else default_port))
+            return {
+                'hosts': hosts,
+                'read_your_writes_window': config.getfloat('replicas', 'read_your_writes_window', fallback=5.0)
+            }
+
+        except (configparser.Error, ValueError) as e:
+            logger.error("Invalid replica configuration: %s", e)
+            raise
+
+    @staticmethod
+    def get_shard_properties(file_name='db.properties'):
+        """
+        Reads the optional [shards] section. databases is a comma-separated
+        list of host[:port]/database shards sharing the [database]
+        credentials (port defaults to the primary's), returned as
+        (host, port, database) tuples; empty means no sharding.
+        """
+        try:
+            config = DBPropertyUtil.get_config(file_name)
+            default_port = config.getint('database', 'port', fallback=3306)
+            databases = []
+            for entry in config.get('shards', 'databases', fallback='').split(','):
+                entry = entry.strip()
+                if not entry:
+                    continue
+                address, separator, database = entry.partition('/')
+                if not separator or not database:
+                    raise ValueError(f"Shard '{entry}' must be host[:port]/database")
+                host, _, port = address.partition(':')
+                databases.append((host, int(port) if port else default_port, database))
+            return {'databases': databases}
+
+        except (configparser.Error, ValueError) as e:
+            logger.error("Invalid shard configuration: %s", e)
+            raise
+
+    @staticmethod
+    def get_archive_properties(file_name='db.properties'):
+        """
+        Reads the optional [archive] section: how many days orders stay in
+        the live tables and how many orders each archive transaction moves
+        """
+        try:
+            config = DBPropertyUtil.get_config(file_name)
+            return {
+                'retention_days': config.getint('archive', 'retention_days', fallback=365),
+                'batch_size': config.getint('archive', 'batch_size', fallback=500)
+            }
+
+        except (configparser.Error, ValueError) as e:
+            logger.error("Invalid archive configuration: %s", e)
+            raise
+
+    @staticmethod
+    def get_cache_properties(file_name='db.properties'):
+        """
+        Reads the optional [cache] section; the product cache is off by default
+        """
+        try:
+            config = DBPropertyUtil.get_config(file_name)
+            return {
+                'enabled': config.getboolean('cache', 'enabled', fallback=False),
+                'max_size': config.getint('cache', 'max_size', fallback=10000),
+                'ttl': config.getfloat('cache', 'ttl', fallback=60.0)
+            }
+
+        except (configparser.Error, ValueError) as e:
+            logger.error("Invalid cache configuration: %s", e)
+            raise
+
+    @staticmethod
+    def get_metrics_properties(file_name='db.properties'):
+        """
+        Reads the optional [metrics] section; instrumentation is off by
+        default. slow_query_ms is None when the slow-query log is disabled.
+        """
+        try:
+            config = DBPropertyUtil.get_config(file_name)
+            slow_query_ms = config.get('metrics', 'slow_query_ms', fallback='').strip()
+            return {
+                'enabled': config.getboolean('metrics', 'enabled', fallback=False),
+                'slow_query_ms': float(slow_query_ms) if slow_query_ms else None
+            }
+
+        except (configparser.Error, ValueError) as e:
+            logger.error("Invalid metrics configuration: %s", e)
+            raise
+
+    @staticmethod
+    def get_logging_properties(file_name='db.properties'):
+        """
+        Reads the optional [logging] section: the level name for the
+        application's log output, WARNING by default
+        """
+        config = DBPropertyUtil.get_config(file_name)
+        level = config.get('logging', 'level', fallback='WARNING').strip().upper()
+        if not isinstance(logging.getLevelName(level), int):
+            logger.error("Invalid logging level: %s", level)
+            raise ValueError(f"Invalid logging level: {level}")
+        return {'level': level}
+
+    @staticmethod
+    def get_config(file_name='db.properties'):
+        """
+        Returns the cached ConfigParser for the resolved path, loading it on
+        first use. Callers must treat the result as read-only.
+        """
+        file_path = DBPropertyUtil.resolve_path(file_name)
+        config = DBPropertyUtil._configs.get(file_path)
+        if config is None:
+            with DBPropertyUtil._lock:
+                config = DBPropertyUtil._configs.get(file_path)
+                if config is None:
+                    config = DBPropertyUtil._read(file_path)
+                    DBPropertyUtil._configs[file_path] = config
+        return config
+
+    @staticmethod
+    def resolve_path(file_name='db.properties'):
+        if DBPropertyUtil._explicit_path:
+            return DBPropertyUtil._explicit_path
+        env_path = os.environ.get(DBPropertyUtil.PATH_ENV_VAR)
+        if env_path:
+            return os.path.abspath(env_path)
+        if os.path.isabs(file_name):
+            return file_name
+        return os.path.join(PROJECT_ROOT, file_name)
+
+    @staticmethod
+    def set_config_path(file_path):
+        """
+        Pins the properties file used by every subsequent lookup. Passing
+        None goes back to environment/default resolution.
+        """
+        with DBPropertyUtil._lock:
+            DBPropertyUtil._explicit_path = os.path.abspath(file_path) if file_path else None
+
+    @staticmethod
+    def load(file_path):
+        """Pins file_path as the properties file and (re)loads it."""
+        DBPropertyUtil.set_config_path(file_path)
+        return DBPropertyUtil.reload()
+
+    @staticmethod
+    def reload():
+        """
+        Re-reads the file and the environment. Existing pools keep their
+        settings until recreated (see DBConnUtil.close_pool()).
+        """
+        DBPropertyUtil.invalidate()
+        return DBPropertyUtil.get_config()
+
+    @staticmethod
+    def invalidate():
+        """Drops every cached config; the next lookup loads it again."""
+        with DBPropertyUtil._lock:
+            DBPropertyUtil._configs.clear()
+
+    @staticmethod
+    def _read(file_path):
+        logger.debug("Loading config from: %s", file_path)
+
+        config = configparser.ConfigParser()
+        files_read = config.read(file_path)
+
+        if not files_read:
+            raise FileNotFoundError(f"Config file not found at {file_path}")
+
+        DBPropertyUtil._apply_env_overrides(config)
+        return config
+
+    @staticmethod
+    def _apply_env_overrides(config):
+        prefix = DBPropertyUtil.ENV_PREFIX
+        for name, value in os.environ.items():
+            if not name.startswith(prefix) or name == DBPropertyUtil.PATH_ENV_VAR:
+                continue
+            section_key = name[len(prefix):].lower()
+            if '_' not in section_key:
+                continue
+            section, key = section_key.split('_', 1)
+            if not config.has_section(section):
+                config.add_section(section)
+            config.set(section, key, value)
@@ -0,0 +1,36 @@
+from util.ttl_cache import TTLCache
+
+
+class ExistenceCache:
+    """
+    Short-lived positive cache of ids known to exist, keyed by table.
+
+    Only hits are remembered: an id is marked live after a successful
+    lookup and forgotten when it is deleted, so a delete made through the
+    same repository is seen at once. Deletes made elsewhere can go unseen
+    for at most ttl seconds. A ttl of 0 (or None) disables the cache.
+    """
+
+    def __init__(self, ttl=5.0, max_size=10000):
+        self.enabled = bool(ttl)
+        self._live = TTLCache(max_size=max_size, ttl=ttl) if self.enabled else None
+
+    def is_live(self, table, key):
+        if not self.enabled:
+            return False
+        return self._live.get((table, key)) is not None
+
+    def mark_live(self, table, key):
+        if self.enabled:
+            self._live.put((table, key), True)
+
+    def forget(self, table, key):
+        if self.enabled:
+            self._live.pop((table, key))
+
+    def clear(self):
+        if self.enabled:
+            self._live.clear()
+
+    def stats(self):
+        return self._live.stats() if self.enabled else {}
@@ -0,0 +1,81 @@
+from util.migrations import MIGRATIONS
+
+
+class MigrationRunner:
+    """
+    Applies the versioned migrations in util/migrations.py and records each
+    applied version in the schema_version table.
+
+    get_connection -- callable returning a connection (pooled or raw)
+    dialect        -- 'mysql' or 'sqlite'
+    verbose        -- print each migration as it is applied
+    """
+
+    def __init__(self, get_connection, dialect, migrations=MIGRATIONS, verbose=True):
+        self.get_connection = get_connection
+        self.dialect = dialect
+        self.verbose = verbose
+        self.migrations = sorted(migrations, key=lambda migration: migration[0])
+
+    def _ensure_version_table(self, cursor):
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS schema_version
+               (
+               version int primary key,
+               description varchar(200) not null,
+               applied_at timestamp default current_timestamp
+               )"""
+        )
+
+    def current_version(self):
+        connection = self.get_connection()
+        try:
+            cursor = connection.cursor()
+            self._ensure_version_table(cursor)
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            version = cursor.fetchone()[0]
+            cursor.close()
+            connection.commit()
+            return version
+        finally:
+            connection.close()
+
+    def pending(self):
+        current = self.current_version()
+        return [migration for migration in self.migrations if migration[0] > current]
+
+    def migrate(self, target=None):
+        """
+        Applies pending migrations up to target (all by default) and returns
+        the versions applied. MySQL commits DDL implicitly, so each version
+        is recorded only after all of its statements succeeded.
+        """
+        applied = []
+        for version, description, statements in self.pending():
+            if target is not None and version > target:
+                break
+            if self.dialect not in statements:
+                raise ValueError(f"Migration {version} has no statements for {self.dialect}")
+
+            connection = self.get_connection()
+            try:
+                cursor = connection.cursor()
+                connection.start_transaction()
+                for statement in statements[self.dialect]:
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                connection.commit()
+                cursor.close()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                connection.close()
+
+            if self.verbose:
+                print(f"Applied migration {version}: {description}")
+            applied.append(version)
+        return applied
@@ -0,0 +1,250 @@
+# Versioned schema changes applied on top of the base schema (ecommerce_db.sql
+# for MySQL, SQLITE_SCHEMA for SQLite). Append new versions; never edit an
+# applied one. Each entry: (version, description, {dialect: [statements]}).
+
+MIGRATIONS = [
+    (
+        1,
+        "cart: unique (customer_id, product_id) and cascading foreign keys",
+        {
+            'mysql': [
+                """DELETE FROM cart
+                   WHERE customer_id NOT IN (SELECT customer_id FROM customers)
+                      OR product_id NOT IN (SELECT product_id FROM products)""",
+                """UPDATE cart c
+                       JOIN (SELECT MIN(cart_id) AS keep_id, SUM(quantity) AS total_quantity
+                             FROM cart
+                             GROUP BY customer_id, product_id
+                             HAVING COUNT(*) > 1) d ON c.cart_id = d.keep_id
+                   SET c.quantity = d.total_quantity""",
+                """DELETE c1 FROM cart c1
+                       JOIN cart c2 ON c1.customer_id = c2.customer_id
+                                   AND c1.product_id = c2.product_id
+                                   AND c1.cart_id > c2.cart_id""",
+                """ALTER TABLE cart
+                       ADD CONSTRAINT uq_cart_customer_product UNIQUE (customer_id, product_id),
+                       ADD CONSTRAINT fk_cart_customer FOREIGN KEY (customer_id)
+                           REFERENCES customers (customer_id) ON DELETE CASCADE,
+                       ADD CONSTRAINT fk_cart_product FOREIGN KEY (product_id)
+                           REFERENCES products (product_id) ON DELETE CASCADE""",
+            ],
+            # SQLite cannot add constraints to an existing table, so rebuild it
+            'sqlite': [
+                """CREATE TABLE cart_new
+                   (
+                   cart_id integer primary key autoincrement,
+                   customer_id int not null,
+                   product_id int not null,
+                   quantity int not null,
+                   constraint uq_cart_customer_product unique (customer_id, product_id),
+                   constraint fk_cart_customer foreign key (customer_id)
+                       references customers(customer_id) on delete cascade,
+                   constraint fk_cart_product foreign key (product_id)
+                       references products(product_id) on delete cascade
+                   )""",
+                """INSERT INTO cart_new (cart_id, customer_id, product_id, quantity)
+                   SELECT MIN(cart_id), customer_id, product_id, SUM(quantity)
+                   FROM cart
+                   WHERE customer_id IN (SELECT customer_id FROM customers)
+                     AND product_id IN (SELECT product_id FROM products)
+                   GROUP BY customer_id, product_id""",
+                "DROP TABLE cart",
+                "ALTER TABLE cart_new RENAME TO cart",
+            ],
+        },
+    ),
+    (
+        2,
+        "secondary indexes for order history, date filtering and product lookups",
+        {
+            # cart.customer_id is already the leading column of
+            # uq_cart_customer_product and customers.email is a unique key
+            'mysql': [
+                "CREATE INDEX idx_orders_customer_date ON orders (customer_id, order_date)",
+                "CREATE INDEX idx_orders_order_date ON orders (order_date)",
+                "CREATE INDEX idx_order_items_order ON order_items (order_id)",
+                "CREATE INDEX idx_products_name ON products (name)",
+            ],
+            'sqlite': [
+                "CREATE INDEX idx_orders_customer_date ON orders (customer_id, order_date)",
+                "CREATE INDEX idx_orders_order_date ON orders (order_date)",
+                "CREATE INDEX idx_order_items_order ON order_items (order_id)",
+                "CREATE INDEX idx_products_name ON products (name)",
+            ],
+        },
+    ),
+    (
+        3,
+        "order_items.unit_price and incrementally maintained sales summary tables",
+        {
+            # Money is kept in integer cents so repeated += / -= stays exact
+            'mysql': [
+                "ALTER TABLE order_items ADD COLUMN unit_price DECIMAL(10,2) NULL",
+                """CREATE TABLE daily_product_sales
+                   (
+                   sales_date DATE NOT NULL,
+                   product_id INT NOT NULL,
+                   units BIGINT NOT NULL DEFAULT 0,
+                   revenue_cents BIGINT NOT NULL DEFAULT 0,
+                   PRIMARY KEY (sales_date, product_id)
+                   )""",
+                """CREATE TABLE customer_sales
+                   (
+                   customer_id INT PRIMARY KEY,
+                   order_count INT NOT NULL DEFAULT 0,
+                   units BIGINT NOT NULL DEFAULT 0,
+                   revenue_cents BIGINT NOT NULL DEFAULT 0
+                   )""",
+                """INSERT INTO daily_product_sales (sales_date, product_id, units, revenue_cents)
+                   SELECT DATE(o.order_date), oi.product_id, SUM(oi.quantity),
+                          COALESCE(SUM(CAST(ROUND(p.price * 100) AS SIGNED) * oi.quantity), 0)
+                   FROM orders o
+                            JOIN order_items oi ON o.order_id = oi.order_id
+                            LEFT JOIN products p ON oi.product_id = p.product_id
+                   GROUP BY DATE(o.order_date), oi.product_id""",
+                """INSERT INTO customer_sales (customer_id, order_count, units, revenue_cents)
+                   SELECT o.customer_id, COUNT(*), COALESCE(SUM(per_order.units), 0),
+                          SUM(CAST(ROUND(o.total_price * 100) AS SIGNED))
+                   FROM orders o
+                            LEFT JOIN (SELECT order_id, SUM(quantity) AS units
+                                       FROM order_items
+                                       GROUP BY order_id) per_order ON o.order_id = per_order.order_id
+                   GROUP BY o.customer_id""",
+            ],
+            'sqlite': [
+                "ALTER TABLE order_items ADD COLUMN unit_price decimal(10,2)",
+                """CREATE TABLE daily_product_sales
+                   (
+                   sales_date text not null,
+                   product_id int not null,
+                   units int not null default 0,
+                   revenue_cents int not null default 0,
+                   primary key (sales_date, product_id)
+                   )""",
+                """CREATE TABLE customer_sales
+                   (
+                   customer_id integer primary key,
+                   order_count int not null default 0,
+                   units int not null default 0,
+                   revenue_cents int not null default 0
+                   )""",
+                """INSERT INTO daily_product_sales (sales_date, product_id, units, revenue_cents)
+                   SELECT DATE(o.order_date), oi.product_id, SUM(oi.quantity),
+                          COALESCE(SUM(CAST(ROUND(p.price * 100) AS INTEGER) * oi.quantity), 0)
+                   FROM orders o
+                            JOIN order_items oi ON o.order_id = oi.order_id
+                            LEFT JOIN products p ON oi.product_id = p.product_id
+                   GROUP BY DATE(o.order_date), oi.product_id""",
+                """INSERT INTO customer_sales (customer_id, order_count, units, revenue_cents)
+                   SELECT o.customer_id, COUNT(*), COALESCE(SUM(per_order.units), 0),
+                          SUM(CAST(ROUND(o.total_price * 100) AS INTEGER))
+                   FROM orders o
+                            LEFT JOIN (SELECT order_id, SUM(quantity) AS units
+                                       FROM order_items
+                                       GROUP BY order_id) per_order ON o.order_id = per_order.order_id
+                   GROUP BY o.customer_id""",
+            ],
+        },
+    ),
+    (
+        4,
+        "shard directory: customer placements and globally allocated order ids",
+        {
+            # Only used in the catalog database of a sharded deployment.
+            # customer_shards holds customers moved off their hash shard;
+            # order_shards allocates order ids and records each order's shard.
+            'mysql': [
+                """CREATE TABLE customer_shards
+                   (
+                       customer_id INT PRIMARY KEY,
+                       shard       INT NOT NULL
+                   )""",
+                """CREATE TABLE order_shards
+                   (
+                       order_id    INT AUTO_INCREMENT PRIMARY KEY,
+                       customer_id INT NOT NULL,
+                       shard       INT NOT NULL,
+                       INDEX idx_order_shards_customer (customer_id)
+                   )""",
+            ],
+            'sqlite': [
+                """CREATE TABLE customer_shards
+                   (
+                   customer_id integer primary key,
+                   shard int not null
+                   )""",
+                """CREATE TABLE order_shards
+                   (
+                   order_id integer primary key autoincrement,
+                   customer_id int not null,
+                   shard int not null
+                   )""",
+                "CREATE INDEX idx_order_shards_customer ON order_shards (customer_id)",
+            ],
+        },
+    ),
+    (
+        5,
+        "order archive tables and the archive boundary",
+        {
+            # archive_orders moves orders older than the retention window
+            # here in batches. archived_before is raised before each run, so
+            # every archived order is older than it and reads of later
+            # ranges can skip the archive.
+            'mysql': [
+                """CREATE TABLE orders_archive
+                   (
+                       order_id         INT PRIMARY KEY,
+                       customer_id      INT           NOT NULL,
+                       order_date       TIMESTAMP     NULL,
+                       total_price      DECIMAL(10,2) NOT NULL,
+                       shipping_address TEXT          NOT NULL,
+                       INDEX idx_orders_archive_customer_date (customer_id, order_date),
+                       INDEX idx_orders_archive_order_date (order_date)
+                   )""",
+                """CREATE TABLE order_items_archive
+                   (
+                       order_item_id INT PRIMARY KEY,
+                       order_id      INT NOT NULL,
+                       product_id    INT NOT NULL,
+                       quantity      INT NOT NULL,
+                       unit_price    DECIMAL(10,2) NULL,
+                       INDEX idx_order_items_archive_order (order_id)
+                   )""",
+                """CREATE TABLE order_archive_state
+                   (
+                       state_id        INT PRIMARY KEY,
+                       archived_before TIMESTAMP NULL
+                   )""",
+                "INSERT INTO order_archive_state (state_id, archived_before) VALUES (1, NULL)",
+            ],
+            'sqlite': [
+                """CREATE TABLE orders_archive
+                   (
+                   order_id integer primary key,
+                   customer_id int not null,
+                   order_date timestamp,
+                   total_price decimal(10,2) not null,
+                   shipping_address text not null
+                   )""",
+                "CREATE INDEX idx_orders_archive_customer_date ON orders_archive (customer_id, order_date)",
+                "CREATE INDEX idx_orders_archive_order_date ON orders_archive (order_date)",
+                """CREATE TABLE order_items_archive
+                   (
+                   order_item_id integer primary key,
+                   order_id int not null,
+                   product_id int not null,
+                   quantity int not null,
+                   unit_price decimal(10,2)
+                   )""",
+                "CREATE INDEX idx_order_items_archive_order ON order_items_archive (order_id)",
+                """CREATE TABLE order_archive_state
+                   (
+                   state_id integer primary key,
+                   archived_before timestamp
+                   )""",
+                "INSERT INTO order_archive_state (state_id, archived_before) VALUES (1, NULL)",
+            ],
+        },
+    ),
+]
@@ -0,0 +1,32 @@
+from entity.product import Product
+from util.bulk_importer import BulkImporter
+from util.validators import Validators
+
+
+class ProductImporter(BulkImporter):
+    """
+    Bulk-loads a product feed (name, price, description, stock_quantity)
+    through repository.bulk_create_products. Records are validated with
+    the interactive app's rules and deduplicated by name; see BulkImporter
+    for chunking, the rejects report and resume.
+    """
+
+    FIELDS = ('name', 'price', 'description', 'stock_quantity')
+    EXISTS_REASON = "Product already exists"
+    DUPLICATE_REASON = "Duplicate name in file"
+
+    def _parse(self, record):
+        self._require_fields(record)
+        return Product(
+            name=Validators.validate_product_name(str(record['name'])),
+            price=Validators.validate_price(record['price']),
+            description=Validators.validate_description(str(record['description'])),
+            stock_quantity=Validators.validate_stock(record['stock_quantity'])
+        )
+
+    def _unique_key(self, product):
+        # Names are compared case-insensitively, as bulk_create_products does
+        return product.name.casefold()
+
+    def _write_chunk(self, products):
+        return self.repository.bulk_create_products(products)
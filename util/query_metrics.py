@@ -0,0 +1,366 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+
+slow_query_logger = logging.getLogger("ecom.slow_query")
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram in seconds, Prometheus style: each
+    bucket counts observations less than or equal to its upper bound.
+    Quantiles are estimated from the bucket bounds.
+    """
+
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(buckets or self.BUCKETS)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(self.buckets) and seconds > self.buckets[index]:
+            index += 1
+        self._counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def cumulative(self):
+        """[(upper bound, observations <= bound)], ending with +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self._counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': self.cumulative()
+        }
+
+
+class QueryMetrics:
+    """
+    Thread-safe registry of repository timings: calls, errors, rows and
+    latency per repository method and per SQL statement, plus the time
+    spent waiting for a pooled connection.
+
+    Statements are grouped by their normalized text (whitespace collapsed,
+    IN lists and multi-row VALUES folded), so a bulk insert of any size is
+    one entry. Statements taking at least slow_query_ms are written to the
+    'ecom.slow_query' logger at WARNING; None disables the slow-query log.
+    Parameters are never logged.
+    """
+
+    def __init__(self, slow_query_ms=None):
+        self.slow_query_seconds = slow_query_ms / 1000.0 if slow_query_ms is not None else None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._acquire = LatencyHistogram()
+            self._methods = {}
+            self._statements = {}
+            self._slow_queries = 0
+
+    @staticmethod
+    def normalize(sql):
+        sql = re.sub(r"\s+", " ", sql).strip()
+        sql = re.sub(r"\(\s*%s(?:\s*,\s*%s)*\s*\)", "(%s)", sql)
+        return re.sub(r"(\(%s\))(?:\s*,\s*\(%s\))+", r"\1", sql)
+
+    @staticmethod
+    def fingerprint(normalized_sql):
+        return hashlib.sha1(normalized_sql.encode()).hexdigest()[:12]
+
+    @staticmethod
+    def _new_entry():
+        return {'calls': 0, 'errors': 0, 'rows': 0, 'latency': LatencyHistogram()}
+
+    @staticmethod
+    def _add(entry, seconds, rows, error):
+        entry['calls'] += 1
+        entry['rows'] += rows
+        if error:
+            entry['errors'] += 1
+        entry['latency'].observe(seconds)
+
+    def observe_acquire(self, seconds):
+        with self._lock:
+            self._acquire.observe(seconds)
+
+    def observe_method(self, method, seconds, rows=0, error=False):
+        with self._lock:
+            entry = self._methods.get(method)
+            if entry is None:
+                entry = self._methods[method] = self._new_entry()
+            self._add(entry, seconds, rows, error)
+
+    def observe_statement(self, method, sql, seconds, rows=0, error=False):
+        normalized = self.normalize(sql)
+        key = (method, self.fingerprint(normalized))
+        slow = self.slow_query_seconds is not None and seconds >= self.slow_query_seconds
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                entry = self._statements[key] = dict(self._new_entry(), sql=normalized)
+            self._add(entry, seconds, rows, error)
+            if slow:
+                self._slow_queries += 1
+        if slow:
+            slow_query_logger.warning("Slow query in %s: %.1f ms, %d rows: %s",
+                                      method, seconds * 1000.0, rows, normalized)
+
+    def snapshot(self):
+        """
+        Plain-dict copy of everything recorded so far:
+        {'connection_acquire', 'methods', 'statements', 'slow_queries'}.
+        Statements are keyed by 'method:fingerprint'.
+        """
+        with self._lock:
+            return {
+                'connection_acquire': self._acquire.snapshot(),
+                'methods': {method: self._entry_snapshot(entry) for method, entry in self._methods.items()},
+                'statements': {
+                    f"{method}:{fingerprint}": dict(self._entry_snapshot(entry), method=method, sql=entry['sql'])
+                    for (method, fingerprint), entry in self._statements.items()
+                },
+                'slow_queries': self._slow_queries
+            }
+
+    @staticmethod
+    def _entry_snapshot(entry):
+        return {'calls': entry['calls'], 'errors': entry['errors'], 'rows': entry['rows'],
+                'latency': entry['latency'].snapshot()}
+
+    def to_prometheus(self, prefix="ecom_repository"):
+        """Text exposition format (version 0.0.4) of the current metrics."""
+        lines = []
+        with self._lock:
+            self._histogram_lines(lines, f"{prefix}_connection_acquire_seconds",
+                                  "Time spent waiting for a pooled connection", {}, self._acquire, True)
+
+            methods = sorted(self._methods.items())
+            statements = sorted(self._statements.items())
+            self._counter_lines(lines, f"{prefix}_method_calls_total", "Repository method calls",
+                                [({'method': method}, entry['calls']) for method, entry in methods])
+            self._counter_lines(lines, f"{prefix}_method_errors_total", "Repository calls that rolled back or failed",
+                                [({'method': method}, entry['errors']) for method, entry in methods])
+            first = True
+            for method, entry in methods:
+                self._histogram_lines(lines, f"{prefix}_method_duration_seconds",
+                                      "Repository method latency, connection borrow to release",
+                                      {'method': method}, entry['latency'], first)
+                first = False
+
+            self._counter_lines(lines, f"{prefix}_statement_rows_total", "Rows returned or affected per statement",
+                                [({'method': method, 'statement': fingerprint}, entry['rows'])
+                                 for (method, fingerprint), entry in statements])
+            self._counter_lines(lines, f"{prefix}_statement_errors_total", "Statements that raised",
+                                [({'method': method, 'statement': fingerprint}, entry['errors'])
+                                 for (method, fingerprint), entry in statements])
+            first = True
+            for (method, fingerprint), entry in statements:
+                self._histogram_lines(lines, f"{prefix}_statement_duration_seconds",
+                                      "SQL statement latency including row fetches",
+                                      {'method': method, 'statement': fingerprint}, entry['latency'], first)
+                first = False
+
+            lines.append(f"# HELP {prefix}_statement_info Normalized SQL text of each statement fingerprint")
+            lines.append(f"# TYPE {prefix}_statement_info gauge")
+            for (method, fingerprint), entry in statements:
+                labels = self._labels({'method': method, 'statement': fingerprint, 'sql': entry['sql']})
+                lines.append(f"{prefix}_statement_info{labels} 1")
+
+            self._counter_lines(lines, f"{prefix}_slow_queries_total", "Statements over the slow-query threshold",
+                                [({}, self._slow_queries)])
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def _counter_lines(cls, lines, name, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in samples:
+            lines.append(f"{name}{cls._labels(labels)} {value}")
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{key}="{QueryMetrics._escape(value)}"' for key, value in labels.items()) + "}"
+
+    @staticmethod
+    def _escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    @classmethod
+    def _histogram_lines(cls, lines, name, help_text, labels, histogram, header):
+        if header:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+        for bound, total in histogram.cumulative():
+            le = "+Inf" if bound == float('inf') else repr(bound)
+            lines.append(f"{name}_bucket{cls._labels(dict(labels, le=le))} {total}")
+        lines.append(f"{name}_sum{cls._labels(labels)} {histogram.sum!r}")
+        lines.append(f"{name}_count{cls._labels(labels)} {histogram.count}")
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy that times each statement from execute() through its last
+    fetch and counts the rows read (or, for writes, the rows affected).
+    A statement is recorded when the next one starts or the cursor closes.
+    """
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+        self._sql = None
+        self._elapsed = 0.0
+        self._rows = 0
+        self._fetched = False
+
+    def _finish(self):
+        if self._sql is None:
+            return
+        rows = self._rows
+        if not self._fetched:
+            rowcount = getattr(self._cursor, 'rowcount', -1)
+            rows = rowcount if rowcount and rowcount > 0 else 0
+        self._connection._observe_statement(self._sql, self._elapsed, rows)
+        self._sql = None
+
+    def _run(self, sql, call, *args):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            call(sql, *args)
+        except Exception:
+            self._connection._observe_statement(sql, time.perf_counter() - started, 0, error=True)
+            raise
+        self._sql = sql
+        self._elapsed = time.perf_counter() - started
+        self._rows = 0
+        self._fetched = False
+        return self
+
+    def execute(self, sql, params=()):
+        return self._run(sql, self._cursor.execute, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._run(sql, self._cursor.executemany, seq_of_params)
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            self._elapsed += time.perf_counter() - started
+            self._fetched = True
+
+    def fetchone(self):
+        row = self._timed_fetch(self._cursor.fetchone)
+        if row is not None:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._timed_fetch(self._cursor.fetchmany, size)
+        self._rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(self._cursor.fetchall)
+        self._rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """
+    Connection proxy handed out by the repository when metrics are on. The
+    borrowing repository method is charged with every statement run on it
+    and with the time from borrow to close(); a rollback marks the call as
+    failed.
+    """
+
+    def __init__(self, connection, metrics, method, started):
+        self._connection = connection
+        self._metrics = metrics
+        self._method = method
+        self._started = started
+        self._cursors = []
+        self._rows = 0
+        self._failed = False
+        self._closed = False
+
+    def cursor(self, *args, **kwargs):
+        cursor = InstrumentedCursor(self._connection.cursor(*args, **kwargs), self)
+        self._cursors.append(cursor)
+        return cursor
+
+    def _observe_statement(self, sql, seconds, rows, error=False):
+        self._rows += rows
+        self._metrics.observe_statement(self._method, sql, seconds, rows, error)
+
+    def rollback(self):
+        self._failed = True
+        return self._connection.rollback()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for cursor in self._cursors:
+            cursor._finish()
+        self._cursors = []
+        self._connection.close()
+        self._metrics.observe_method(self._method, time.perf_counter() - self._started,
+                                     self._rows, self._failed)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _WriteConnection:
+    """Primary connection proxy that starts the read-your-writes window when released."""
+
+    def __init__(self, router, connection):
+        self._router = router
+        self._connection = connection
+
+    def close(self):
+        self._connection.close()
+        self._router.record_write()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class ReplicaRouter:
+    """
+    Picks the connection source for each repository call: read-only calls
+    go to the replicas (round robin), everything else to the primary.
+
+    read_your_writes_window -- seconds after a session's last write during
+                               which its reads still go to the primary, so it
+                               never reads from a replica that has not caught
+                               up yet. A session is the calling thread.
+
+    replicas is a list of callables returning connections, e.g. the
+    get_connection of one ConnectionPool per replica. A replica that fails
+    to hand out a connection is skipped; if all fail the read goes to the
+    primary.
+    """
+
+    def __init__(self, replicas, read_your_writes_window=5.0):
+        if not replicas:
+            raise ValueError("At least one replica is required")
+        self._replicas = list(replicas)
+        self.read_your_writes_window = read_your_writes_window
+        self._session = threading.local()
+        self._lock = threading.Lock()
+        self._next = 0
+        self._replica_reads = 0
+        self._primary_reads = 0
+        self._writes = 0
+        self._fallbacks = 0
+
+    def record_write(self):
+        self._session.last_write = time.monotonic()
+
+    def _recently_wrote(self):
+        last_write = getattr(self._session, 'last_write', None)
+        return last_write is not None and time.monotonic() - last_write < self.read_your_writes_window
+
+    def connect(self, read_only, primary):
+        """
+        Returns a connection for one call. primary is the callable that
+        borrows a primary connection.
+        """
+        if not read_only:
+            with self._lock:
+                self._writes += 1
+            return _WriteConnection(self, primary())
+
+        if not self._recently_wrote():
+            with self._lock:
+                start = self._next
+                self._next = (self._next + 1) % len(self._replicas)
+            for offset in range(len(self._replicas)):
+                index = (start + offset) % len(self._replicas)
+                try:
+                    connection = self._replicas[index]()
+                except Exception as e:
+                    logger.warning("Replica %d unavailable, trying the next one: %s", index, e)
+                    continue
+                with self._lock:
+                    self._replica_reads += 1
+                return connection
+            with self._lock:
+                self._fallbacks += 1
+
+        with self._lock:
+            self._primary_reads += 1
+        return primary()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'replicas': len(self._replicas),
+                'replica_reads': self._replica_reads,
+                'primary_reads': self._primary_reads,
+                'writes': self._writes,
+                'fallbacks': self._fallbacks,
+            }
@@ -0,0 +1,91 @@
+try:
+    import numpy as np
+except ImportError:  # optional; only the columnar read methods need it
+    np = None
+
+
+class ResultFrame:
+    """
+    Column-oriented query result: one NumPy array per column, all of the
+    same length, built straight from cursor row batches without creating
+    entity objects. Money columns hold integer cents, timestamps are
+    datetime64[us].
+
+    Example, revenue per day from an order-lines frame:
+
+        orders = frame.first_per('order_id')
+        day_keys, revenue_cents = orders.group_sum(
+            orders['order_date'].astype('datetime64[D]'), 'order_total_cents')
+    """
+
+    def __init__(self, columns):
+        ResultFrame._require_numpy()
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns of a ResultFrame must have the same length")
+        self._columns = dict(columns)
+
+    @staticmethod
+    def _require_numpy():
+        if np is None:
+            raise ImportError("NumPy is required for columnar result frames (pip install numpy)")
+
+    @classmethod
+    def from_batches(cls, batches, schema):
+        """
+        Builds a frame from an iterable of row batches (lists of tuples, as
+        returned by cursor.fetchmany). schema is a list of (name, dtype)
+        pairs matching the row layout.
+        """
+        cls._require_numpy()
+        values = [[] for _ in schema]
+        for batch in batches:
+            for column, batch_values in zip(values, zip(*batch)):
+                column.extend(batch_values)
+        return cls({name: np.array(column, dtype=dtype)
+                    for (name, dtype), column in zip(schema, values)})
+
+    @classmethod
+    def empty(cls, schema):
+        cls._require_numpy()
+        return cls({name: np.array([], dtype=dtype) for name, dtype in schema})
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __len__(self):
+        for values in self._columns.values():
+            return len(values)
+        return 0
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def take(self, selector):
+        """Rows picked by an index array or boolean mask, as a new frame."""
+        return ResultFrame({name: values[selector] for name, values in self._columns.items()})
+
+    def first_per(self, key):
+        """
+        One row per distinct value of column key (its first occurrence),
+        e.g. to count each order once when the frame has one row per line.
+        """
+        _, first_rows = np.unique(self._columns[key], return_index=True)
+        return self.take(np.sort(first_rows))
+
+    def group_sum(self, by, column):
+        """
+        Sums column per distinct key. by is a column name or an array of
+        keys with one entry per row. Returns (sorted keys, sums); integer
+        columns stay integer.
+        """
+        keys = self._columns[by] if isinstance(by, str) else np.asarray(by)
+        values = self._columns[column]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        sums = np.zeros(len(unique_keys), dtype=values.dtype)
+        np.add.at(sums, inverse, values)
+        return unique_keys, sums
@@ -0,0 +1,242 @@
+import sqlite3
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+import mysql.connector
+from mysql.connector import errorcode
+from util.connection_pool import ConnectionPool
+from util.migration_runner import MigrationRunner
+
+
+# Same tables and columns as ecommerce_db.sql (after the stock_quantity
+# rename); later changes come from util/migrations.py, as for MySQL
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers
+(
+customer_id integer primary key autoincrement,
+name varchar(100) not null,
+email varchar(100) unique not null,
+password varchar(100) not null
+);
+
+CREATE TABLE IF NOT EXISTS products
+(
+product_id integer primary key autoincrement,
+name varchar(60) not null,
+price decimal(10,2) not null,
+description text,
+stock_quantity int not null
+);
+
+CREATE TABLE IF NOT EXISTS cart
+(
+cart_id integer primary key autoincrement,
+customer_id int not null,
+product_id int not null,
+quantity int not null
+);
+
+-- MySQL ignores the inline column REFERENCES in ecommerce_db.sql, so orders
+-- and order_items are left unconstrained here as well
+CREATE TABLE IF NOT EXISTS orders
+(
+order_id integer primary key autoincrement,
+customer_id int not null,
+order_date timestamp default current_timestamp,
+total_price decimal(10,2) not null,
+shipping_address text not null
+);
+
+CREATE TABLE IF NOT EXISTS order_items
+(
+order_item_id integer primary key autoincrement,
+order_id int not null,
+product_id int not null,
+quantity int not null
+);
+"""
+
+# Store timestamps and money the way MySQL hands them back: datetime and Decimal
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("timestamp", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("decimal", lambda value: Decimal(value.decode()))
+
+
+@lru_cache(maxsize=512)
+def _translate(sql):
+    # The DAO is written against mysql-connector's %s paramstyle
+    return sql.replace("%s", "?").replace("%%", "%")
+
+
+def _translate_error(error):
+    """Maps sqlite3 errors onto the mysql.connector hierarchy the DAO catches."""
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        if "FOREIGN KEY" in message:
+            errno = errorcode.ER_NO_REFERENCED_ROW_2
+        elif "UNIQUE" in message:
+            errno = errorcode.ER_DUP_ENTRY
+        else:
+            errno = errorcode.ER_BAD_NULL_ERROR
+        return mysql.connector.errors.IntegrityError(msg=message, errno=errno)
+    if isinstance(error, sqlite3.OperationalError):
+        return mysql.connector.errors.OperationalError(msg=message)
+    if isinstance(error, sqlite3.ProgrammingError):
+        return mysql.connector.errors.ProgrammingError(msg=message)
+    return mysql.connector.errors.DatabaseError(msg=message)
+
+
+class SQLiteCursor:
+    """Cursor exposing the subset of the mysql-connector cursor API the DAO uses."""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def execute(self, sql, params=()):
+        try:
+            self._cursor.execute(_translate(sql), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        try:
+            self._cursor.executemany(_translate(sql), [tuple(p) for p in seq_of_params])
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        return self
+
+    def _convert(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._convert(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._convert(row)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Wraps sqlite3.Connection behind the mysql-connector connection API."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, dictionary=False, buffered=None):
+        return SQLiteCursor(self._connection.cursor(), dictionary=dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    def start_transaction(self, consistent_snapshot=False, readonly=None):
+        # A read-only transaction takes its snapshot at its first read, as
+        # a consistent-snapshot MySQL one does; writers lock up front
+        try:
+            self._connection.execute("BEGIN" if readonly else "BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def is_connected(self):
+        try:
+            self._connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self._connection.close()
+
+
+class SQLiteDatabase:
+    """
+    A file-backed or in-memory SQLite database with the ecommerce schema,
+    migrated to the latest version on open and served through a
+    ConnectionPool like the MySQL backend.
+
+    ':memory:' databases use a private shared-cache URI so every pooled
+    connection sees the same data; a keeper connection holds it open until
+    close(). Shared-cache memory databases take table-level locks, so they
+    are meant for tests and single-threaded benchmarks.
+
+    foreign_keys=False leaves foreign keys unenforced, for shard databases
+    whose customers and products live in another database.
+    """
+
+    def __init__(self, path=':memory:', pool_size=5, timeout=10.0, foreign_keys=True):
+        self.path = path
+        self.foreign_keys = foreign_keys
+        if path == ':memory:':
+            self._target = f"file:ecom_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            self._target = path
+        self._keeper = self._connect()
+        self._keeper.executescript(SQLITE_SCHEMA)
+        if path != ':memory:':
+            self._keeper.execute("PRAGMA journal_mode=WAL")
+        self._keeper.commit()
+        self._pool = ConnectionPool(
+            lambda: SQLiteConnection(self._connect()),
+            pool_size=pool_size,
+            timeout=timeout,
+            idle_timeout=None
+        )
+        MigrationRunner(self.get_connection, 'sqlite', verbose=False).migrate()
+
+    def _connect(self):
+        connection = sqlite3.connect(
+            self._target,
+            uri=self._target.startswith("file:"),
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            timeout=10.0
+        )
+        connection.execute("PRAGMA foreign_keys=ON" if self.foreign_keys else "PRAGMA foreign_keys=OFF")
+        return connection
+
+    def get_connection(self):
+        return self._pool.get_connection()
+
+    def stats(self):
+        return self._pool.stats()
+
+    def close(self):
+        self._pool.close()
+        self._keeper.close()
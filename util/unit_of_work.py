@@ -0,0 +1,76 @@
+from exception.UnitOfWorkRolledBackException import UnitOfWorkRolledBackException
+
+
+class JoinedConnection:
+    """
+    What a repository method gets from connection_for(method) inside a unit of
+    work: the unit's connection, with the method's own transaction control
+    folded into the unit. start_transaction() and commit() do nothing (the
+    unit commits once at the end), rollback() rolls back the whole unit and
+    close() only ends this method's use of the connection.
+    """
+
+    def __init__(self, unit):
+        self._unit = unit
+        self._released = False
+
+    def cursor(self, *args, **kwargs):
+        return self._unit.connection.cursor(*args, **kwargs)
+
+    @property
+    def in_transaction(self):
+        return True
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._unit.rollback()
+
+    def is_connected(self):
+        return not self._released
+
+    def close(self):
+        self._released = True
+
+    def __getattr__(self, name):
+        return getattr(self._unit.connection, name)
+
+
+class UnitOfWork:
+    """
+    One pooled connection and one transaction shared by every repository
+    call made on the same thread while the unit is active; see
+    OrderProcessorRepositoryImpl.unit_of_work().
+
+    The unit is all or nothing. If a call inside it rolls back (the call
+    reports its failure the usual way, e.g. by returning False), the
+    transaction is rolled back at once, further calls raise
+    UnitOfWorkRolledBackException and so does leaving the unit.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rolled_back = False
+        connection.start_transaction()
+
+    def join(self):
+        if self.rolled_back:
+            raise UnitOfWorkRolledBackException()
+        return JoinedConnection(self)
+
+    def rollback(self):
+        if not self.rolled_back:
+            self.rolled_back = True
+            self.connection.rollback()
+
+    def commit(self):
+        if self.rolled_back:
+            raise UnitOfWorkRolledBackException()
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
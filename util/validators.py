@@ -0,0 +1,76 @@
+import re
+
+
+class Validators:
+    """
+    Input rules shared by the interactive app (EcomApp) and the bulk
+    loaders. Each returns the normalized value or raises ValueError.
+    """
+
+    @staticmethod
+    def validate_name(name):
+        if not name.strip():
+            raise ValueError("Name cannot be empty")
+        if len(name) > 100:
+            raise ValueError("Name cannot exceed 100 characters")
+        if not re.match(r'^[a-zA-Z\s\-\.\']+$', name):
+            raise ValueError("Name can only contain letters, spaces, hyphens, apostrophes, and periods")
+        return name
+
+    @staticmethod
+    def validate_email(email):
+        if not email.strip():
+            raise ValueError("Email cannot be empty")
+        if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+            raise ValueError("Please enter a valid email address (e.g., user@example.com)")
+        return email.lower()
+
+    @staticmethod
+    def validate_password(password):
+        if len(password) < 8:
+            raise ValueError("Password must be at least 8 characters long")
+        if not re.search(r'[A-Z]', password):
+            raise ValueError("Password must contain at least one uppercase letter")
+        if not re.search(r'[a-z]', password):
+            raise ValueError("Password must contain at least one lowercase letter")
+        if not re.search(r'[0-9]', password):
+            raise ValueError("Password must contain at least one number")
+        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+            raise ValueError("Password must contain at least one special character")
+        return password
+
+    @staticmethod
+    def validate_price(price):
+        try:
+            price = float(price)
+            if price <= 0:
+                raise ValueError("Price must be greater than 0")
+            return round(price, 2)
+        except ValueError:
+            raise ValueError("Price must be a valid number")
+
+    @staticmethod
+    def validate_stock(stock):
+        try:
+            stock = int(stock)
+            if stock < 0:
+                raise ValueError("Stock quantity cannot be negative")
+            return stock
+        except ValueError:
+            raise ValueError("Stock quantity must be a whole number")
+
+    @staticmethod
+    def validate_product_name(name):
+        name = name.strip()
+        if not name:
+            raise ValueError("Product name cannot be empty")
+        if len(name) > 60:
+            raise ValueError("Product name cannot exceed 60 characters")
+        return name
+
+    @staticmethod
+    def validate_description(description):
+        description = description.strip()
+        if not description:
+            raise ValueError("Description cannot be empty")
+        return description